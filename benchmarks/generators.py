@@ -0,0 +1,261 @@
+"""
+Generators for synthetic catalysis data files of arbitrary size. The files follow
+the formats of the templates in `src/nomad_catalysis/example_uploads` and of the
+test data, so that they run through the same code paths as real uploads.
+"""
+
+import os.path
+
+import numpy as np
+import pandas as pd
+
+COLLECTION_TYPES = [
+    'CatalysisCollection',
+    'CatalyticReactionCollection',
+    'CatalystSampleCollection',
+]
+
+HABER_METHOD = 'NH3_Decomposition'
+
+
+def write_table(data_frame: pd.DataFrame, file_name: str) -> str:
+    if file_name.endswith('.xlsx'):
+        data_frame.to_excel(file_name, index=False)
+    else:
+        data_frame.to_csv(file_name, index=False)
+    return file_name
+
+
+def collection_data_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Returns a catalysis collection with `n_rows` rows with the sample, reactor,
+    feed, pretreatment and result columns of the collection template.
+    """
+    rng = np.random.default_rng(seed)
+    index = np.arange(n_rows)
+    fractions = rng.dirichlet(np.ones(4), size=n_rows) * 100
+    selectivities = rng.dirichlet(np.ones(3), size=n_rows) * 100
+    columns = {
+        'name': [f'catalyst {n} measurement' for n in index],
+        'catalyst name': [f'catalyst {n}' for n in index],
+        'sample_id': [f'Institute-user-project-sample-{n}_PID' for n in index],
+        'datetime': '23.06.2025',
+        'support': rng.choice(['ZrO2', 'TiO2', 'SiO2'], n_rows),
+        'catalyst_type': 'supported catalyst',
+        'storing_institution': 'Institute/Department',
+        'form': 'powder',
+        'Elements': 'Cu,Zn,O',
+        'mass_fractions': '0.0363,0.0100,0.0037',
+        'preparation_method': 'co-precipitation',
+        'preparator': 'lab scientist',
+        'preparing_institute': 'Institute/Department',
+        'surface_area (m2/g)': rng.uniform(5, 300, n_rows),
+        'surface_area_method': 'BET',
+        'reaction_name': 'CO2 hydrogenation',
+        'reaction_type': 'thermal catalysis, hydrogenation',
+        'x_r CO2 (%)': rng.uniform(0, 30, n_rows),
+        'S_p MeOH (%)': selectivities[:, 0],
+        'S_p CH4 (%)': selectivities[:, 1],
+        'S_p CO (%)': selectivities[:, 2],
+        'r_specific_mass CO (mol/(h*gMetal))': rng.uniform(0, 0.05, n_rows),
+        'r_specific_mass MeOH (mol/(h*gMetal))': rng.uniform(0, 0.05, n_rows),
+        'set_pressure (bar)': rng.choice([1, 10, 50], n_rows),
+        'set_temperature (C)': rng.choice([200, 250, 300], n_rows),
+        'flow_rate (mL/min)': rng.uniform(5, 50, n_rows),
+        'x CO2 (%)': fractions[:, 0],
+        'x H2 (%)': fractions[:, 1],
+        'x He (%)': fractions[:, 2],
+        'x N2 (%)': fractions[:, 3],
+        'WHSV (ml/g/h)': rng.uniform(1000, 20000, n_rows),
+        'mass (mg)': rng.uniform(10, 100, n_rows),
+        'diluent': 'SiC',
+        'diluent_mass (mg)': 200,
+        'reactor_diameter (mm)': 2,
+        'reactor_volume (ml)': 3.77,
+        'reactor_type': 'fixed-bed',
+        'pretreatment set_temperature0 (Celsius)': 20,
+        'pretreatment set_temperature1 (Celsius)': 250,
+        'pretreatment gas_flow0 N2 (mln)': 10,
+        'pretreatment gas_flow1 N2 (mln)': 0,
+        'pretreatment gas_flow0 H2 (mln)': 0,
+        'pretreatment gas_flow1 H2 (mln)': 10,
+        'pretreatment time0 (min)': 0,
+        'pretreatment time1 (min)': 46,
+        'pretreatment pressure (bar)': 1,
+    }
+    return pd.DataFrame(columns)
+
+
+def write_collection(
+    directory: str,
+    n_rows: int,
+    collection_type: str = 'CatalysisCollection',
+    extension: str = 'xlsx',
+) -> str:
+    """
+    Writes a collection file with `n_rows` rows, which is matched by the
+    collection parser, and returns its path.
+    """
+    file_name = os.path.join(
+        directory, f'benchmark_{n_rows}_{collection_type}.{extension}'
+    )
+    return write_table(collection_data_frame(n_rows), file_name)
+
+
+def clean_data_frame(n_points: int, n_steps: int = 10, seed: int = 0) -> pd.DataFrame:
+    """
+    Returns a clean data time series with `n_points` rows in the format read by
+    `clean_data_reader.read_clean_data`, with the temperature increased in
+    `n_steps` steps.
+    """
+    rng = np.random.default_rng(seed)
+    step = np.arange(n_points) * n_steps // n_points
+    temperature = 200 + 25 * step + rng.normal(0, 0.1, n_points)
+    conversion = np.clip((temperature - 200) / 5, 0, 100)
+    selectivity = rng.uniform(0, 100, n_points)
+    return pd.DataFrame(
+        {
+            'step': step,
+            'mass (g)': 0.5,
+            'GHSV (h^-1)': 1000,
+            'x ethane (%)': 3.0,
+            'x oxygen (%)': 9.0,
+            'x inert (%)': 88.0,
+            'temperature (C)': temperature,
+            'set_temperature (C)': 200 + 25 * step,
+            'pressure (bar)': 1 + rng.normal(0, 0.01, n_points),
+            'Vflow (ml/min)': 41.7,
+            'TOS (h)': np.linspace(0, n_points / 60, n_points),
+            'x_r ethane (%)': conversion,
+            'x_p ethane (%)': conversion * 0.98,
+            'r ethane (mmolg^-1h^-1)': conversion * 0.01,
+            'S_p ethylene (%)': selectivity,
+            'S_p CO2 (%)': 100 - selectivity,
+            'C-balance (%)': 100 + rng.normal(0, 0.5, n_points),
+        }
+    )
+
+
+def write_clean_data(directory: str, n_points: int, extension: str = 'csv') -> str:
+    """
+    Writes a clean data file with `n_points` rows and returns its path. Note that
+    xlsx sheets are limited to 1048576 rows.
+    """
+    file_name = os.path.join(directory, f'benchmark_{n_points}_clean_data.{extension}')
+    return write_table(clean_data_frame(n_points), file_name)
+
+
+def _records(columns: dict) -> np.ndarray:
+    """
+    Returns the equally long `columns` as a structured array, the layout of the
+    tables in the Haber h5 files.
+    """
+    arrays = [np.asarray(value) for value in columns.values()]
+    records = np.empty(
+        len(arrays[0]),
+        dtype=[(name, array.dtype) for name, array in zip(columns, arrays)],
+    )
+    for name, array in zip(columns, arrays):
+        records[name] = array
+    return records
+
+
+def haber_temperature_program(n_points: int, n_steps: int = 6) -> np.ndarray:
+    """
+    Returns a temperature program that goes up and down in `n_steps` steady
+    states with linear ramps between them.
+    """
+    levels = 400 + 50 * np.array(
+        list(range(n_steps // 2)) + list(reversed(range(n_steps - n_steps // 2)))
+    )
+    per_step = n_points // n_steps
+    ramp = min(per_step // 4, 200)
+    temperature = np.repeat(levels, per_step).astype(float)
+    for n in range(1, n_steps):
+        start = n * per_step
+        temperature[start : start + ramp] = np.linspace(levels[n - 1], levels[n], ramp)
+    return np.concatenate(
+        [temperature, np.full(n_points - len(temperature), levels[-1])]
+    )
+
+
+def write_haber_data(directory: str, n_points: int, seed: int = 0) -> str:
+    """
+    Writes a Haber NH3 decomposition h5 file with `n_points` data points in the
+    reaction and returns its path.
+    """
+    import h5py
+
+    rng = np.random.default_rng(seed)
+    file_name = os.path.join(directory, f'benchmark_{n_points}_NH3_Decomposition.h5')
+    n_pre = max(n_points // 10, 10)
+    temperature = haber_temperature_program(n_points)
+    conversion = np.clip((temperature - 400) / 3 + rng.normal(0, 0.5, n_points), 0, 100)
+    with h5py.File(file_name, 'w') as data:
+        data[f'Header/{HABER_METHOD}/Header'] = _records(
+            {
+                'Temporal resolution [Hz]': [1.0],
+                'Bulk volume [mln]': [0.3],
+                'Inner diameter of reactor (D) [mm]': [4.0],
+                'Diluent material': [b'SiC'],
+                'Diluent Sieve fraction high [um]': [250.0],
+                'Diluent Sieve fraction low [um]': [100.0],
+                'Catalyst Mass [mg]': [50.0],
+                'Sieve fraction high [um]': [250.0],
+                'Sieve fraction low [um]': [100.0],
+                'Particle size (Dp) [mm]': [0.2],
+                'User': [b'benchmark'],
+            }
+        )
+        data['Header/Header'] = _records({'SampleID': [36891]})
+        data[f'Sorted Data/{HABER_METHOD}/H2 Reduction'] = _records(
+            {
+                'Date': np.full(n_pre, b'2022-11-21 10:56:35'),
+                'Relative Time [Seconds]': np.arange(n_pre).astype('S16'),
+                'Catalyst Temperature [C°]': np.linspace(25, 500, n_pre),
+                'Massflow3 (H2) Target Calculated Realtime Value [mln|min]': np.full(
+                    n_pre, 20.0
+                ),
+                'Massflow5 (Ar) Target Calculated Realtime Value [mln|min]': np.full(
+                    n_pre, 80.0
+                ),
+                'Target Total Gas (After Reactor) [mln|min]': np.full(n_pre, 100.0),
+            }
+        )
+        data[f'Sorted Data/{HABER_METHOD}/NH3 Decomposition'] = _records(
+            {
+                'Relative Time [Seconds]': (n_pre + np.arange(n_points)).astype('S16'),
+                'Catalyst Temperature [C°]': temperature,
+                'Massflow1 (NH3_High) Target Calculated Realtime Value [mln|min]': (
+                    np.full(n_points, 50.0)
+                ),
+                'Massflow5 (Ar) Target Calculated Realtime Value [mln|min]': np.full(
+                    n_points, 50.0
+                ),
+                'Massflow1 (NH3_High) Target Setpoint [mln|min]': np.full(
+                    n_points, 50.0
+                ),
+                'Massflow5 (Ar) Target Setpoint [mln|min]': np.full(n_points, 50.0),
+                'W|F [gs|ml]': np.full(n_points, 0.03),
+                'NH3 Conversion [%]': conversion,
+                'Space Time Yield [mmolH2 gcat-1 min-1]': conversion * 0.15,
+            }
+        )
+    return file_name
+
+
+def write_reaction_archive(directory: str, data_file: str) -> str:
+    """
+    Writes a CatalyticReaction archive that references `data_file` and returns its
+    path.
+    """
+    data_file = os.path.basename(data_file)
+    file_name = os.path.join(directory, f'{data_file}.archive.yaml')
+    with open(file_name, 'w') as outfile:
+        outfile.write(
+            'data:\n'
+            '  m_def: nomad_catalysis.schema_packages.catalysis.CatalyticReaction\n'
+            f'  name: benchmark {data_file}\n'
+            f"  data_file: '{data_file}'\n"
+        )
+    return file_name
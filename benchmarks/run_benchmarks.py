@@ -0,0 +1,258 @@
+"""
+Benchmarks of the catalysis parsers and normalizers with synthetic data files.
+
+The benchmarks run offline in a temporary directory with the NOMAD client context,
+no NOMAD server or Oasis is needed. Each benchmark records the fastest of
+`--repeat` runs and the peak memory allocated during one more run traced with
+tracemalloc. Examples:
+
+    python benchmarks/run_benchmarks.py --scale small
+    python benchmarks/run_benchmarks.py --benchmark haber --output haber.json
+    python benchmarks/run_benchmarks.py --compare haber.json --threshold 1.25
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from generators import (
+    write_clean_data,
+    write_collection,
+    write_haber_data,
+    write_reaction_archive,
+)
+
+SCALES = {
+    'small': {
+        'collection': [10, 1000],
+        'clean_data_csv': [1000, 100000],
+        'clean_data_xlsx': [1000, 10000],
+        'haber': [10000],
+    },
+    'medium': {
+        'collection': [10, 1000, 10000],
+        'clean_data_csv': [1000, 100000, 1000000],
+        'clean_data_xlsx': [1000, 100000],
+        'haber': [10000, 100000],
+    },
+    'large': {
+        'collection': [10, 1000, 10000, 100000],
+        'clean_data_csv': [1000, 100000, 1000000, 10000000],
+        'clean_data_xlsx': [1000, 100000, 1000000],
+        'haber': [10000, 100000, 1000000],
+    },
+}
+
+
+class NullLogger:
+    """
+    A logger that drops all events, so that logging does not end up in the
+    measurements.
+    """
+
+    def bind(self, **kwargs):
+        return self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+Setup = Callable[[], Callable[[], None]]
+
+
+def collection_parse(directory: str, n_rows: int) -> Setup:
+    """
+    Benchmarks `CatalysisCollectionParser.parse` on a collection file with `n_rows`
+    rows, which writes 2 * `n_rows` child archives.
+    """
+    from nomad.datamodel import EntryArchive, EntryMetadata
+    from nomad.datamodel.context import ClientContext
+
+    from nomad_catalysis.parsers import catalysis_collection
+
+    mainfile = write_collection(directory, n_rows)
+    parser = catalysis_collection.load()
+
+    def setup():
+        archive = EntryArchive(
+            m_context=ClientContext(local_dir=directory),
+            metadata=EntryMetadata(mainfile=mainfile, upload_id='benchmark'),
+        )
+        return lambda: parser.parse(mainfile, archive, NullLogger())
+
+    return setup
+
+
+def reaction_normalize(directory: str, data_file: str) -> Setup:
+    """
+    Benchmarks `CatalyticReaction.normalize` on an entry with the data file
+    `data_file`, including reading the file.
+    """
+    from nomad.client import parse
+
+    mainfile = write_reaction_archive(directory, data_file)
+    archive = parse(mainfile, logger=NullLogger())[0]
+    data = archive.data
+
+    def setup():
+        archive.data = data.m_copy(deep=True)
+        return lambda: archive.data.normalize(archive, NullLogger())
+
+    return setup
+
+
+def clean_data_normalize(directory: str, n_points: int, extension: str) -> Setup:
+    return reaction_normalize(
+        directory, write_clean_data(directory, n_points, extension)
+    )
+
+
+def haber_normalize(directory: str, n_points: int) -> Setup:
+    return reaction_normalize(directory, write_haber_data(directory, n_points))
+
+
+def haber_reduce(directory: str, n_points: int) -> Setup:
+    """
+    Benchmarks finding and averaging the steady states of an entry with a Haber h5
+    file with `n_points` data points, which is read and normalized before.
+    """
+    from nomad.client import normalize_all, parse
+
+    mainfile = write_reaction_archive(directory, write_haber_data(directory, n_points))
+
+    def setup():
+        archive = parse(mainfile, logger=NullLogger())[0]
+        normalize_all(archive, logger=NullLogger())
+        return lambda: archive.data.write_steady_states(
+            archive.data.get_steady_states(), NullLogger()
+        )
+
+    return setup
+
+
+BENCHMARKS = {
+    'collection_parse': ('collection', collection_parse),
+    'clean_data_csv_normalize': (
+        'clean_data_csv',
+        lambda directory, size: clean_data_normalize(directory, size, 'csv'),
+    ),
+    'clean_data_xlsx_normalize': (
+        'clean_data_xlsx',
+        lambda directory, size: clean_data_normalize(directory, size, 'xlsx'),
+    ),
+    'haber_normalize': ('haber', haber_normalize),
+    'haber_reduce': ('haber', haber_reduce),
+}
+
+
+def measure(setup: Setup, repeat: int) -> dict:
+    """
+    Returns the fastest wall time of `repeat` runs and the peak memory in bytes
+    traced during one more run. Every run is prepared by `setup` outside of the
+    measurement.
+    """
+    seconds = []
+    for _ in range(repeat):
+        run = setup()
+        start = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - start)
+    run = setup()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': min(seconds), 'peak_memory': peak}
+
+
+def run_benchmarks(names: list[str], scale: str, repeat: int) -> list[dict]:
+    results = []
+    for name in names:
+        sizes_key, benchmark = BENCHMARKS[name]
+        for size in SCALES[scale][sizes_key]:
+            with tempfile.TemporaryDirectory() as directory:
+                cwd = os.getcwd()
+                # the client context writes the child archives into the working
+                # directory
+                os.chdir(directory)
+                try:
+                    result = measure(benchmark(directory, size), repeat)
+                finally:
+                    os.chdir(cwd)
+            result.update(benchmark=name, size=size)
+            print(
+                f'{name:<28}{size:>10}{result["seconds"]:>12.3f} s'
+                f'{result["peak_memory"] / 2**20:>12.1f} MiB',
+                flush=True,
+            )
+            results.append(result)
+    return results
+
+
+def compare(results: list[dict], baseline: list[dict], threshold: float) -> list[str]:
+    """
+    Returns a message for every benchmark that is slower or needs more memory than
+    `threshold` times the value of the same benchmark and size in `baseline`.
+    """
+    baseline = {(result['benchmark'], result['size']): result for result in baseline}
+    regressions = []
+    for result in results:
+        reference = baseline.get((result['benchmark'], result['size']))
+        if reference is None:
+            continue
+        for key in ['seconds', 'peak_memory']:
+            if result[key] > threshold * reference[key]:
+                regressions.append(
+                    f'{result["benchmark"]} {result["size"]}: {key} '
+                    f'{result[key]:.4g} > {threshold} * {reference[key]:.4g}'
+                )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--benchmark',
+        action='append',
+        choices=list(BENCHMARKS),
+        help='the benchmarks to run, all by default',
+    )
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write the results to this json file')
+    parser.add_argument(
+        '--compare', help='compare the results to the results in this json file'
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=1.25,
+        help='the factor above the compared results that counts as a regression',
+    )
+    args = parser.parse_args()
+
+    results = run_benchmarks(
+        args.benchmark or list(BENCHMARKS), args.scale, args.repeat
+    )
+    if args.output:
+        with open(args.output, 'w') as outfile:
+            json.dump(results, outfile, indent=2)
+    if args.compare:
+        with open(args.compare) as infile:
+            regressions = compare(results, json.load(infile), args.threshold)
+        for regression in regressions:
+            print(f'Regression: {regression}')
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,14 @@
 from nomad.config.models.plugins import ParserEntryPoint
+from pydantic import Field
 
 
 class CatalysisParserEntryPoint(ParserEntryPoint):
+    use_child_archives: bool = Field(
+        False,
+        description="""Create the reaction entry as an in-memory child archive instead
+        of writing and processing an additional archive.json file.""",
+    )
+
     def load(self):
         from nomad_catalysis.parsers.catalysis_parsers import CatalysisParser # noqa: PLC0415, I001
 
@@ -16,6 +23,24 @@ catalysis = CatalysisParserEntryPoint(
 
 
 class CatalysisCollectionParserEntryPoint(ParserEntryPoint):
+    streaming: bool = Field(
+        False,
+        description='Read the collection files in chunks of `chunk_size` rows.',
+    )
+    chunk_size: int = Field(
+        10000, description='The number of rows per chunk in streaming mode.'
+    )
+    use_child_archives: bool = Field(
+        False,
+        description="""Create the sample and reaction entries as in-memory child
+        archives instead of writing and processing archive.json files.""",
+    )
+    timing_report: bool = Field(
+        False,
+        description="""Log the time spent in the stages of each parse and counters
+        like the number of rows and bytes written as one structured log event.""",
+    )
+
     def load(self):
         from nomad_catalysis.parsers.catalysis_parsers import CatalysisCollectionParser # noqa: PLC0415, I001
 
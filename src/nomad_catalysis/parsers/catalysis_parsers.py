@@ -1,3 +1,5 @@
+from collections.abc import Iterator
+
 import numpy as np
 import pandas as pd
 from nomad.datamodel import EntryArchive
@@ -7,9 +9,15 @@ from nomad.datamodel.metainfo.basesections import (
     SectionReference,
 )
 from nomad.parsing import MatchingParser
-from nomad.units import ureg
-
-from nomad_catalysis.parsers.utils import create_archive
+from nomad.utils import get_logger
+
+from nomad_catalysis.parsers.column_plan import compile_column_plan
+from nomad_catalysis.parsers.timing import ParseTimer
+from nomad_catalysis.parsers.utils import (
+    ChildArchiveWriter,
+    create_archive,
+    read_table_chunks,
+)
 from nomad_catalysis.schema_packages.catalysis import (
     CatalysisCollectionParserEntry,
     CatalystSample,
@@ -27,39 +35,51 @@ from nomad_catalysis.schema_packages.catalysis import (
     SurfaceArea,
 )
 
-
-def get_time_unit(string) -> any:
-    """
-    This function extracts the time unit (h/min/s) from a string.
-    It returns a ureg.Quantity object with the time unit.
-    """
-    if 'h' in string:
-        return ureg.hour
-    elif 's' in string:
-        return ureg.second
-    elif 'min' in string:
-        return ureg.minute
-    else:
-        raise ValueError('Time unit not recognized.')
-
-
-def get_mass_unit(string) -> any:
+SAMPLE_COLUMN_NAMES = {
+    'catalyst name': 'name',
+    'catalyst_name': 'name',
+    'catalyst': 'name',
+    'storing institution': 'storing_institution',
+    'storing_institute': 'storing_institution',
+    'date': 'datetime',
+    'sample date': 'datetime',
+    'lab-id': 'lab_id',
+    'sample_id': 'lab_id',
+    'catalyst_id': 'lab_id',
+    'surface_area_method': 'method_surface_area_determination',
+    'surface_area (m2/g)': 'surface_area',
+    'preparation': 'preparation_method',
+    'comment': 'description',
+    'comments': 'description',
+}
+
+
+def child_archives_is_mainfile(parser, is_mainfile, filename):
     """
-    This function extracts the mass unit (g/mg/kg) from a string.
-    It returns a ureg.Quantity object with the mass unit.
+    Returns the keys of the child entries of `filename` if `parser` creates in-memory
+    child archives, otherwise the result `is_mainfile` of `MatchingParser.is_mainfile`.
     """
-    string = string.strip('([])').casefold()
-    if 'mg' in string:
-        return ureg.milligram
-    elif 'kg' in string:
-        return ureg.kilogram
-    elif string in ['g', 'gram']:
-        return ureg.gram
-    else:
-        raise ValueError('Mass unit not recognized.')
+    if not is_mainfile or not parser.use_child_archives:
+        return is_mainfile
+    return parser.get_mainfile_keys(filename) or True
 
 
 class CatalysisParser(MatchingParser):
+    def __init__(self, use_child_archives: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.use_child_archives = use_child_archives
+        self.creates_children = use_child_archives
+
+    def get_mainfile_keys(self, filename) -> list[str]:
+        return [filename.rsplit('/', maxsplit=1)[-1].split('.')[0]]
+
+    def is_mainfile(self, filename, mime, buffer, decoded_buffer, compression=None):
+        return child_archives_is_mainfile(
+            self,
+            super().is_mainfile(filename, mime, buffer, decoded_buffer, compression),
+            filename,
+        )
+
     def parse(
         self,
         mainfile: str,
@@ -75,49 +95,90 @@ class CatalysisParser(MatchingParser):
             data_file=filename,
         )
 
-        archive.data = RawFileData(
-            measurement=create_archive(
+        if child_archives:
+            measurement = ChildArchiveWriter(archive, child_archives).write(
+                [catalytic_reaction], [name]
+            )[0]
+        else:
+            measurement = create_archive(
                 catalytic_reaction, archive, f'{name}.archive.json'
             )
-        )
+        archive.data = RawFileData(measurement=measurement)
         archive.metadata.entry_name = f'{name} data file'
 
 
 class CatalysisCollectionParser(MatchingParser):
-    def unify_columnnames(self, data_frame) -> pd.DataFrame:
+    def __init__(
+        self,
+        streaming: bool = False,
+        chunk_size: int = 10000,
+        use_child_archives: bool = False,
+        timing_report: bool = False,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.streaming = streaming
+        self.chunk_size = chunk_size
+        self.use_child_archives = use_child_archives
+        self.timing_report = timing_report
+        self.creates_children = use_child_archives
+
+    def get_mainfile_keys(self, filename) -> list[str]:
         """
-        This function unifies the column names of the data frame to a common format
-        by renaming the columns to a standard format that is used in the rest of
-        the code *for a sample entry*. Here, the column 'name' is droped if a
-        column 'catalyst' is present, as the focus is on the sample entry which is
-        the catalyst.
+        This function reads the names of the reactions and samples in the collection
+        file and returns the keys of their child entries. Only the name columns are
+        read. A file without them has no keys, it fails later when it is parsed.
         """
 
-        for col in data_frame.columns:
-            if col in ['catalyst name', 'catalyst_name', 'catalyst']:
-                try:
-                    data_frame.drop(columns=['name'], inplace=True)
-                except KeyError:
-                    pass
-                data_frame.rename(columns={col: 'name'}, inplace=True)
-            if col in ['storing institution', 'storing_institute']:
-                data_frame.rename(columns={col: 'storing_institution'}, inplace=True)
-            if col in ['date', 'sample date']:
-                data_frame.rename(columns={col: 'datetime'}, inplace=True)
-            if col in ['lab-id', 'sample_id', 'catalyst_id']:
-                data_frame.rename(columns={col: 'lab_id'}, inplace=True)
-            if col in ['surface_area_method']:
-                data_frame.rename(
-                    columns={col: 'method_surface_area_determination'}, inplace=True
+        def is_name_column(col) -> bool:
+            col = str(col).strip().casefold()
+            return SAMPLE_COLUMN_NAMES.get(col, col) == 'name'
+
+        name = filename.rsplit('/', maxsplit=1)[-1].split('.')
+        keys = set()
+        for data_frame in self.read_data_frames(
+            filename, get_logger(__name__), usecols=is_name_column
+        ):
+            if 'CatalystSampleCollection' not in name[-2] and 'name' in data_frame:
+                keys.update(
+                    f'{reaction}_catalytic_reaction'
+                    for reaction in data_frame['name'].dropna()
+                )
+            samples = self.unify_columnnames(data_frame)
+            if 'CatalyticReactionCollection' not in name[-2] and 'name' in samples:
+                keys.update(
+                    f'{sample}_catalyst_sample' for sample in samples['name'].dropna()
                 )
-            if col in ['surface_area (m2/g)']:
-                data_frame.rename(columns={col: 'surface_area'}, inplace=True)
-            if col in ['preparation']:
-                data_frame.rename(columns={col: 'preparation_method'}, inplace=True)
-            if col in ['comment', 'comments']:
-                data_frame.rename(columns={col: 'description'}, inplace=True)
+        return sorted(keys)
+
+    def is_mainfile(self, filename, mime, buffer, decoded_buffer, compression=None):
+        return child_archives_is_mainfile(
+            self,
+            super().is_mainfile(filename, mime, buffer, decoded_buffer, compression),
+            filename,
+        )
+
+    def sample_column_names(self, columns) -> dict[str, str]:
+        """
+        This function maps the column names of the data frame to the common format
+        that is used in the rest of the code *for a sample entry*. Here, the column
+        'name' is skipped if a column 'catalyst' is present, as the focus is on the
+        sample entry which is the catalyst.
+        """
+        names = {col: SAMPLE_COLUMN_NAMES.get(col, col) for col in columns}
+        if 'name' in names and any(
+            unified == 'name' for col, unified in names.items() if col != 'name'
+        ):
+            del names['name']
+        return names
 
-        return data_frame
+    def unify_columnnames(self, data_frame) -> pd.DataFrame:
+        """
+        This function unifies the column names of the data frame to a common format
+        by renaming the columns as given by `sample_column_names`.
+        """
+        names = self.sample_column_names(data_frame.columns)
+        return data_frame[list(names)].rename(columns=names)
 
     def check_zero_elements(self, el, logger) -> bool:
         """
@@ -168,560 +229,407 @@ class CatalysisCollectionParser(MatchingParser):
                 continue
             catalyst_sample.elemental_composition.append(elemental_composition)
 
-    def extract_reaction_feed(self, row, logger) -> ReactionConditionsData:
+    def extract_reaction_feed(self, row, plan, logger) -> ReactionConditionsData:
         """
         This function extracts the reaction feed from a row of the data frame.
         It returns a ReactionConditionsData object with the feed information.
         """
         feed = ReactionConditionsData()
-        for key in row.keys():
-            col_split = key.split(' ')
-
-            if col_split[0].casefold() == 'set_temperature':
-                if 'k' in col_split[1]:
-                    feed.set_temperature = [np.nan_to_num(row[key])]
-                elif 'c' in col_split[1]:
-                    feed.set_temperature = [float(np.nan_to_num(row[key])) + 273.15]
-
-            if col_split[0].casefold() == 'tos' or (col_split[0].casefold() == 'time'):
-                unit = get_time_unit(col_split[1])
-                feed.time_on_stream = [np.nan_to_num(row[key])] * unit
-
-            if col_split[0] == 'ghsv':
-                if '1/h' in col_split[1] or 'h^-1' in col_split[1]:
-                    feed.gas_hourly_space_velocity = [
-                        np.nan_to_num(row[key])
-                    ] * ureg.hour**-1
-                else:
-                    logger.warning('Gas hourly space velocity unit not recognized.')
-
-            if col_split[0] == 'whsv':
-                if 'ml/g/h' in col_split[1] or 'ml/(g*h)' in col_split[1]:
-                    feed.weight_hourly_space_velocity = (
-                        [np.nan_to_num(row[key])]
-                        * ureg.milliliter
-                        / (ureg.gram * ureg.hour)
-                    )
-
-            if (col_split[0] == 'vflow' or col_split[0] == 'flow_rate') and (
-                'ml/min' in col_split[1] or 'mln' in col_split[1]
-            ):
-                feed.set_total_flow_rate = (
-                    [np.nan_to_num(row[key])] * ureg.milliliter / ureg.minute
-                )
-
-            if col_split[0] == 'set_pressure' and 'bar' in col_split[1]:
-                feed.set_pressure = [np.nan_to_num(row[key])] * ureg.bar
+        for spec in plan.feed:
+            if spec.key in row:
+                setattr(feed, spec.field, [row[spec.key]])
 
         return feed
 
-    def extract_catalytic_results(self, row, logger) -> CatalyticReactionData:
+    def extract_catalytic_results(self, row, plan, logger) -> CatalyticReactionData:
         """
         This function extracts the catalytic results from a row of the data frame.
         It returns a CatalyticReactionData object with the results information.
         """
         cat_data = CatalyticReactionData()
-
-        for key in row.keys():
-            col_split = key.split(' ')
-
-            if key == 'c-balance':
-                cat_data.c_balance = [np.nan_to_num(row[key])]
-            elif col_split[0] == 'c-balance' and ('%' in col_split[1]):
-                cat_data.c_balance = [np.nan_to_num(row[key])] / 100
-
-            if col_split[0] == 'temperature':
-                if 'k' in col_split[1]:
-                    cat_data.temperature = [np.nan_to_num(row[key])]
-                elif 'c' in col_split[1]:
-                    cat_data.temperature = [float(np.nan_to_num(row[key])) + 273.15]
-                else:
-                    logger.warning('Temperature unit not recognized.')
-
-            if col_split[0] == 'pressure':
-                if 'bar' in col_split[1]:
-                    cat_data.pressure = [np.nan_to_num(row[key])] * ureg.bar
-                else:
-                    logger.warning('Pressure unit not recognized.')
-
-            if col_split[0] == 'tos' or col_split[0] == 'time':
-                unit = get_time_unit(col_split[1])
-                cat_data.time_on_stream = [np.nan_to_num(row[key])] * unit
+        for spec in plan.results:
+            if spec.key in row:
+                setattr(cat_data, spec.field, [row[spec.key]])
 
         return cat_data
 
-    def extract_reactor_setup(self, row, logger) -> ReactorSetup:
+    def extract_reactor_setup(self, row, plan, logger) -> ReactorSetup:
         """
         This function extracts the reactor setup information from a row of the data
         frame. It returns a ReactorSetup object with the reactor setup information.
         """
         reactor_setup = ReactorSetup()
-
-        for key in row.keys():
-            col_split = key.split(' ')
-
-            if key == 'reactor_type':
-                reactor_setup.reactor_type = row[key]
-            if key.startswith('reactor_volume'):
-                unit = col_split[1].strip('()')
-                try:
-                    reactor_setup.reactor_volume = ureg.Quantity(
-                        np.nan_to_num(row[key]), unit
-                    )
-                except Exception as e:
-                    logger.warning(f"""Reactor volume unit {unit} not recognized.
-                                Error: {e}""")
-            if key.startswith('reactor_diameter'):
-                unit = col_split[1].strip('()')
-                try:
-                    reactor_setup.reactor_diameter = ureg.Quantity(
-                        np.nan_to_num(row[key]), unit
-                    )
-                except Exception as e:
-                    logger.warning(f"""Reactor diameter unit {unit} not recognized.
-                                Error: {e}""")
-            if key == 'reactor_lab_id':
-                reactor_setup.lab_id = row[key]
-            if key == 'reactor_name':
-                reactor_setup.name = row[key]
+        for spec in plan.reactor_setup:
+            if spec.key in row:
+                setattr(reactor_setup, spec.field, row[spec.key])
 
         return reactor_setup
 
-    def extract_pretreatment(self, row, logger) -> ReactionConditionsData:  # noqa: PLR0912, PLR0915
+    def extract_pretreatment(self, row, plan, logger) -> ReactionConditionsData:
         """
         This function extracts the pretreatment information from a row of the data
         frame. It returns a ReactorFilling object with the pretreatment information.
         """
         pretreatment = ReactionConditionsData()
-        pretreatment_reagents = []
+        pretreatment_values = {}
+        pretreatment_reagents = {}
         logger.info('Extracting pretreatment information from the data frame')
-        for key in row.keys():
-            col_split = key.split(' ')
-
-            if col_split[0] == 'pretreatment':
-                if col_split[1].startswith('set_temperature'):
-                    if pretreatment.set_temperature is None:
-                        pretreatment_temperature = [row[key]]
-                    else:
-                        pretreatment_temperature.append(row[key])
-                    if 'c' in col_split[2]:
-                        pretreatment_temperature_np = np.array(pretreatment_temperature)
-                        pretreatment.set_temperature = (
-                            pretreatment_temperature_np + 273.15
-                        )
-                    elif 'k' in col_split[2]:
-                        pretreatment.set_temperature = pretreatment_temperature
-                    else:
-                        logger.warning('Temperature unit not recognized.')
-
-                if col_split[1].startswith('time'):
-                    if pretreatment.time_on_stream is None:
-                        tos = []
-                    if len(col_split) == 3:  # noqa: PLR2004
-                        unit = get_time_unit(col_split[2])
-                    else:
-                        logger.error('Time unit missing.')
-                    tos.append(np.nan_to_num(row[key]))
-                    pretreatment.time_on_stream = tos * unit
-                if col_split[1].startswith('set_pressure'):
-                    if not pretreatment.set_pressure:
-                        pretreatment.set_pressure = []
-                    if 'bar' in col_split[2]:
-                        pretreatment.set_pressure.append(
-                            np.nan_to_num(row[key])
-                        )  # * ureg.bar
-                    else:
-                        logger.warning('Pressure unit not recognized.')
-                if col_split[1].startswith('set_flow_rate'):
-                    if not pretreatment.set_total_flow_rate:
-                        pretreatment.set_total_flow_rate = []
-                    if 'ml/min' in col_split[2] or 'mln' in col_split[2]:
-                        total_flow = np.append(
-                            pretreatment.set_total_flow_rate.to(
-                                'milliliter/minute'
-                            ).magnitude,
-                            row[key],
-                        )
-                        pretreatment.set_total_flow_rate = (
-                            total_flow * ureg.milliliter / ureg.minute
-                        )
-                    else:
-                        logger.warning(f'Flow rate unit not recognized from {key}.')
-                if col_split[1].startswith('gas_flow'):
-                    try:
-                        if len(col_split) == 4 and (  # noqa: PLR2004
-                            'ml/min' in col_split[3] or 'mln' in col_split[3]
-                        ):
-                            if col_split[2] not in pretreatment_reagents:
-                                reagent = Reagent(
-                                    name=col_split[2],
-                                    flow_rate=(
-                                        [np.nan_to_num(row[key])]
-                                        * ureg.milliliter
-                                        / ureg.minute
-                                    ),
-                                )
-                                pretreatment_reagents.append(col_split[2])
-                                pretreatment.reagents.append(reagent)
-                            else:
-                                index = pretreatment_reagents.index(col_split[2])
-                                gas_flow = np.append(
-                                    pretreatment.reagents[index]
-                                    .flow_rate.to('milliliter/minute')
-                                    .magnitude,
-                                    row[key],
-                                )
-                                pretreatment.reagents[index].flow_rate = (
-                                    gas_flow * ureg.milliliter / ureg.minute
-                                )
-                        else:
-                            logger.warning(f'unit in {key} missing or not recognized.')
-
-                    except KeyError:
-                        logger.warning(f'Gas flow for {key} not recognized.')
+        for spec in plan.pretreatment:
+            if spec.key not in row:
+                continue
+            value = row[spec.key]
+            if spec.field == 'flow_rate':
+                pretreatment_reagents.setdefault(spec.name, []).append(value)
+            else:
+                pretreatment_values.setdefault(spec.field, []).append(value)
+
+        for field_name, values in pretreatment_values.items():
+            setattr(pretreatment, field_name, np.array(values))
+        for name, flow_rates in pretreatment_reagents.items():
+            pretreatment.reagents.append(
+                Reagent(name=name, flow_rate=np.array(flow_rates))
+            )
 
         return pretreatment
 
-    def extract_reaction_entries(self, data_frame, archive, logger) -> None:  # noqa: PLR0912, PLR0915
-        "This function extracts information for catalytic reaction entries with a"
-        'single measurement from the data frame and adds them to the archive.'
-        reactions = []
-
-        data_frame.dropna(axis=1, how='all', inplace=True)
-        for n, row in data_frame.iterrows():
-            row.dropna(inplace=True)
-
-            reaction = CatalyticReaction()
-            reactor_filling = ReactorFilling()
-            sample = CompositeSystemReference()
-
-            reagents = []
-            reagent_names = []
-            products = []
-            product_names = []
-            conversions = []
-            conversion_names = []
-            rates = []
-
-            if 'reaction_type' in row.keys():
-                reaction.reaction_type = []
-                types = row['reaction_type'].split(',')
-                if isinstance(types, list):
-                    reaction.reaction_type.extend(types)
-                else:
-                    reaction.reaction_type.append(types)
-            for key in [
-                'datetime',
-                'lab_id',
-                'description',
-                'reaction_name',
-                'experimenter',
-                'location',
-            ]:
-                if key in row.keys():
-                    setattr(reaction, key, row[key])
-
-            if 'datafile' in row.keys():
-                reaction.data_file = row['datafile']
-
-                reactions.append(
-                    create_archive(
-                        reaction,
-                        archive,
-                        f'{row["name"]}_catalytic_reaction.archive.json',
-                    )
-                )
+    def extract_reaction(self, row, plan, logger) -> CatalyticReaction:  # noqa: PLR0912, PLR0915
+        """
+        This function extracts a catalytic reaction with a single measurement from a
+        row of the data frame. The row is a dict of the non-empty cells as yielded by
+        `ColumnPlan.rows`.
+        """
+        reaction = CatalyticReaction()
+        reactor_filling = ReactorFilling()
+        sample = CompositeSystemReference()
+
+        reagents = []
+        reagent_names = []
+        products = []
+        conversions = []
+        rates = []
+
+        if 'reaction_type' in row:
+            reaction.reaction_type = []
+            types = row['reaction_type'].split(',')
+            if isinstance(types, list):
+                reaction.reaction_type.extend(types)
+            else:
+                reaction.reaction_type.append(types)
+        for key in [
+            'datetime',
+            'lab_id',
+            'description',
+            'reaction_name',
+            'experimenter',
+            'location',
+        ]:
+            if key in row:
+                setattr(reaction, key, row[key])
+
+        if 'datafile' in row:
+            reaction.data_file = row['datafile']
+            return reaction
+
+        feed = self.extract_reaction_feed(row, plan, logger)
+        cat_data = self.extract_catalytic_results(row, plan, logger)
+        reactor_setup = self.extract_reactor_setup(row, plan, logger)
+        pretreatment = self.extract_pretreatment(row, plan, logger)
+
+        for spec in plan.reaction:
+            if spec.key not in row:
                 continue
-
-            feed = self.extract_reaction_feed(row, logger)
-            cat_data = self.extract_catalytic_results(row, logger)
-            reactor_setup = self.extract_reactor_setup(row, logger)
-            pretreatment = self.extract_pretreatment(row, logger)
-
-            for key in row.keys():
-                col_split = key.split(' ')
-
-                if key in ['catalyst', 'catalyst_name']:
-                    setattr(sample, 'name', row[key])
-                    setattr(reactor_filling, 'catalyst_name', str(row[key]))
-                if key in ['sample_id', 'catalyst_id']:
-                    setattr(sample, 'lab_id', row[key])
-
-                # if len(col_split) < 2:  # noqa: PLR2004
-                #     continue
-
-                if col_split[0].casefold() == 'x':
-                    if len(col_split) == 3 and ('%' in col_split[2]):  # noqa: PLR2004
-                        try:
-                            gas_in = [np.nan_to_num(float(row[key])) / 100.0]
-                        except (ValueError, TypeError) as e:
-                            logger.warning(f"""Non-numeric value for {key}: {row[key]}.
-                                           Error: {e}.""")
-                            gas_in = [np.nan]
-                    else:
-                        gas_in = [row[key]]
-                    reagent = Reagent(name=col_split[1], fraction_in=gas_in)
-                    reagent_names.append(col_split[1])
-                    reagents.append(reagent)
-
-                if col_split[0].casefold() == 'mass':
-                    unit = get_mass_unit(col_split[1])
-                    try:
-                        reactor_filling.catalyst_mass = row[key] * unit
-                    except Exception as e:
-                        logger.warning(f"""Catalyst mass unit {col_split[1]} not
-                                       recognized. Error: {e}""")
-                if key == 'diluent':
-                    reactor_filling.diluent = row[key]
-                    for key2 in row.keys():
-                        if key2.startswith('diluent_mass'):
-                            col_split = key2.split(' ')
-                            unit = get_mass_unit(col_split[1])
-                            try:
-                                reactor_filling.diluent_mass = row[key2] * unit
-                            except Exception as e:
-                                logger.warning(f"""Diluents mass unit {col_split[1]} not
-                                               recognized. Error: {e}""")
-
-                if len(col_split) < 3:  # noqa: PLR2004
-                    continue
-
-                if col_split[0] == 'r':  # reaction rate
-                    unit = col_split[2].strip('()')
-                    unit_conversion = {
-                        'mmol/g/h': 'mmol / (g * hour)',
-                        'mmol/g/min': 'mmol / (g * minute)',
-                        'µmol/g/min': 'µmol / (g * minute)',
-                        'mmolg^-1h^-1': 'mmol / (g * hour)',
-                    }
-                    try:
-                        rate = RatesData(
-                            name=col_split[1],
-                            reaction_rate=ureg.Quantity(
-                                [np.nan_to_num(row[key])],
-                                unit_conversion.get(unit, unit),
-                            ),
-                        )
-                    except Exception as e:
-                        logger.warning(f"""Reaction rate unit {unit} not recognized.
-                                    Error: {e}""")
-                    rates.append(rate)
-
-                if col_split[0] == 'r_specific_mass':  # specific reaction rate
-                    unit = col_split[2].strip('()')
-                    unit_conversion = {
-                        'mol/(h*gmetal': 'mol / (hour * g)',
-                    }
-                    try:
-                        rate = RatesData(
-                            name=col_split[1],
-                            specific_mass_rate=ureg.Quantity(
-                                [np.nan_to_num(row[key])],
-                                unit_conversion.get(unit, unit),
-                            ),
-                        )
-                    except Exception as e:
-                        logger.warning(f"""Specific reaction rate per mass unit {unit}
-                            not recognized. Error: {e}""")
-                    rates.append(rate)
-
-                if col_split[2] != '(%)':
-                    continue
-
-                if col_split[0] == 'x_p':  # conversion, based on product detection
+            value = row[spec.key]
+
+            if spec.field == 'catalyst_name':
+                setattr(sample, 'name', value)
+                setattr(reactor_filling, 'catalyst_name', str(value))
+            elif spec.field == 'sample_id':
+                setattr(sample, 'lab_id', value)
+            elif spec.field == 'diluent':
+                reactor_filling.diluent = value
+            elif spec.field == 'catalyst_mass':
+                reactor_filling.catalyst_mass = value
+            elif spec.field == 'diluent_mass':
+                if 'diluent' in row:
+                    reactor_filling.diluent_mass = value
+
+            elif spec.field == 'fraction_in':
+                reagent_names.append(spec.name)
+                reagents.append(Reagent(name=spec.name, fraction_in=[value]))
+
+            elif spec.field in ['reaction_rate', 'specific_mass_rate']:
+                rate = RatesData(name=spec.name)
+                setattr(rate, spec.field, [value])
+                rates.append(rate)
+
+            elif spec.field == 'conversion_product_based':
+                conversion = ReactantData(name=spec.name)
+                for i, p in enumerate(conversions):
+                    if p.name == spec.name:
+                        conversion = conversions.pop(i)
+
+                conversion.conversion_product_based = [value]
+                conversion.conversion = [value]
+                conversion.conversion_type = 'product-based conversion'
+                conversions.append(conversion)
+
+            elif spec.field == 'conversion_reactant_based':
+                conversion = ReactantData(
+                    name=spec.name,
+                    conversion=[value],
+                    conversion_type='reactant-based conversion',
+                    conversion_reactant_based=[value],
+                    fraction_in=plan.fraction_in(row, spec.name),
+                )
+                for i, p in enumerate(conversions):
+                    if p.name == spec.name:
+                        conversion = conversions.pop(i)
+                        conversion.conversion_reactant_based = [value]
+                conversions.append(conversion)
+
+            elif spec.field == 'fraction_out':  # concentration out
+                if spec.name in reagent_names:
                     conversion = ReactantData(
-                        name=col_split[1],
-                        conversion=[np.nan_to_num(row[key])],
-                        conversion_type='product-based conversion',
-                        conversion_product_based=[np.nan_to_num(row[key])],
+                        name=spec.name,
+                        fraction_in=plan.fraction_in(row, spec.name),
+                        fraction_out=[value],
                     )
-                    for i, p in enumerate(conversions):
-                        if p.name == col_split[1]:
-                            conversion = conversions.pop(i)
-
-                    conversion.conversion_product_based = [np.nan_to_num(row[key])]
-                    conversion.conversion = [np.nan_to_num(row[key])]
-                    conversion.conversion_type = 'product-based conversion'
-
-                    conversion_names.append(col_split[1])
-                    conversions.append(conversion)
-
-                if col_split[0] == 'x_r':  # conversion, based on reactant detection
-                    try:
-                        conversion = ReactantData(
-                            name=col_split[1],
-                            conversion=[np.nan_to_num(row[key])],
-                            conversion_type='reactant-based conversion',
-                            conversion_reactant_based=[np.nan_to_num(row[key])],
-                            fraction_in=[
-                                np.nan_to_num(float(row['x ' + col_split[1] + ' (%)']))
-                                / 100
-                            ],
-                        )
-                    except KeyError:
-                        conversion = ReactantData(
-                            name=col_split[1],
-                            conversion=[np.nan_to_num(row[key])],
-                            conversion_type='reactant-based conversion',
-                            conversion_reactant_based=[np.nan_to_num(row[key])],
-                            fraction_in=[np.nan_to_num(row['x ' + col_split[1]])],
-                        )
-
-                    for i, p in enumerate(conversions):
-                        if p.name == col_split[1]:
-                            conversion = conversions.pop(i)
-                            conversion.conversion_reactant_based = [
-                                np.nan_to_num(row[key])
-                            ]
                     conversions.append(conversion)
-
-                if col_split[0].casefold() == 'x_out':  # concentration out
-                    if col_split[1] in reagent_names:
-                        if '%' in key:
-                            fraction_in = [
-                                np.nan_to_num(float(row['x ' + col_split[1] + ' (%)']))
-                                / 100
-                            ]
-                            fraction_out = [np.nan_to_num(row[key]) / 100]
-                        else:
-                            fraction_in = [np.nan_to_num(row['x ' + col_split[1]])]
-                            fraction_out = [np.nan_to_num(row[key])]
-
-                        conversion = ReactantData(
-                            name=col_split[1],
-                            fraction_in=fraction_in,
-                            fraction_out=fraction_out,
-                        )
-
-                        conversions.append(conversion)
-                    else:
-                        product = ProductData(
-                            name=col_split[1],
-                            fraction_out=[np.nan_to_num(row[key])] / 100,
-                        )
-                        products.append(product)
-                        product_names.append(col_split[1])
-
-                if col_split[0].casefold() == 's_p':  # selectivity
+                else:
                     product = ProductData(
-                        name=col_split[1], selectivity=[np.nan_to_num(row[key])]
+                        name=spec.name,
+                        fraction_out=[value],
                     )
-                    for i, p in enumerate(products):
-                        if p.name == col_split[1]:
-                            product = products.pop(i)
-                            product.selectivity = [np.nan_to_num(row[key])]
-                            break
                     products.append(product)
-                    product_names.append(col_split[1])
 
-                if col_split[0].casefold() == 'y':  # product yield
-                    product = ProductData(
-                        name=col_split[1], product_yield=[np.nan_to_num(row[key])]
-                    )
-                    for i, p in enumerate(products):
-                        if p.name == col_split[1]:
-                            product = products.pop(i)
-                            product.product_yield = [np.nan_to_num(row[key])]
-                            break
-                    products.append(product)
-                    product_names.append(col_split[1])
-
-            reaction.samples = []
-            reaction.samples.append(sample)
-
-            cat_data.products = products
-            if conversions != []:
-                cat_data.reactants_conversions = conversions
-            if rates != []:
-                cat_data.rates = rates
-
-            feed.reagents = reagents
-
-            reaction.reaction_conditions = feed
-            reaction.results = []
-            reaction.results.append(cat_data)
-
-            if reactor_filling != []:
-                reaction.reactor_filling = reactor_filling
-            if reactor_setup:
-                reaction.instruments = []
-                reaction.instruments.append(reactor_setup)
-            if pretreatment:
-                reaction.pretreatment = pretreatment
-
-            reactions.append(
-                create_archive(
-                    reaction,
-                    archive,
-                    f'{row["name"]}_catalytic_reaction.archive.json',
-                )
-            )
-        reaction_references = []
-        for n, reaction in enumerate(reactions):
-            reaction_ref = SectionReference(
-                reference=reaction, name=data_frame['name'][n]
-            )
-            reaction_references.append(reaction_ref)
-        archive.data.measurements = reaction_references
+            elif spec.field in ['selectivity', 'product_yield']:
+                product = ProductData(name=spec.name)
+                for i, p in enumerate(products):
+                    if p.name == spec.name:
+                        product = products.pop(i)
+                        break
+                setattr(product, spec.field, [value])
+                products.append(product)
+
+        reaction.samples = []
+        reaction.samples.append(sample)
+
+        cat_data.products = products
+        if conversions != []:
+            cat_data.reactants_conversions = conversions
+        if rates != []:
+            cat_data.rates = rates
+
+        feed.reagents = reagents
+
+        reaction.reaction_conditions = feed
+        reaction.results = []
+        reaction.results.append(cat_data)
+
+        if reactor_filling != []:
+            reaction.reactor_filling = reactor_filling
+        if reactor_setup:
+            reaction.instruments = []
+            reaction.instruments.append(reactor_setup)
+        if pretreatment:
+            reaction.pretreatment = pretreatment
+
+        return reaction
+
+    def add_reaction_references(self, reactions, names, archive, writer=None) -> None:
+        """
+        This function creates the child entries of the reactions with the
+        ChildArchiveWriter `writer` and references them in the measurements of the
+        collection entry.
+        """
+        writer = writer or ChildArchiveWriter(archive)
+        keys = [f'{name}_catalytic_reaction' for name in names]
+        archive.data.measurements.extend(
+            SectionReference(reference=reference, name=name)
+            for reference, name in zip(writer.write(reactions, keys), names)
+        )
+
+    def extract_reaction_entries(  # noqa: PLR0913
+        self, data_frames, archive, logger, writer=None, timer=None
+    ) -> None:
+        """
+        This function extracts information for catalytic reaction entries with a
+        single measurement from the data frames and adds them to the archive. The
+        data frames are chunks of the same file, the column plan is compiled from
+        the first chunk and the entries are written chunk by chunk.
+        """
+        timer = timer or ParseTimer(enabled=False)
+        plan = None
+        for data_frame in data_frames:
+            if plan is None:
+                with timer.stage('compile_plan'):
+                    plan = compile_column_plan(data_frame.columns, logger)
+            reactions = []
+            names = []
+            rows = plan.rows(data_frame, logger)
+            for n, row in timer.iterate('convert_columns', rows):
+                with timer.stage('extract_reactions'):
+                    reactions.append(self.extract_reaction(row, plan, logger))
+                names.append(row['name'])
+            self.add_reaction_references(reactions, names, archive, writer)
+
+    def extract_sample(self, row, logger) -> CatalystSample:
+        """
+        This function extracts a catalyst sample from a row with unified column
+        names. It returns a CatalystSample object.
+        """
+        catalyst_sample = CatalystSample()
+        surface = SurfaceArea()
+        preparation_details = Preparation()
+
+        for key in [
+            'name',
+            'storing_institution',
+            'datetime',
+            'lab_id',
+            'form',
+            'support',
+            'description',
+            'formula_descriptive',
+        ]:
+            if key in row.keys():
+                setattr(catalyst_sample, key, row[key])
+        if 'catalyst_type' in row.keys():
+            catalyst_sample.catalyst_type = []
+            catalyst_sample.catalyst_type.extend([row['catalyst_type']])
+        if 'elements' in row.keys() or 'element' in row.keys():
+            self.extract_elemental_composition(row, catalyst_sample, logger)
+
+        for key in ['preparation_method', 'preparator', 'preparing_institution']:
+            if key in row.keys():
+                setattr(preparation_details, key, row[key])
+        for key in [
+            'surface_area',
+            'method_surface_area_determination',
+            'dispersion',
+        ]:
+            if key in row.keys():
+                setattr(surface, key, row[key])
+
+        if preparation_details.m_to_dict():
+            catalyst_sample.preparation_details = preparation_details
+        if surface.m_to_dict():
+            catalyst_sample.surface = surface
+
+        return catalyst_sample
+
+    def add_sample_references(self, samples, names, archive, writer=None) -> None:
+        """
+        This function creates the child entries of the samples with the
+        ChildArchiveWriter `writer` and references them in the samples of the
+        collection entry.
+        """
+        writer = writer or ChildArchiveWriter(archive)
+        keys = [f'{name}_catalyst_sample' for name in names]
+        archive.data.samples.extend(
+            CompositeSystemReference(reference=reference)
+            for reference in writer.write(samples, keys)
+        )
 
-    def extract_sample_entries(
-        self, data_frame, archive, logger
-    ) -> list[CatalystSample]:
+    def extract_sample_entries(  # noqa: PLR0913
+        self, data_frames, archive, logger, writer=None, timer=None
+    ) -> None:
         """This function extracts information for catalyst sample entries from the
-        data frame and adds them to the archive. It returns a list of CatalystSample
-        objects."""
+        data frames and adds them to the archive chunk by chunk."""
         logger.info('Extracting sample entries from the data frame')
+        timer = timer or ParseTimer(enabled=False)
+
+        for data_frame in data_frames:
+            samples = []
+            names = []
+            with timer.stage('extract_samples'):
+                for n, row in self.unify_columnnames(data_frame).iterrows():
+                    row.dropna(inplace=True)
+                    samples.append(self.extract_sample(row, logger))
+                    names.append(row['name'])
+            self.add_sample_references(samples, names, archive, writer)
+
+    def extract_collection_entries(  # noqa: PLR0913
+        self, data_frames, archive, logger, writer=None, timer=None
+    ) -> None:
+        """
+        This function extracts the catalytic reaction and the catalyst sample entries
+        of a catalysis collection in a single pass over the data frames. Both share
+        the column plan and the non-empty cells of each row, the sample entries read
+        the cells by their unified column names. If the sample entries cannot be
+        extracted, the reaction entries are still added to the archive.
+        """
+        timer = timer or ParseTimer(enabled=False)
+        plan = None
+        samples_failed = False
+        for data_frame in data_frames:
+            if plan is None:
+                with timer.stage('compile_plan'):
+                    plan = compile_column_plan(data_frame.columns, logger)
+                    sample_columns = self.sample_column_names(data_frame.columns)
+
+            reactions = []
+            reaction_names = []
+            samples = []
+            sample_names = []
+            rows = plan.rows(data_frame, logger)
+            for n, row in timer.iterate('convert_columns', rows):
+                with timer.stage('extract_reactions'):
+                    reactions.append(self.extract_reaction(row, plan, logger))
+                    reaction_names.append(row['name'])
+                if samples_failed:
+                    continue
+                sample_row = {
+                    unified: row[col]
+                    for col, unified in sample_columns.items()
+                    if col in row
+                }
+                try:
+                    with timer.stage('extract_samples'):
+                        samples.append(self.extract_sample(sample_row, logger))
+                        sample_names.append(sample_row['name'])
+                except Exception as e:
+                    logger.error(f'Error extracting sample entries: {e}')
+                    samples_failed = True
 
-        samples = []
-        for n, row in data_frame.iterrows():
-            row.dropna(inplace=True)
-            catalyst_sample = CatalystSample()
-            surface = SurfaceArea()
-            preparation_details = Preparation()
-
-            for key in [
-                'name',
-                'storing_institution',
-                'datetime',
-                'lab_id',
-                'form',
-                'support',
-                'description',
-                'formula_descriptive',
-            ]:
-                if key in row.keys():
-                    setattr(catalyst_sample, key, row[key])
-            if 'catalyst_type' in row.keys():
-                catalyst_sample.catalyst_type = []
-                catalyst_sample.catalyst_type.extend([row['catalyst_type']])
-                # setattr(catalyst_sample, key, row['catalyst_type'])
-            if 'elements' in row.keys() or 'element' in row.keys():
-                self.extract_elemental_composition(row, catalyst_sample, logger)
-
-            for key in ['preparation_method', 'preparator', 'preparing_institution']:
-                if key in row.keys():
-                    setattr(preparation_details, key, row[key])
-            for key in [
-                'surface_area',
-                'method_surface_area_determination',
-                'dispersion',
-            ]:
-                if key in row.keys():
-                    setattr(surface, key, row[key])
-
-            if preparation_details.m_to_dict():
-                catalyst_sample.preparation_details = preparation_details
-            if surface.m_to_dict():
-                catalyst_sample.surface = surface
-
-            samples.append(
-                create_archive(
-                    catalyst_sample,
-                    archive,
-                    f'{row["name"]}_catalyst_sample.archive.json',
-                )
-            )
-        return samples
+            self.add_reaction_references(reactions, reaction_names, archive, writer)
+            if not samples_failed:
+                self.add_sample_references(samples, sample_names, archive, writer)
+
+    def read_tables(self, mainfile, logger, usecols=None) -> Iterator[pd.DataFrame]:
+        if self.streaming:
+            logger.info(f'Reading {mainfile} in chunks of {self.chunk_size} rows')
+            yield from read_table_chunks(mainfile, self.chunk_size, usecols)
+            return
+        if mainfile.endswith('.xlsx'):
+            data_frame = pd.read_excel(mainfile, usecols=usecols)
+        else:
+            data_frame = pd.read_csv(mainfile, usecols=usecols)
+        logger.info(f'Parsing {mainfile} with {data_frame.shape[0]} rows')
+        yield data_frame
+
+    def read_data_frames(
+        self, mainfile, logger, timer=None, usecols=None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        This function reads the collection file into data frames with casefolded
+        column names. In streaming mode the file is read in chunks of `chunk_size`
+        rows, otherwise the whole file is read into a single data frame. With
+        `usecols`, only the columns for whose name it returns True are read.
+        """
+        timer = timer or ParseTimer(enabled=False)
+        tables = self.read_tables(mainfile, logger, usecols)
+        for data_frame in timer.iterate('read', tables):
+            with timer.stage('normalize_columns'):
+                data_frame.columns = [
+                    col.strip().casefold() for col in data_frame.columns
+                ]
+                if not self.streaming:
+                    data_frame.dropna(axis=1, how='all', inplace=True)
+            timer.count('chunks')
+            timer.count('rows', data_frame.shape[0])
+            timer.set('columns', data_frame.shape[1])
+            yield data_frame
 
     def parse(
         self,
@@ -740,20 +648,32 @@ class CatalysisCollectionParser(MatchingParser):
         )
         archive.metadata.entry_name = f'{name[0]} data file'
 
-        if name[-1] == 'xlsx':
-            data_frame = pd.read_excel(mainfile)
-        elif name[-1] == 'csv':
-            data_frame = pd.read_csv(mainfile)
-        else:
+        if name[-1] not in ['xlsx', 'csv']:
             return
-        logger.info(f'Parsing {filename} with {data_frame.shape[0]} rows')
+        timer = ParseTimer(enabled=self.timing_report)
+        try:
+            self.extract_entries(mainfile, archive, logger, child_archives, timer)
+        finally:
+            timer.log(
+                logger,
+                'Catalysis collection parse report',
+                mainfile=filename,
+                streaming=self.streaming,
+            )
 
-        for col in data_frame.columns:
-            col_small = col.strip().casefold()
-            data_frame.rename(columns={col: col_small}, inplace=True)
+    def extract_entries(self, mainfile, archive, logger, child_archives, timer) -> None:
+        """
+        This function extracts the entries of a collection file depending on the
+        collection type in its name and adds them to the archive.
+        """
+        filename = mainfile.rsplit('/', maxsplit=1)[-1]
+        name = filename.split('.')
+        data_frames = self.read_data_frames(mainfile, logger, timer)
+        writer = ChildArchiveWriter(archive, child_archives, timer)
 
         if 'CatalyticReactionCollection' in name[-2]:
-            self.extract_reaction_entries(data_frame, archive, logger)
+            self.extract_reaction_entries(data_frames, archive, logger, writer, timer)
+            writer.save()
             logger.info(
                 f"""File {filename} matches the expected format for a reaction
                 collection. Reaction entries are successfully extracted."""
@@ -761,51 +681,28 @@ class CatalysisCollectionParser(MatchingParser):
             return
         elif 'CatalystSampleCollection' in name[-2]:
             try:
-                data_frame = self.unify_columnnames(data_frame)
-                samples = self.extract_sample_entries(data_frame, archive, logger)
+                self.extract_sample_entries(data_frames, archive, logger, writer, timer)
+                writer.save()
                 logger.info(
                     f"""File {filename} matches the expected format for a catalysis
                     collection. Sample entries successfully extracted."""
                 )
-                samples_references = []
-                for sample in samples:
-                    sample_ref = CompositeSystemReference(
-                        reference=sample,
-                    )
-                    samples_references.append(sample_ref)
-                archive.data.samples = samples_references
                 return
             except Exception as e:
                 logger.error(f'Error extracting sample entries: {e}')
 
         elif 'CatalysisCollection' in name[-2]:
             try:
-                self.extract_reaction_entries(data_frame, archive, logger)
-                logger.info(
-                    f"""File {filename} matches the expected format for a catalysis
-                    collection. Reaction entries successfully extracted. And sample
-                    entries will be extracted next"""
+                self.extract_collection_entries(
+                    data_frames, archive, logger, writer, timer
                 )
-            except Exception as e:
-                logger.error(f'Error extracting reaction entries: {e}')
-                return
-
-            try:
-                data_frame = self.unify_columnnames(data_frame)
-                samples = self.extract_sample_entries(data_frame, archive, logger)
+                writer.save()
                 logger.info(
                     f"""File {filename} matches the expected format for a catalysis
-                    collection. Sample entries successfully extracted."""
+                    collection. Reaction and sample entries successfully
+                    extracted."""
                 )
-                samples_references = []
-                for sample in samples:
-                    sample_ref = CompositeSystemReference(
-                        reference=sample,
-                    )
-                    samples_references.append(sample_ref)
-                archive.data.samples = samples_references
-
             except Exception as e:
-                logger.error(f'Error extracting sample entries: {e}')
+                logger.error(f'Error extracting collection entries: {e}')
 
         return
@@ -0,0 +1,441 @@
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from functools import cache
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from nomad.units import ureg
+
+from nomad_catalysis.schema_packages.catalysis import (
+    CatalyticReactionData,
+    RatesData,
+    ReactionConditionsData,
+    ReactorFilling,
+    ReactorSetup,
+    Reagent,
+)
+from nomad_catalysis.schema_packages.units import (
+    FLOW_RATE_UNIT,
+    get_mass_unit,
+    get_rate_unit,
+    get_scale_factor,
+    get_specific_mass_rate_unit,
+    get_temperature_unit,
+    get_time_unit,
+    get_unit,
+)
+
+TEXT_FIELDS = [
+    'catalyst_name',
+    'sample_id',
+    'diluent',
+    'reactor_type',
+    'lab_id',
+    'name',
+]
+
+TARGET_SECTIONS = [
+    ReactionConditionsData,
+    CatalyticReactionData,
+    ReactorSetup,
+    ReactorFilling,
+    Reagent,
+    RatesData,
+]
+
+
+@cache
+def get_target_unit(field_name: str) -> Any:
+    """
+    Returns the unit of the quantity `field_name` in the sections that are filled by
+    the collection parser or None if the quantity is unitless.
+    """
+    for section in TARGET_SECTIONS:
+        quantity = section.m_def.all_quantities.get(field_name)
+        if quantity is not None:
+            return quantity.unit
+    return None
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    """
+    The compiled description of a single column of a collection data frame.
+
+    Attributes:
+        key: the column name in the data frame.
+        field: the quantity of the target section that the column is written to.
+        name: the reagent, product or rate name encoded in the column header.
+        unit: the unit of the column values or None for unitless and text columns.
+        divisor: a divisor applied to the values, e.g. 100 for values in percent.
+        offset: an offset added to the values, e.g. 273.15 for values in Celsius.
+    """
+
+    key: str
+    field: str
+    name: str | None = None
+    unit: Any = None
+    divisor: float = 1.0
+    offset: float = 0.0
+
+    @property
+    def numeric(self) -> bool:
+        return self.field not in TEXT_FIELDS
+
+    def convert(self, value):
+        """
+        Converts a value or a whole column of values into the magnitude in the unit of
+        the target quantity by applying divisor and offset and converting the unit of
+        the column. NaN values stay NaN.
+        """
+        value = np.asarray(value, dtype=float)
+        if self.divisor != 1.0:
+            value = value / self.divisor
+        if self.offset:
+            value = value + self.offset
+        target_unit = get_target_unit(self.field)
+        if self.unit is not None and target_unit is not None:
+            value = value * get_scale_factor(self.unit, target_unit)
+        return value
+
+
+@dataclass
+class ColumnPlan:
+    """
+    The typed column plan of a collection data frame. The column headers are compiled
+    once per file and the specs are grouped by the extractor that consumes them. Each
+    group keeps the column order of the data frame.
+    """
+
+    columns: list[str] = field(default_factory=list)
+    feed: list[ColumnSpec] = field(default_factory=list)
+    results: list[ColumnSpec] = field(default_factory=list)
+    reactor_setup: list[ColumnSpec] = field(default_factory=list)
+    pretreatment: list[ColumnSpec] = field(default_factory=list)
+    reaction: list[ColumnSpec] = field(default_factory=list)
+    fraction_in_columns: dict[str, ColumnSpec] = field(default_factory=dict)
+
+    def numeric_specs(self) -> dict[str, ColumnSpec]:
+        """
+        Returns the specs of the numeric columns keyed by the column name.
+        """
+        specs = {}
+        for group in [
+            self.feed,
+            self.results,
+            self.reactor_setup,
+            self.pretreatment,
+            self.reaction,
+        ]:
+            for spec in group:
+                if spec.numeric:
+                    specs.setdefault(spec.key, spec)
+        return specs
+
+    def convert_columns(self, data_frame, logger) -> dict[str, tuple]:
+        """
+        Converts the columns of the data frame at once. Numeric columns are parsed
+        with `pd.to_numeric` and converted by their spec, all other columns are kept
+        as they are. Non-numeric values in a numeric column are replaced by NaN with
+        a single warning per column.
+
+        Returns:
+            A dict of the column name to a tuple of the mask of non-empty cells and
+            the converted values.
+        """
+        specs = self.numeric_specs()
+        columns = {}
+        for key in data_frame.columns:
+            series = data_frame[key]
+            present = series.notna().to_numpy()
+            spec = specs.get(key)
+            if spec is None:
+                columns[key] = (present, series.to_numpy(dtype=object))
+                continue
+            numbers = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float)
+            invalid = present & np.isnan(numbers)
+            if invalid.any():
+                logger.warning(
+                    f'Non-numeric values in column {key} in rows '
+                    f'{list(series.index[invalid])} are replaced by NaN.'
+                )
+            columns[key] = (present, spec.convert(numbers))
+        return columns
+
+    def rows(self, data_frame, logger) -> Iterator[tuple[Any, dict]]:
+        """
+        Converts the columns of the data frame at once and yields the index and a
+        dict of the non-empty cells for each row. Numeric values are plain floats in
+        the unit of the target quantity.
+        """
+        columns = self.convert_columns(data_frame, logger)
+        keys = list(columns)
+        if not keys:
+            return
+        present = np.column_stack([columns[key][0] for key in keys])
+        values = [columns[key][1] for key in keys]
+        for n, index in enumerate(data_frame.index):
+            yield (
+                index,
+                {keys[i]: values[i][n] for i in np.flatnonzero(present[n])},
+            )
+
+    def fraction_in(self, row, name: str):
+        """
+        Returns the inlet fraction of the reagent `name` from the `x` column of the
+        row or None if the row has no such value.
+        """
+        spec = self.fraction_in_columns.get(name)
+        if spec is None or spec.key not in row:
+            return None
+        return [row[spec.key]]
+
+
+def _temperature_spec(key, field_name, unit_token) -> ColumnSpec | None:
+    unit = get_temperature_unit(unit_token)
+    if unit == ureg.kelvin:
+        return ColumnSpec(key=key, field=field_name)
+    elif unit == ureg.celsius:
+        return ColumnSpec(key=key, field=field_name, offset=273.15)
+    return None
+
+
+def _compile_feed_and_results(plan, key, col_split, logger) -> None:  # noqa: PLR0912
+    prefix = col_split[0].casefold()
+    unit_token = col_split[1] if len(col_split) > 1 else ''
+
+    if prefix == 'set_temperature':
+        spec = _temperature_spec(key, 'set_temperature', unit_token)
+        if spec is not None:
+            plan.feed.append(spec)
+
+    if prefix in ['tos', 'time']:
+        try:
+            unit = get_time_unit(unit_token)
+        except ValueError:
+            logger.warning(f'Time unit of column {key} not recognized.')
+        else:
+            spec = ColumnSpec(key=key, field='time_on_stream', unit=unit)
+            plan.feed.append(spec)
+            plan.results.append(spec)
+
+    if prefix == 'ghsv':
+        if '1/h' in unit_token or 'h^-1' in unit_token:
+            plan.feed.append(
+                ColumnSpec(
+                    key=key, field='gas_hourly_space_velocity', unit=ureg.hour**-1
+                )
+            )
+        else:
+            logger.warning('Gas hourly space velocity unit not recognized.')
+
+    if prefix == 'whsv' and ('ml/g/h' in unit_token or 'ml/(g*h)' in unit_token):
+        plan.feed.append(
+            ColumnSpec(
+                key=key,
+                field='weight_hourly_space_velocity',
+                unit=ureg.milliliter / (ureg.gram * ureg.hour),
+            )
+        )
+
+    if prefix in ['vflow', 'flow_rate'] and (
+        'ml/min' in unit_token or 'mln' in unit_token
+    ):
+        plan.feed.append(
+            ColumnSpec(key=key, field='set_total_flow_rate', unit=FLOW_RATE_UNIT)
+        )
+
+    if prefix == 'set_pressure' and 'bar' in unit_token:
+        plan.feed.append(ColumnSpec(key=key, field='set_pressure', unit=ureg.bar))
+
+    if key == 'c-balance':
+        plan.results.append(ColumnSpec(key=key, field='c_balance'))
+    elif prefix == 'c-balance' and '%' in unit_token:
+        plan.results.append(ColumnSpec(key=key, field='c_balance', divisor=100))
+
+    if prefix == 'temperature':
+        spec = _temperature_spec(key, 'temperature', unit_token)
+        if spec is not None:
+            plan.results.append(spec)
+        else:
+            logger.warning('Temperature unit not recognized.')
+
+    if prefix == 'pressure':
+        if 'bar' in unit_token:
+            plan.results.append(ColumnSpec(key=key, field='pressure', unit=ureg.bar))
+        else:
+            logger.warning('Pressure unit not recognized.')
+
+
+def _compile_reactor_setup(plan, key, col_split, logger) -> None:
+    if key in ['reactor_type', 'reactor_lab_id', 'reactor_name']:
+        field_name = {'reactor_lab_id': 'lab_id', 'reactor_name': 'name'}.get(key, key)
+        plan.reactor_setup.append(ColumnSpec(key=key, field=field_name))
+        return
+
+    for field_name in ['reactor_volume', 'reactor_diameter']:
+        if not key.startswith(field_name):
+            continue
+        unit = col_split[1] if len(col_split) > 1 else ''
+        try:
+            plan.reactor_setup.append(
+                ColumnSpec(key=key, field=field_name, unit=get_unit(unit))
+            )
+        except Exception as e:
+            logger.warning(f"""{field_name.replace('_', ' ').capitalize()} unit {unit}
+                           not recognized. Error: {e}""")
+
+
+def _compile_pretreatment(plan, key, col_split, logger) -> None:  # noqa: PLR0912
+    if col_split[0] != 'pretreatment' or len(col_split) < 2:  # noqa: PLR2004
+        return
+    quantity = col_split[1]
+    unit_token = col_split[2] if len(col_split) > 2 else ''  # noqa: PLR2004
+
+    if quantity.startswith('set_temperature'):
+        spec = _temperature_spec(key, 'set_temperature', unit_token)
+        if spec is not None:
+            plan.pretreatment.append(spec)
+        else:
+            logger.warning('Temperature unit not recognized.')
+
+    if quantity.startswith('time'):
+        if len(col_split) != 3:  # noqa: PLR2004
+            logger.error('Time unit missing.')
+        else:
+            try:
+                plan.pretreatment.append(
+                    ColumnSpec(
+                        key=key, field='time_on_stream', unit=get_time_unit(unit_token)
+                    )
+                )
+            except ValueError:
+                logger.warning(f'Time unit of column {key} not recognized.')
+
+    if quantity.startswith('set_pressure'):
+        if 'bar' in unit_token:
+            plan.pretreatment.append(
+                ColumnSpec(key=key, field='set_pressure', unit=ureg.bar)
+            )
+        else:
+            logger.warning('Pressure unit not recognized.')
+
+    if quantity.startswith('set_flow_rate'):
+        if 'ml/min' in unit_token or 'mln' in unit_token:
+            plan.pretreatment.append(
+                ColumnSpec(key=key, field='set_total_flow_rate', unit=FLOW_RATE_UNIT)
+            )
+        else:
+            logger.warning(f'Flow rate unit not recognized from {key}.')
+
+    if quantity.startswith('gas_flow'):
+        if len(col_split) == 4 and (  # noqa: PLR2004
+            'ml/min' in col_split[3] or 'mln' in col_split[3]
+        ):
+            plan.pretreatment.append(
+                ColumnSpec(
+                    key=key, field='flow_rate', name=col_split[2], unit=FLOW_RATE_UNIT
+                )
+            )
+        else:
+            logger.warning(f'unit in {key} missing or not recognized.')
+
+
+def _compile_reaction(plan, key, col_split, logger) -> None:  # noqa: PLR0912
+    prefix = col_split[0].casefold()
+
+    if key in ['catalyst', 'catalyst_name']:
+        plan.reaction.append(ColumnSpec(key=key, field='catalyst_name'))
+    if key in ['sample_id', 'catalyst_id']:
+        plan.reaction.append(ColumnSpec(key=key, field='sample_id'))
+    if key == 'diluent':
+        plan.reaction.append(ColumnSpec(key=key, field='diluent'))
+
+    if prefix == 'x' and len(col_split) > 1:
+        if len(col_split) == 3 and '%' in col_split[2]:  # noqa: PLR2004
+            spec = ColumnSpec(
+                key=key, field='fraction_in', name=col_split[1], divisor=100
+            )
+        else:
+            spec = ColumnSpec(key=key, field='fraction_in', name=col_split[1])
+        plan.reaction.append(spec)
+        if key == f'x {col_split[1]} (%)' or (
+            key == f'x {col_split[1]}' and col_split[1] not in plan.fraction_in_columns
+        ):
+            plan.fraction_in_columns[col_split[1]] = spec
+
+    if prefix == 'mass':
+        field_name = 'catalyst_mass'
+    elif key.startswith('diluent_mass'):
+        field_name = 'diluent_mass'
+    else:
+        field_name = None
+    if field_name is not None:
+        try:
+            plan.reaction.append(
+                ColumnSpec(key=key, field=field_name, unit=get_mass_unit(col_split[1]))
+            )
+        except (ValueError, IndexError) as e:
+            logger.warning(f"""Mass unit of column {key} not recognized.
+                           Error: {e}""")
+
+    if len(col_split) < 3:  # noqa: PLR2004
+        return
+
+    for rate_prefix, field_name, resolve_unit in [
+        ('r', 'reaction_rate', get_rate_unit),
+        ('r_specific_mass', 'specific_mass_rate', get_specific_mass_rate_unit),
+    ]:
+        if col_split[0] != rate_prefix:
+            continue
+        unit = col_split[2].strip('()')
+        try:
+            plan.reaction.append(
+                ColumnSpec(
+                    key=key,
+                    field=field_name,
+                    name=col_split[1],
+                    unit=resolve_unit(col_split[2]),
+                )
+            )
+        except Exception as e:
+            logger.warning(f"""Reaction rate unit {unit} not recognized.
+                           Error: {e}""")
+
+    if col_split[2] != '(%)':
+        return
+
+    field_name = {
+        'x_p': 'conversion_product_based',
+        'x_r': 'conversion_reactant_based',
+        'x_out': 'fraction_out',
+        's_p': 'selectivity',
+        'y': 'product_yield',
+    }.get(prefix)
+    if field_name == 'fraction_out':
+        plan.reaction.append(
+            ColumnSpec(key=key, field=field_name, name=col_split[1], divisor=100)
+        )
+    elif field_name is not None:
+        plan.reaction.append(ColumnSpec(key=key, field=field_name, name=col_split[1]))
+
+
+def compile_column_plan(columns, logger) -> ColumnPlan:
+    """
+    Compiles the column headers of a collection data frame into a ColumnPlan. Each
+    header is split and classified only once per file, so that the extractors scale
+    with the number of rows and not with rows x columns.
+
+    Args:
+        columns: the (casefolded) column names of the data frame.
+        logger ('BoundLogger'): A structlog logger.
+    """
+    plan = ColumnPlan(columns=list(columns))
+    for key in plan.columns:
+        col_split = key.split(' ')
+        _compile_feed_and_results(plan, key, col_split, logger)
+        _compile_reactor_setup(plan, key, col_split, logger)
+        _compile_pretreatment(plan, key, col_split, logger)
+        _compile_reaction(plan, key, col_split, logger)
+    return plan
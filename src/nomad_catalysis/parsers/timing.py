@@ -0,0 +1,66 @@
+import time
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+
+class ParseTimer:
+    """
+    Collects the time spent in the stages of one parse and counters like the number
+    of rows or the bytes written, and emits them as a single structured log event.
+    A disabled timer still runs the stages but does not time, count or log them.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.timings = defaultdict(float)
+        self.counters = defaultdict(int)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Adds the time spent in the `with` block to the stage `name`.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - start
+
+    def iterate(self, name: str, iterable: Iterable) -> Iterator:
+        """
+        Yields from `iterable` and adds the time spent in producing the items, e.g.
+        reading the chunks of a file, to the stage `name`.
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def count(self, name: str, value: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] += value
+
+    def set(self, name: str, value: int) -> None:
+        if self.enabled:
+            self.counters[name] = value
+
+    def log(self, logger, event: str, **kwargs) -> None:
+        """
+        Emits the timings in seconds and the counters as one log event.
+        """
+        if not self.enabled:
+            return
+        logger.info(
+            event,
+            timings={name: round(value, 6) for name, value in self.timings.items()},
+            counters=dict(self.counters),
+            **kwargs,
+        )
@@ -1,8 +1,13 @@
+import hashlib
 import json
 import os.path
+from collections.abc import Callable, Iterator
 from typing import TYPE_CHECKING
 
+from nomad_catalysis.parsers.timing import ParseTimer
+
 if TYPE_CHECKING:
+    import pandas as pd
     from nomad.datamodel.data import (
         ArchiveSection,
     )
@@ -21,23 +26,347 @@ def get_entry_id_from_file_name(file_name: str, archive: 'EntryArchive') -> str:
     return hash(archive.metadata.upload_id, file_name)
 
 
+def get_content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def get_content_hashes_file_name(archive: 'EntryArchive') -> str:
+    """
+    Returns the name of the hidden file with the content hashes of the child archives
+    of a collection file, e.g. '.samples.xlsx.hashes.json' for 'samples.xlsx', so that
+    it is not shown next to the files of the user.
+    """
+    directory, _, file_name = archive.metadata.mainfile.rpartition('/')
+    hidden_file_name = f'.{file_name}.hashes.json'
+    return f'{directory}/{hidden_file_name}' if directory else hidden_file_name
+
+
+def load_content_hashes(archive: 'EntryArchive') -> dict[str, str] | None:
+    """
+    Loads the content hashes of the child archives that were written by the
+    previous parsing of the collection file `archive.metadata.mainfile`. Returns an
+    empty dict if the file was not parsed before and None for a ClientContext, where
+    child archives are always written.
+    """
+    from nomad.datamodel.context import ClientContext
+
+    if isinstance(archive.m_context, ClientContext):
+        return None
+    file_name = get_content_hashes_file_name(archive)
+    if not archive.m_context.raw_path_exists(file_name):
+        return {}
+    with archive.m_context.raw_file(file_name, 'r') as infile:
+        return json.load(infile)
+
+
+def is_published(archive: 'EntryArchive') -> bool:
+    """
+    Returns whether the upload of the archive is published, i.e. its raw files can
+    not be written anymore.
+    """
+    from nomad.files import PublicUploadFiles
+
+    return isinstance(
+        getattr(archive.m_context, 'upload_files', None), PublicUploadFiles
+    )
+
+
+def save_content_hashes(
+    archive: 'EntryArchive',
+    content_hashes: dict[str, str] | None,
+    previous_hashes: dict[str, str] | None = None,
+) -> None:
+    """
+    Saves the content hashes of the child archives next to the collection file, if
+    they differ from the `previous_hashes` loaded before and the upload is not
+    published.
+    """
+    if (
+        content_hashes is None
+        or content_hashes == previous_hashes
+        or is_published(archive)
+    ):
+        return
+    with archive.m_context.raw_file(
+        get_content_hashes_file_name(archive), 'w'
+    ) as outfile:
+        json.dump(content_hashes, outfile, indent=2, sort_keys=True)
+
+
+def _write_archive_file(
+    content: str,
+    archive: 'EntryArchive',
+    file_name: str,
+    client: bool,
+) -> None:
+    if client:
+        with open(file_name, 'w') as outfile:
+            outfile.write(content)
+    else:
+        with archive.m_context.raw_file(file_name, 'w') as outfile:
+            outfile.write(content)
+
+
+def _is_unchanged(
+    archive: 'EntryArchive',
+    file_name: str,
+    content_hash: str,
+    content_hashes: dict[str, str],
+) -> bool:
+    if not archive.m_context.raw_path_exists(file_name):
+        return False
+    previous_hash = content_hashes.get(file_name)
+    if previous_hash is None:
+        with archive.m_context.raw_file(file_name, 'r') as infile:
+            previous_hash = get_content_hash(infile.read())
+    return previous_hash == content_hash
+
+
+def _unique_children(
+    entities: list['ArchiveSection'], file_names: list[str]
+) -> list[tuple['ArchiveSection', str]]:
+    """
+    Returns the pairs of sections and file names with the first section for each
+    file name.
+    """
+    children = {}
+    for entity, file_name in zip(entities, file_names):
+        children.setdefault(file_name, entity)
+    return [(entity, file_name) for file_name, entity in children.items()]
+
+
 def create_archive(
     entity: 'ArchiveSection',
     archive: 'EntryArchive',
     file_name: str,
 ) -> str:
-  
+    return create_archives([entity], archive, [file_name])[0]
+
+
+def create_archives(  # noqa: PLR0913
+    entities: list['ArchiveSection'],
+    archive: 'EntryArchive',
+    file_names: list[str],
+    *,
+    batch_size: int = 500,
+    max_workers: int | None = None,
+    content_hashes: dict[str, str] | None = None,
+    timer: ParseTimer | None = None,
+) -> list[str]:
+    """
+    Writes the sections `entities` as child archives into the raw files `file_names`
+    and returns the references to the new entries in the same order.
+
+    The sections are serialized batch by batch, the raw files of a batch are written
+    concurrently in a thread pool and the processing of the written files is
+    triggered after the whole batch is on disk. If several sections have the same
+    file name, e.g. the catalyst shared by several reactions of a collection, only
+    the first of them is written and its file is processed once.
+
+    Without `content_hashes` existing raw files are not overwritten. With
+    `content_hashes` (see `load_content_hashes`) an existing raw file is only
+    rewritten and reprocessed if the hash of its new content differs from the hash
+    recorded for it, or from the hash of the file itself if none was recorded. The
+    dict is updated with the hashes of all written files.
+
+    Args:
+        entities: the sections to write, e.g. CatalystSample or CatalyticReaction.
+        archive: the archive of the collection entry that creates the files.
+        file_names: the raw file name for each section.
+        batch_size: the number of files serialized and written per batch.
+        max_workers: the number of threads used for writing, see ThreadPoolExecutor.
+        content_hashes: the content hashes of the raw files by file name.
+        timer: a ParseTimer for the serialize, write and process stages.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
     from nomad.datamodel.context import ClientContext
-    
-    entity_entry = entity.m_to_dict(with_root_def=True)
-    if isinstance(archive.m_context, ClientContext):
-        with open(file_name, 'w') as outfile:
-            json.dump({'data': entity_entry}, outfile, indent=4)
-        return os.path.abspath(file_name)
-    if not archive.m_context.raw_path_exists(file_name):
-        with archive.m_context.raw_file(file_name, 'w') as outfile:
-            json.dump({'data': entity_entry}, outfile)
-        archive.m_context.process_updated_raw_file(file_name)
-    return get_reference(
-        archive.metadata.upload_id, get_entry_id_from_file_name(file_name, archive)
-    )
+
+    client = isinstance(archive.m_context, ClientContext)
+    timer = timer or ParseTimer(enabled=False)
+    references = []
+    children = _unique_children(entities, file_names)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for start in range(0, len(children), batch_size):
+            batch = []
+            modified = set()
+            with timer.stage('serialize'):
+                for entity, file_name in children[start : start + batch_size]:
+                    if client:
+                        content = json.dumps(
+                            {'data': entity.m_to_dict(with_root_def=True)}, indent=4
+                        )
+                        batch.append((content, file_name))
+                        continue
+                    if content_hashes is None:
+                        if archive.m_context.raw_path_exists(file_name):
+                            continue
+                        content = json.dumps(
+                            {'data': entity.m_to_dict(with_root_def=True)}
+                        )
+                        batch.append((content, file_name))
+                        continue
+
+                    content = json.dumps({'data': entity.m_to_dict(with_root_def=True)})
+                    content_hash = get_content_hash(content)
+                    if _is_unchanged(archive, file_name, content_hash, content_hashes):
+                        content_hashes[file_name] = content_hash
+                        continue
+                    if archive.m_context.raw_path_exists(file_name):
+                        modified.add(file_name)
+                    content_hashes[file_name] = content_hash
+                    batch.append((content, file_name))
+
+            with timer.stage('write'):
+                list(
+                    pool.map(
+                        lambda item: _write_archive_file(
+                            item[0], archive, item[1], client
+                        ),
+                        batch,
+                    )
+                )
+            timer.count('child_entries_written', len(batch))
+            timer.count('bytes_written', sum(len(content) for content, _ in batch))
+            if not client:
+                with timer.stage('process'):
+                    for _, file_name in batch:
+                        archive.m_context.process_updated_raw_file(
+                            file_name, allow_modify=file_name in modified
+                        )
+
+    for file_name in file_names:
+        if client:
+            references.append(os.path.abspath(file_name))
+        else:
+            references.append(
+                get_reference(
+                    archive.metadata.upload_id,
+                    get_entry_id_from_file_name(file_name, archive),
+                )
+            )
+    return references
+
+
+def _unique_column_names(header) -> list[str]:
+    """
+    Returns the column names of a header row the way pandas names them, i.e. empty
+    cells become 'Unnamed: <n>' and duplicates get a '.<n>' suffix.
+    """
+    names = []
+    counts = {}
+    for n, cell in enumerate(header):
+        name = f'Unnamed: {n}' if cell is None else str(cell)
+        if name in counts:
+            counts[name] += 1
+            names.append(f'{name}.{counts[name]}')
+        else:
+            counts[name] = 0
+            names.append(name)
+    return names
+
+
+def _read_xlsx_chunks(
+    file_name: str, chunk_size: int, usecols: Callable[[str], bool] | None = None
+) -> Iterator['pd.DataFrame']:
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_name, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = _unique_column_names(next(rows, ()))
+        positions = [
+            n for n, name in enumerate(header) if usecols is None or usecols(name)
+        ]
+        header = [header[n] for n in positions]
+        chunk = []
+        for cells in rows:
+            values = [cells[n] if n < len(cells) else None for n in positions]
+            if all(value is None for value in values):
+                continue
+            chunk.append(values)
+            if len(chunk) == chunk_size:
+                yield pd.DataFrame(chunk, columns=header)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=header)
+    finally:
+        workbook.close()
+
+
+def read_table_chunks(
+    file_name: str, chunk_size: int, usecols: Callable[[str], bool] | None = None
+) -> Iterator['pd.DataFrame']:
+    """
+    Reads a csv or xlsx file in data frames of at most `chunk_size` rows, so that the
+    memory used does not depend on the size of the file. Csv files are read with the
+    chunked pandas reader, xlsx files row by row with openpyxl in read-only mode.
+    Empty rows of xlsx files are skipped. With `usecols`, only the columns for whose
+    name it returns True are read.
+    """
+    if file_name.endswith('.xlsx'):
+        yield from _read_xlsx_chunks(file_name, chunk_size, usecols)
+    else:
+        import pandas as pd
+
+        with pd.read_csv(file_name, chunksize=chunk_size, usecols=usecols) as reader:
+            yield from reader
+
+
+class ChildArchiveWriter:
+    """
+    Creates the child entries of a parsed file. If the parser got `child_archives`
+    (see `MatchingParser.is_mainfile`), the sections are assigned to these in-memory
+    archives, otherwise they are written as raw `<mainfile_key>.archive.json` files
+    with `create_archives` and unchanged files are skipped by their content hash.
+    """
+
+    def __init__(
+        self,
+        archive: 'EntryArchive',
+        child_archives: dict[str, 'EntryArchive'] | None = None,
+        timer: ParseTimer | None = None,
+    ):
+        self.archive = archive
+        self.child_archives = child_archives
+        self.timer = timer or ParseTimer(enabled=False)
+        self.content_hashes = None if child_archives else load_content_hashes(archive)
+        self.previous_hashes = (
+            None if self.content_hashes is None else dict(self.content_hashes)
+        )
+
+    def write(
+        self, entities: list['ArchiveSection'], mainfile_keys: list[str]
+    ) -> list[str]:
+        """
+        Creates a child entry for each section and returns the references to them.
+        """
+        self.timer.count('child_entries', len(entities))
+        if not self.child_archives:
+            return create_archives(
+                entities,
+                self.archive,
+                [f'{key}.archive.json' for key in mainfile_keys],
+                content_hashes=self.content_hashes,
+                timer=self.timer,
+            )
+
+        from nomad.utils import generate_entry_id
+
+        upload_id = self.archive.metadata.upload_id
+        references = []
+        for entity, key in zip(entities, mainfile_keys):
+            if key not in self.child_archives:
+                raise KeyError(f'No child archive for the mainfile key {key}.')
+            self.child_archives[key].data = entity
+            references.append(
+                get_reference(
+                    upload_id,
+                    generate_entry_id(upload_id, self.archive.metadata.mainfile, key),
+                )
+            )
+        return references
+
+    def save(self) -> None:
+        save_content_hashes(self.archive, self.content_hashes, self.previous_hashes)
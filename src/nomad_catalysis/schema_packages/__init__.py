@@ -4,6 +4,41 @@ from pydantic import Field
 
 class CatalysisPackageEntryPoint(SchemaPackageEntryPoint):
     parameter: int = Field(0, description='Custom configuration parameter')
+    data_file_cache_dir: str | None = Field(
+        None,
+        description="""Directory in which the data frames read from the data files of
+        reaction entries are cached by upload, file path and content hash, so that
+        unchanged data files are not parsed again when an entry is normalized. The
+        cache is disabled if no directory is set.""",
+    )
+    data_file_cache_size: int = Field(
+        1 << 30,
+        description="""Maximum size in bytes of the data file cache, the least
+        recently used data frames are removed when it is exceeded.""",
+    )
+    hdf5_mappings: list[str] = Field(
+        [],
+        description="""Paths of YAML files that map the tables of further h5 data file
+        layouts to the quantities of reaction entries. They are tried in this order
+        before the built-in mapping of the Haber reactor files.""",
+    )
+    downsampling: str = Field(
+        'lttb',
+        description="""The downsampling method with which large arrays without steady
+        states are reduced to 300 points in the archive results. The points are
+        selected once from all time series of a reaction, so that the quantities stay
+        aligned: 'lttb' (the default) keeps the shape of the curves, 'minmax' keeps
+        the minimum and maximum of each bucket, and 'mean' averages buckets of the
+        same duration.""",
+    )
+    array_offload_threshold: int | None = Field(
+        None,
+        description="""Number of data points above which the time series of reaction
+        entries are written into an HDF5 file next to the entry, with chunking and
+        compression, instead of into the archive. The archive keeps references to the
+        datasets and their minimum, maximum, mean and standard deviation. The arrays
+        are stored in the archive if no threshold is set.""",
+    )
 
     def load(self):
         from nomad_catalysis.schema_packages.catalysis import m_package # noqa: PLC0415, I001
@@ -0,0 +1,68 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from typing import BinaryIO
+
+SIDECAR_SUFFIX = '.arrays.h5'
+
+# the arrays are stored in chunks of CHUNK_SIZE values, which are compressed with gzip
+CHUNK_SIZE = 65536
+COMPRESSION_LEVEL = 4
+
+
+def get_sidecar_file_name(mainfile: str) -> str:
+    """
+    Returns the name of the sidecar file of the arrays of the entry with the
+    `mainfile`, e.g. 'reaction.archive.yaml.arrays.h5' for 'reaction.archive.yaml'.
+    The full name of the mainfile is kept, so that entries with the same stem, e.g.
+    'reaction.archive.json', have their own sidecar file.
+    """
+    return mainfile + SIDECAR_SUFFIX
+
+
+def summarize(values: np.ndarray) -> dict[str, float]:
+    """
+    Returns the minimum, maximum, mean and standard deviation of `values`, ignoring
+    NaN.
+    """
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return dict(min=np.nan, max=np.nan, mean=np.nan, std=np.nan)
+    return dict(
+        min=float(values.min()),
+        max=float(values.max()),
+        mean=float(values.mean()),
+        std=float(values.std()),
+    )
+
+
+def write_arrays(f: 'BinaryIO', arrays: dict[str, np.ndarray]) -> None:
+    """
+    Writes the `arrays` into the HDF5 file `f`, each into a chunked and compressed
+    dataset at its path, e.g. 'data/results/0/temperature'.
+    """
+    import h5py
+
+    with h5py.File(f, 'w') as data:
+        for path, values in arrays.items():
+            data.create_dataset(
+                path,
+                data=values,
+                chunks=(min(len(values), CHUNK_SIZE),),
+                compression='gzip',
+                compression_opts=COMPRESSION_LEVEL,
+                shuffle=True,
+            )
+
+
+def read_arrays(f: 'BinaryIO', paths: list[str]) -> dict[str, np.ndarray]:
+    """
+    Reads the datasets at the `paths` from the HDF5 file `f`, datasets that are not
+    in the file are skipped.
+    """
+    import h5py
+
+    with h5py.File(f, 'r') as data:
+        return {path: data[path][()] for path in paths if path in data}
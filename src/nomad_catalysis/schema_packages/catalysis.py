@@ -4,14 +4,11 @@ from typing import (
     TYPE_CHECKING,
 )
 
-import h5py
 import numpy as np
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objs as go
 from ase.data import atomic_masses, atomic_numbers, chemical_symbols
 from nomad.config import config
 from nomad.datamodel.data import ArchiveSection, EntryDataCategory, Schema
+from nomad.datamodel.hdf5 import HDF5Reference
 from nomad.datamodel.metainfo.annotations import ELNAnnotation
 from nomad.datamodel.metainfo.basesections import (
     CompositeSystem,
@@ -42,10 +39,33 @@ from nomad.metainfo import (
     Section,
     SubSection,
 )
-from nomad.metainfo.metainfo import Category, MSection
+from nomad.metainfo.metainfo import Category, MetainfoReferenceError, MSection
 from nomad.units import ureg
 
+from .array_sidecar import (
+    get_sidecar_file_name,
+    read_arrays,
+    summarize,
+    write_arrays,
+)
 from .chemical_data import chemical_data
+from .data_file_readers import find_data_file_reader, get_data_file_extensions
+from .downsampling import (
+    DEFAULT_DOWNSAMPLER,
+    DOWNSAMPLERS,
+    MEAN_DOWNSAMPLER,
+    Downsampling,
+    bucket_means,
+    build_pyramid,
+    downsample,
+    select_points,
+)
+from .steady_state import (
+    SteadyStates,
+    find_steady_states,
+    group_steps,
+    magnitude,
+)
 
 if TYPE_CHECKING:
     from nomad.datamodel.datamodel import (
@@ -68,7 +88,17 @@ class CatalysisElnCategory(EntryDataCategory):
 
 
 threshold_datapoints = 300
-threshold2_datapoints = 3000
+# the figures of reactions with more data points show the bucket means of the finest
+# level of the time series pyramid with at most "plot_datapoints" points
+plot_datapoints = 3000
+
+# the tolerances of the setpoints within a steady state, in SI units, e.g. 100 Pa
+# and 1e-9 m**3/s, i.e. 0.06 mL/minute
+steady_state_tolerances = {
+    'set_temperature': 0.05,
+    'set_pressure': 100.0,
+    'set_total_flow_rate': 1e-9,
+}
 
 
 def add_catalyst(archive: 'EntryArchive') -> None:
@@ -140,7 +170,33 @@ def set_nested_attr(obj, attr_path, value):
     setattr(obj, attrs[-1], value)
 
 
-def map_and_assign_attributes(self, logger, mapping, target, obj=None) -> None:
+def get_downsampling_method(logger) -> str:
+    """
+    Returns the downsampling method configured for the plugin, by default LTTB. An
+    unknown method is reported and replaced by the default.
+    """
+    method = getattr(configuration, 'downsampling', None) or DEFAULT_DOWNSAMPLER
+    if method != MEAN_DOWNSAMPLER and method not in DOWNSAMPLERS:
+        logger.warning(
+            f"Unknown downsampling method '{method}', "
+            f"'{DEFAULT_DOWNSAMPLER}' is used instead."
+        )
+        return DEFAULT_DOWNSAMPLER
+    return method
+
+
+def downsample_results(values, logger):
+    """
+    Reduces the large array `values`, which is not of the size of the other time
+    series of the reaction, on its own to `threshold_datapoints` points with the
+    configured downsampling method.
+    """
+    return downsample(values, threshold_datapoints, get_downsampling_method(logger))
+
+
+def map_and_assign_attributes(  # noqa: PLR0913
+    self, logger, mapping, target, obj=None, *, reduction=None
+) -> None:
     """
     A helper function that loops through a mapping and assigns the values to
     a target object.
@@ -149,6 +205,9 @@ def map_and_assign_attributes(self, logger, mapping, target, obj=None) -> None:
         target (object): the target object to which the attributes are assigned.
         obj (object): the object from which the attributes are copied. By default if
         None is defined, it will be set to self, but can also be a linked sample.
+        reduction (SteadyStates | Downsampling): the steady states of the reaction,
+        if found, or the points to which its time series are downsampled. Large
+        arrays are averaged per steady state or reduced to these points.
     """
     if obj is None:
         obj = self
@@ -156,17 +215,27 @@ def map_and_assign_attributes(self, logger, mapping, target, obj=None) -> None:
         value = get_nested_attr(obj, ref_attr)
         if value is not None:
             try:
-                if len(value) > threshold_datapoints:
-                    logger.info(
-                        f"""The quantity '{ref_attr}' is large and will be reduced for
-                        the archive results."""
-                    )
-                    if threshold_datapoints < len(value) < threshold2_datapoints:
-                        value = value[20::10]
-                    else:
-                        value = value[50::100]
+                size = len(value)
             except TypeError:
-                pass
+                size = 0
+            if size > threshold_datapoints:
+                logger.info(
+                    f"""The quantity '{ref_attr}' is large and will be reduced for
+                    the archive results."""
+                )
+                try:
+                    if reduction is not None and reduction.matches(value):
+                        value = reduction.reduce(
+                            value, last=ref_attr.endswith('time_on_stream')
+                        )
+                    else:
+                        value = downsample_results(value, logger)
+                except (TypeError, ValueError) as e:
+                    logger.warning(
+                        f"""The quantity '{ref_attr}' could not be reduced and is not
+                        written into the archive results: {e!r}"""
+                    )
+                    continue
             try:
                 set_nested_attr(
                     target,
@@ -1166,6 +1235,9 @@ class ReactionConditionsData(PlotSection):
     reagents = SubSection(section_def=Reagent, repeats=True)
 
     def plot_figures(self):
+        import plotly.express as px
+        import plotly.graph_objs as go
+
         self.figures = []
         if self.time_on_stream is not None:
             x = self.time_on_stream.to('hour')
@@ -1437,6 +1509,149 @@ class CatalyticReactionCore(Measurement):
     )
 
 
+class SteadyStateQuantity(ArchiveSection):
+    m_def = Section(
+        label_quantity='name',
+        description="""The mean, standard deviation, minimum and maximum of a quantity
+        of the reaction at each steady state.""",
+    )
+
+    name = Quantity(
+        type=str,
+        description="""The path of the quantity in the entry, e.g.
+        reaction_conditions.set_temperature or
+        results.reactants_conversions[ammonia].conversion.""",
+    )
+    unit = Quantity(type=str, description='The unit of the values.')
+    mean = Quantity(type=np.float64, shape=['*'])
+    std = Quantity(type=np.float64, shape=['*'])
+    min = Quantity(type=np.float64, shape=['*'])
+    max = Quantity(type=np.float64, shape=['*'])
+
+
+class SteadyStateData(ArchiveSection):
+    m_def = Section(
+        description="""The steady states of a reaction with large data, i.e. the steps
+        of constant set temperature, pressure and flow rate, or of the same step in the
+        data file, without the ramps between them. The results of the reaction are
+        averaged per steady state for the search.""",
+    )
+
+    runs = Quantity(
+        type=np.float64, shape=['*'], description='The number of the steady state.'
+    )
+    number_of_points = Quantity(
+        type=np.int64,
+        shape=['*'],
+        description='The number of data points averaged in each steady state.',
+    )
+    time_on_stream = Quantity(
+        description='The time on stream at the end of each steady state.',
+        type=np.float64,
+        shape=['*'],
+        unit='s',
+        a_eln=dict(defaultDisplayUnit='hour'),
+    )
+    duration = Quantity(
+        description="""The time between the first and the last averaged data point
+        of each steady state.""",
+        type=np.float64,
+        shape=['*'],
+        unit='s',
+        a_eln=dict(defaultDisplayUnit='minute'),
+    )
+
+    quantities = SubSection(section_def=SteadyStateQuantity, repeats=True)
+
+
+class TimeSeriesQuantity(ArchiveSection):
+    m_def = Section(
+        label_quantity='name',
+        description="""The minimum, mean and maximum of a quantity of the reaction in
+        each bucket of a level of the time series pyramid.""",
+    )
+
+    name = Quantity(
+        type=str,
+        description="""The path of the quantity in the entry, e.g.
+        results.time_on_stream or results.reactants_conversions[ammonia].conversion.""",
+    )
+    unit = Quantity(type=str, description='The unit of the min, mean and max values.')
+    min = Quantity(type=np.float64, shape=['*'])
+    mean = Quantity(type=np.float64, shape=['*'])
+    max = Quantity(type=np.float64, shape=['*'])
+
+
+class TimeSeriesLevel(ArchiveSection):
+    m_def = Section(
+        label_quantity='points_per_bucket',
+        description="""A level of the time series pyramid, in which each bucket
+        aggregates the same number of consecutive data points.""",
+    )
+
+    points_per_bucket = Quantity(
+        type=np.int64,
+        description='The number of data points aggregated in each bucket.',
+    )
+    number_of_buckets = Quantity(type=np.int64)
+
+    quantities = SubSection(section_def=TimeSeriesQuantity, repeats=True)
+
+
+class TimeSeriesPyramid(ArchiveSection):
+    m_def = Section(
+        description="""The time series of a reaction with large data aggregated into
+        levels of 10, 100, 1000, ... data points per bucket, with the minimum, mean
+        and maximum in each bucket. Plots and API clients can load the level that
+        fits the number of points they can show instead of the full time series,
+        which is the level with one data point per bucket.""",
+    )
+
+    number_of_points = Quantity(
+        type=np.int64, description='The number of data points of the time series.'
+    )
+
+    levels = SubSection(section_def=TimeSeriesLevel, repeats=True)
+
+    def get_level(self, max_points: int) -> TimeSeriesLevel | None:
+        """
+        Returns the finest level with at most `max_points` buckets, or None if the
+        full time series has at most `max_points` data points.
+        """
+        if self.number_of_points is None or self.number_of_points <= max_points:
+            return None
+        for level in self.levels:
+            if level.number_of_buckets <= max_points:
+                return level
+        return self.levels[-1] if self.levels else None
+
+
+class OffloadedArray(ArchiveSection):
+    m_def = Section(
+        label_quantity='name',
+        description="""A time series of the reaction that is stored in the HDF5
+        sidecar file of the entry instead of in the archive, with its summary
+        statistics.""",
+    )
+
+    name = Quantity(
+        type=str,
+        description="""The path of the quantity in the entry, e.g.
+        reaction_conditions.set_temperature or
+        results.reactants_conversions[ammonia].conversion.""",
+    )
+    reference = Quantity(
+        type=HDF5Reference,
+        description='The dataset of the time series in the sidecar file.',
+    )
+    unit = Quantity(type=str, description='The unit of the values.')
+    number_of_points = Quantity(type=np.int64)
+    min = Quantity(type=np.float64)
+    max = Quantity(type=np.float64)
+    mean = Quantity(type=np.float64)
+    std = Quantity(type=np.float64)
+
+
 class CatalyticReactionData(PlotSection, MeasurementResult):
     temperature = Quantity(
         type=np.float64,
@@ -1487,6 +1702,9 @@ class CatalyticReactionData(PlotSection, MeasurementResult):
 
     products = SubSection(section_def=ProductData, repeats=True)
 
+    steady_states = SubSection(section_def=SteadyStateData)
+    pyramid = SubSection(section_def=TimeSeriesPyramid)
+
     def normalize(self, archive, logger):
         if self.products is not None:
             for product in self.products:
@@ -1543,6 +1761,16 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
         a_eln=dict(component='FileEditQuantity'),
         a_browser=dict(adaptor='RawFileAdaptor'),
     )
+    data_file_method = Quantity(
+        type=str,
+        description="""
+        The method group in 'Sorted Data' of a Haber h5 data file that is read into
+        this entry. If the data file contains several methods and no method is given,
+        the first method is read and an additional entry with the data of each of the
+        other methods is created.
+        """,
+        a_eln=dict(component='StringEditQuantity'),
+    )
 
     instruments = SubSection(
         section_def=ReactorSetup, a_eln=ELNAnnotation(label='reactor setup')
@@ -1561,526 +1789,76 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
         section_def=CatalyticReactionData, a_eln=ELNAnnotation(label='reaction results')
     )
 
-    def read_clean_data(self, archive, logger):  # noqa: PLR0912, PLR0915
-        """
-        This function reads the data from the data file and assigns the data to the
-        corresponding attributes of the class.
-        """
-        if self.data_file.endswith('.csv'):
-            with archive.m_context.raw_file(self.data_file, 'rt') as f:
-                data = pd.read_csv(f).dropna(axis=1, how='all')
-        elif self.data_file.endswith('.xlsx'):
-            with archive.m_context.raw_file(self.data_file, 'rb') as f:
-                data = pd.read_excel(f, sheet_name=0)
-
-        data.dropna(axis=1, how='all', inplace=True)
-        feed = ReactionConditionsData()
-        reactor_filling = ReactorFilling()
-        cat_data = CatalyticReactionData()
-        sample = CompositeSystemReference()
-        reagents = []
-        reagent_names = []
-        products = []
-        product_names = []
-        conversions = []
-        conversion_names = []
-        rates = []
-        number_of_runs = 0
-
-        for col in data.columns:
-            if len(data[col]) < 2:  # noqa: PLR2004
-                continue
-            if col.casefold() == 'step':
-                feed.runs = data['step']
-                cat_data.runs = data['step']
-
-            col_split = col.split(' ')
-
-            if col.casefold() == 'c-balance':
-                cat_data.c_balance = np.nan_to_num(data[col])
-
-            if len(col_split) < 2:  # noqa: PLR2004
-                continue
-
-            number_of_runs = max(number_of_runs, len(data[col]))
-
-            if col_split[0].casefold() == 'c-balance' and ('%' in col_split[1]):
-                cat_data.c_balance = np.nan_to_num(data[col]) / 100
-
-            if col_split[0].casefold() == 'x':
-                if len(col_split) == 3 and ('%' in col_split[2]):  # noqa: PLR2004
-                    gas_in = data[col] / 100
-                else:
-                    gas_in = data[col]
-                reagent = Reagent(name=col_split[1], fraction_in=gas_in)
-                reagent_names.append(col_split[1])
-                reagents.append(reagent)
-
-            if col_split[0].casefold() == 'mass':
-                catalyst_mass_vector = data[col]
-                if '(g)' in col_split[1]:
-                    reactor_filling.catalyst_mass = catalyst_mass_vector[0] * ureg.gram
-                elif 'mg' in col_split[1]:
-                    reactor_filling.catalyst_mass = (
-                        catalyst_mass_vector[0] * ureg.milligram
-                    )
-            if col_split[0].casefold() == 'set_temperature':
-                if 'K' in col_split[1]:
-                    feed.set_temperature = np.nan_to_num(data[col])
-                else:
-                    feed.set_temperature = np.nan_to_num(data[col]) * ureg.celsius
-            if col_split[0].casefold() == 'temperature':
-                if 'K' in col_split[1]:
-                    cat_data.temperature = np.nan_to_num(data[col])
-                else:
-                    cat_data.temperature = np.nan_to_num(data[col]) * ureg.celsius
-
-            if col_split[0].casefold() == 'tos' or col_split[0].casefold() == 'time':
-                if 's' in col_split[1]:
-                    cat_data.time_on_stream = np.nan_to_num(data[col]) * ureg.second
-                    feed.time_on_stream = np.nan_to_num(data[col]) * ureg.second
-                elif 'min' in col_split[1]:
-                    cat_data.time_on_stream = np.nan_to_num(data[col]) * ureg.minute
-                    feed.time_on_stream = np.nan_to_num(data[col]) * ureg.minute
-                elif 'h' in col_split[1]:
-                    cat_data.time_on_stream = np.nan_to_num(data[col]) * ureg.hour
-                    feed.time_on_stream = np.nan_to_num(data[col]) * ureg.hour
-                else:
-                    logger.warning('Time on stream unit not recognized.')
-
-            if col_split[0] == 'GHSV':
-                if '1/h' in col_split[1] or 'h^-1' in col_split[1]:
-                    feed.gas_hourly_space_velocity = (
-                        np.nan_to_num(data[col]) * ureg.hour**-1
-                    )
-                else:
-                    logger.warning('Gas hourly space velocity unit not recognized.')
-
-            if col_split[0] == 'Vflow' or col_split[0] == 'flow_rate':
-                if 'mL/min' in col_split[1] or 'mln' in col_split[1]:
-                    feed.set_total_flow_rate = (
-                        np.nan_to_num(data[col]) * ureg.milliliter / ureg.minute
-                    )
-
-            if col_split[0] == 'set_pressure' and 'bar' in col_split[1]:
-                feed.set_pressure = np.nan_to_num(data[col]) * ureg.bar
-            if col_split[0].casefold() == 'pressure' and 'bar' in col_split[1]:
-                cat_data.pressure = np.nan_to_num(data[col]) * ureg.bar
-
-            if len(col_split) < 3:  # noqa: PLR2004
-                continue
-
-            if col_split[0] == 'r':  # reaction rate
-                unit = col_split[2].strip('()')
-                unit_conversion = {
-                    'mmol/g/h': 'mmol / (g * hour)',
-                    'mmol/g/min': 'mmol / (g * minute)',
-                    'µmol/g/min': 'µmol / (g * minute)',
-                    'mmolg^-1h^-1': 'mmol / (g * hour)',
-                }
-                try:
-                    rate = RatesData(
-                        name=col_split[1],
-                        reaction_rate=ureg.Quantity(
-                            np.nan_to_num(data[col]), unit_conversion.get(unit, unit)
-                        ),
-                    )
-                except Exception as e:
-                    logger.warning(f"""Reaction rate unit {unit} not recognized. 
-                                   Error: {e}""")
-                rates.append(rate)
-
-            if col_split[2] != '(%)':
-                continue
-
-            if col_split[0] == 'x_p':  # conversion, based on product detection
-                conversion = ReactantData(
-                    name=col_split[1],
-                    conversion=np.nan_to_num(data[col]),
-                    conversion_type='product-based conversion',
-                    conversion_product_based=np.nan_to_num(data[col]),
-                )
-                for i, p in enumerate(conversions):
-                    if p.name == col_split[1]:
-                        conversion = conversions.pop(i)
-
-                conversion.conversion_product_based = np.nan_to_num(data[col])
-                conversion.conversion = np.nan_to_num(data[col])
-                conversion.conversion_type = 'product-based conversion'
-
-                conversion_names.append(col_split[1])
-                conversions.append(conversion)
-
-            if col_split[0] == 'x_r':  # conversion, based on reactant detection
-                try:
-                    conversion = ReactantData(
-                        name=col_split[1],
-                        conversion=np.nan_to_num(data[col]),
-                        conversion_type='reactant-based conversion',
-                        conversion_reactant_based=np.nan_to_num(data[col]),
-                        fraction_in=(
-                            np.nan_to_num(data['x ' + col_split[1] + ' (%)']) / 100
-                        ),
-                    )
-                except KeyError:
-                    conversion = ReactantData(
-                        name=col_split[1],
-                        conversion=np.nan_to_num(data[col]),
-                        conversion_type='reactant-based conversion',
-                        conversion_reactant_based=np.nan_to_num(data[col]),
-                        fraction_in=np.nan_to_num(data['x ' + col_split[1]]),
-                    )
-
-                for i, p in enumerate(conversions):
-                    if p.name == col_split[1]:
-                        conversion = conversions.pop(i)
-                        conversion.conversion_reactant_based = np.nan_to_num(data[col])
-                conversions.append(conversion)
-
-            if col_split[0].casefold() == 'x_out':  # concentration out
-                if col_split[1] in reagent_names:
-                    conversion = ReactantData(
-                        name=col_split[1],
-                        fraction_in=np.nan_to_num(data['x ' + col_split[1] + ' (%)'])
-                        / 100,
-                        fraction_out=np.nan_to_num(data[col]) / 100,
-                    )
-                    conversions.append(conversion)
-                else:
-                    product = ProductData(
-                        name=col_split[1],
-                        fraction_out=np.nan_to_num(data[col]) / 100,
-                    )
-                    products.append(product)
-                    product_names.append(col_split[1])
-
-            if col_split[0] == 'S_p':  # selectivity
-                product = ProductData(
-                    name=col_split[1], selectivity=np.nan_to_num(data[col])
-                )
-                for i, p in enumerate(products):
-                    if p.name == col_split[1]:
-                        product = products.pop(i)
-                        product.selectivity = np.nan_to_num(data[col])
-                        break
-                products.append(product)
-                product_names.append(col_split[1])
-
-            if col_split[0].casefold() == 'y':  # product yield
-                product = ProductData(
-                    name=col_split[1], product_yield=np.nan_to_num(data[col])
-                )
-                for i, p in enumerate(products):
-                    if p.name == col_split[1]:
-                        product = products.pop(i)
-                        product.product_yield = np.nan_to_num(data[col])
-                        break
-                products.append(product)
-                product_names.append(col_split[1])
-
-        if 'FHI-ID' in data.columns:
-            sample.lab_id = str(data['FHI-ID'][0])
-        elif 'sample_id' in data.columns:  # is not None:
-            sample.lab_id = str(data['sample_id'][0])
-        if 'catalyst' in data.columns:  # is not None:
-            sample.name = str(data['catalyst'][0])
-            reactor_filling.catalyst_name = str(data['catalyst'][0])
-        if 'reaction_name' in data.columns:
-            self.reaction_name = str(data['reaction_name'][0])
-        if 'reaction_type' in data.columns:
-            self.reaction_type = []
-            self.reaction_type.extend(data['reaction_type'][0].split(','))
-        if 'experimenter' in data.columns:
-            self.experimenter = str(data['experimenter'][0])
-        if 'location' in data.columns:
-            self.location = str(data['location'][0])
-
-        if (
-            (self.samples is None or self.samples == [])
-            and sample != []
-            and sample is not None
-        ):
-            from nomad.datamodel.context import ClientContext
-            if isinstance(archive.m_context, ClientContext):
-                pass
-            else:
-                sample.normalize(archive, logger)
-            samples = []
-            samples.append(sample)
-            self.samples = samples
-
-        for n, reagent in enumerate(reagents):
-            if (
-                self.reaction_conditions is not None
-                and self.reaction_conditions.reagents is not None
-                and self.reaction_conditions.reagents != []
-                and self.reaction_conditions.reagents[n].pure_component is not None
-                and self.reaction_conditions.reagents[n].pure_component.iupac_name
-                is not None
-            ):
-                continue
-            reagent.normalize(archive, logger)
-        feed.reagents = reagents
-
-        if cat_data.runs is None:
-            cat_data.runs = np.linspace(0, number_of_runs - 1, number_of_runs)
-        cat_data.products = products
-        if conversions != []:
-            cat_data.reactants_conversions = conversions
-        cat_data.rates = rates
-
-        self.reaction_conditions = feed
-        self.results = []
-        self.results.append(cat_data)
-
-        if self.reactor_filling is None and reactor_filling is not None:
-            self.reactor_filling = reactor_filling
-
-    def read_haber_data(self, archive, logger):  # noqa: PLR0912, PLR0915
-        """
-        This function reads the h5 data from the data file and assigns the data to the
-        corresponding attributes of the class.
-        """
-        if self.data_file.endswith('.h5'):
-            with archive.m_context.raw_file(self.data_file, 'rb') as f:
-
-                data = h5py.File(f, 'r')
-
-                cat_data = CatalyticReactionData()
-                feed = ReactionConditionsData()
-                reactor_setup = ReactorSetup()
-                reactor_filling = ReactorFilling()
-                pretreatment = ReactionConditionsData()
-                sample = CompositeSystemReference()
-                conversions = []
-                rates = []
-                reagents = []
-                pre_reagents = []
-                time_on_stream = []
-                time_on_stream_reaction = []
-                method = list(data['Sorted Data'].keys())
-                for i in method:
-                    methodname = i
-                header = data['Header'][methodname]['Header']
-                feed.sampling_frequency = (
-                    header['Temporal resolution [Hz]'] * ureg.hertz
-                )
-                reactor_setup.name = 'Haber'
-                reactor_setup.reactor_type = 'plug flow reactor'
-                reactor_setup.reactor_volume = header['Bulk volume [mln]']
-                reactor_setup.reactor_cross_section_area = (
-                    header['Inner diameter of reactor (D) [mm]'] * ureg.millimeter / 2
-                ) ** 2 * np.pi
-                reactor_setup.reactor_diameter = (
-                    header['Inner diameter of reactor (D) [mm]'] * ureg.millimeter
-                )
-                reactor_filling.diluent = header['Diluent material'][0].decode()
-                reactor_filling.diluent_sievefraction_upper_limit = (
-                    header['Diluent Sieve fraction high [um]'] * ureg.micrometer
-                )
-                reactor_filling.diluent_sievefraction_lower_limit = (
-                    header['Diluent Sieve fraction low [um]'] * ureg.micrometer
-                )
-                reactor_filling.catalyst_mass = (
-                    header['Catalyst Mass [mg]'][0] * ureg.milligram
-                )
-                reactor_filling.catalyst_sievefraction_upper_limit = (
-                    header['Sieve fraction high [um]'] * ureg.micrometer
-                )
-                reactor_filling.catalyst_sievefraction_lower_limit = (
-                    header['Sieve fraction low [um]'] * ureg.micrometer
-                )
-                reactor_filling.particle_size = (
-                    header['Particle size (Dp) [mm]'] * ureg.millimeter
-                )
-
-                if not self.experimenter:
-                    self.experimenter = header['User'][0].decode()
-
-                pre = data['Sorted Data'][methodname]['H2 Reduction']
-                pretreatment.set_temperature = (
-                    pre['Catalyst Temperature [C°]'] * ureg.celsius
-                )
-                for col in pre.dtype.names:
-                    if (
-                        col
-                        == 'Massflow3 (H2) Target Calculated Realtime Value [mln|min]'
-                    ):
-                        pre_reagent = Reagent(
-                            name='hydrogen',
-                            flow_rate=pre[col] * ureg.milliliter / ureg.minute,
-                        )
-                        pre_reagents.append(pre_reagent)
-                    if (
-                        col
-                        == 'Massflow5 (Ar) Target Calculated Realtime Value [mln|min]'
-                    ):
-                        pre_reagent = Reagent(
-                            name='argon',
-                            flow_rate=pre[col] * ureg.milliliter / ureg.minute,
-                        )
-                        pre_reagents.append(pre_reagent)
-
-                pretreatment.reagents = pre_reagents
-                pretreatment.set_total_flow_rate = (
-                    pre['Target Total Gas (After Reactor) [mln|min]']
-                    * ureg.milliliter
-                    / ureg.minute
-                )
-                number_of_runs = len(pre['Catalyst Temperature [C°]'])
-                pretreatment.runs = np.linspace(0, number_of_runs - 1, number_of_runs)
-
-                time = pre['Relative Time [Seconds]']
-                for i in range(len(time)):
-                    t = float(time[i].decode('UTF-8')) - float(time[0].decode('UTF-8'))
-                    time_on_stream.append(t)
-                pretreatment.time_on_stream = time_on_stream * ureg.sec
-
-                analysed = data['Sorted Data'][methodname]['NH3 Decomposition']
-
-                set_total_flow = np.zeros(len(analysed['Relative Time [Seconds]']))
-                for col in analysed.dtype.names:
-                    if col.endswith('Target Calculated Realtime Value [mln|min]'):
-                        name_split = col.split('(')
-                        gas_name = name_split[1].split(')')
-                        if 'NH3_High' in gas_name or 'NH3_Low' in gas_name:
-                            reagent = Reagent(
-                                name='ammonia',
-                                flow_rate=analysed[col] * ureg.milliliter / ureg.minute,
-                                fraction_in=[1.0] * len(analysed[col]),
-                            )
-                            if reagent.flow_rate.any() > 0.0:
-                                reagents.append(reagent)
-                        else:
-                            reagent = Reagent(
-                                name=gas_name[0],
-                                flow_rate=analysed[col] * ureg.milliliter / ureg.minute,
-                            )
-                            if reagent.flow_rate.any() > 0.0:
-                                reagents.append(reagent)
-                    if col.endswith('Target Setpoint [mln|min]'):
-                        set_total_flow += analysed[col] * ureg.milliliter / ureg.minute
-
-                feed.reagents = reagents
-                total_flow_rate = np.zeros(len(reagents[0].flow_rate))
-                for reagent in reagents:
-                    total_flow_rate += reagent.flow_rate
-                cat_data.total_flow_rate = total_flow_rate
-
-                feed.set_total_flow_rate = set_total_flow
-                feed.contact_time = (
-                    analysed['W|F [gs|ml]'] * ureg.second * ureg.gram / ureg.milliliter
-                )
-                conversion = ReactantData(
-                    name='ammonia',
-                    conversion=np.nan_to_num(analysed['NH3 Conversion [%]']),
-                    conversion_type='reactant-based conversion',
-                    fraction_in=[1] * len(analysed['NH3 Conversion [%]']),
-                )
-                conversions.append(conversion)
-
-                rate = RatesData(
-                    name='molecular hydrogen',
-                    reaction_rate=np.nan_to_num(
-                        analysed['Space Time Yield [mmolH2 gcat-1 min-1]']
-                        * ureg.mmol
-                        / ureg.g
-                        / ureg.minute
-                    ),
-                )
-                rates.append(rate)
-                feed.set_temperature = (
-                    analysed['Catalyst Temperature [C°]'] * ureg.celsius
-                )
-                cat_data.temperature = (
-                    analysed['Catalyst Temperature [C°]'] * ureg.celsius
-                )
-                number_of_runs = len(analysed['NH3 Conversion [%]'])
-                feed.runs = np.linspace(0, number_of_runs - 1, number_of_runs)
-                cat_data.runs = np.linspace(0, number_of_runs - 1, number_of_runs)
-                time = analysed['Relative Time [Seconds]']
-                for i in range(len(time)):
-                    t = float(time[i].decode('UTF-8')) - float(time[0].decode('UTF-8'))
-                    time_on_stream_reaction.append(t)
-                cat_data.time_on_stream = time_on_stream_reaction * ureg.sec
-
-                cat_data.reactants_conversions = conversions
-                cat_data.rates = rates
-
-                self.method = 'Haber measurement ' + str(methodname)
-                self.datetime = pre['Date'][0].decode()
-
-                # sample.name = 'catalyst'
-                sample.lab_id = str(data['Header']['Header']['SampleID'][0])
-
-                from nomad.datamodel.context import ClientContext
-                if isinstance(archive.m_context, ClientContext):
-                    pass
-                else:
-                    sample.normalize(archive, logger)
-                    self.samples = []
-                    self.samples.append(sample)
-
-                self.results = []
-                self.results.append(cat_data)
-                self.reaction_conditions = feed
-                self.instruments = []
-                self.instruments.append(reactor_setup)
-                self.pretreatment = pretreatment
-                self.reactor_filling = reactor_filling
-
-                products_results = []
-                for i in ['molecular nitrogen', 'molecular hydrogen']:
-                    product = ProductData(name=i)
-                    products_results.append(product)
-                self.results[0].products = products_results
-
-                self.reaction_name = 'ammonia decomposition'
-                self.reaction_type = []
-                self.reaction_type.extend(['cracking', 'thermal catalysis'])
-                self.location = 'Fritz-Haber-Institut Berlin / Abteilung AC'
+    offloaded_arrays = SubSection(section_def=OffloadedArray, repeats=True)
 
     def check_and_read_data_file(self, archive, logger):
-        """This functions checks the format of the data file and assigns the right
-        reader function to read the data file or logs a warning if the format is not
-        supported.
+        """This functions finds the reader of the data file, see
+        `find_data_file_reader`, by its extension or content and reads the data file
+        with it or logs a warning if the format is not supported.
         """
         if self.data_file is None:
             logger.warning('No data file found.')
             return
+        if not archive.m_context.raw_path_exists(self.data_file):
+            logger.warning(
+                f"""No data is extracted from the data file {self.data_file}, as it
+                is missing."""
+            )
+            return
 
-        if self.data_file.endswith('.csv') or self.data_file.endswith('.xlsx'):
-            self.read_clean_data(archive, logger)
-        elif self.data_file.endswith('.h5'):
-            if self.data_file.endswith('NH3_Decomposition.h5'):
-                self.read_haber_data(archive, logger)
-            else:
-                try:
-                    self.read_haber_data(archive, logger)
-                except KeyError:
-                    logger.warning(
-                        """No data is extracted from this h5 data file as the file is
-                        either missing or the format is not (yet) supported.
-                        This file contains a different data
-                        structure or object names from currently supported h5 files for
-                        catalysis. Please check if you can modify the structure or
-                        contact the plugin developers if you want to add support for
-                        this."""
-                    )
+        try:
+            reader = find_data_file_reader(
+                self.data_file,
+                lambda: archive.m_context.raw_file(self.data_file, 'rb'),
+            )
+        except OSError:
+            reader = None
+        if reader is not None:
+            try:
+                reader.load()(self, archive, logger)
+            except ImportError:
+                if reader.requires is None:
+                    raise
+                logger.warning(
+                    f"""No data is extracted from this data file, because reading
+                    {reader.name} files requires {reader.requires}."""
+                )
+            except OSError as e:
+                logger.warning(
+                    f"""No data is extracted from the data file {self.data_file},
+                    as it can not be read: {e!r}"""
+                )
+            return
+
+        extensions = get_data_file_extensions()
+        if self.data_file.endswith(tuple(extensions)):
+            logger.warning(
+                """No data is extracted from this data file as the file is
+                either missing or the format is not (yet) supported.
+                This file contains a different data
+                structure or object names from currently supported files for
+                catalysis. Please check if you can modify the structure or
+                contact the plugin developers if you want to add support for
+                this."""
+            )
         else:
             logger.warning(
-                """Data file format not supported. No data is extracted from the
-                provided file. Please provide a standadized .csv, .xlsx or .h5 file,
+                f"""Data file format not supported. No data is extracted from the
+                provided file. Please provide a standadized
+                {', '.join(extensions[:-1])} or {extensions[-1]} file,
                 if you want direct data extraction into the schema."""
             )
-            return
 
     def populate_reactivity_info(
-        self, archive: 'EntryArchive', logger: 'BoundLogger'
+        self,
+        archive: 'EntryArchive',
+        logger: 'BoundLogger',
+        reduction: SteadyStates | Downsampling | None = None,
     ) -> None:
         """
         Maps and copies the reaction data from data to the results archive
-        of the measurement.
+        of the measurement. Large arrays are averaged per steady state or
+        downsampled, as given by the `reduction` of the reaction.
         """
         add_activity(archive)
 
@@ -2104,6 +1882,7 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
             logger,
             mapping=quantities_results_mapping,
             target=archive.results.properties.catalytic.reaction,
+            reduction=reduction,
         )
 
     def check_duplicate_elements(
@@ -2226,6 +2005,26 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
             x_text = 'steps'
         return x, x_text
 
+    def plot_values(self, values):
+        """Helper function to reduce large time series for the plots to the bucket
+        means of the finest level of the time series pyramid with at most
+        "plot_datapoints" (3000) buckets.
+        Args:
+            values (np.array): the x- or y-axis data
+        Returns:
+            values (np.array): the reduced data, or the data if it is not reduced
+        """
+        pyramid = self.results[0].pyramid
+        level = pyramid.get_level(plot_datapoints) if pyramid is not None else None
+        if (
+            level is None
+            or values is None
+            or np.ndim(values) != 1
+            or len(values) != pyramid.number_of_points
+        ):
+            return values
+        return bucket_means(values, level.points_per_bucket)
+
     def get_y_data(self, plot_quantities_dict, var):
         """Helper function to get the y data for the plots.
         Args:
@@ -2258,6 +2057,8 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
             fig1 (plotly.graph_objs.Figure): the plotly figure
 
         """
+        import plotly.graph_objs as go
+
         if not self.results[0].reactants_conversions:
             logger.warning('no conversion data found, so no plot is created')
             return
@@ -2269,7 +2070,9 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
             fig1.add_trace(
                 go.Scatter(
                     x=x,
-                    y=self.results[0].reactants_conversions[i].conversion,
+                    y=self.plot_values(
+                        self.results[0].reactants_conversions[i].conversion
+                    ),
                     name=self.results[0].reactants_conversions[i].name,
                 )
             )
@@ -2289,6 +2092,9 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
         Returns:
             fig (plotly.graph_objs.Figure): the plotly figure
         """
+        import plotly.express as px
+        import plotly.graph_objs as go
+
         fig = go.Figure()
         fig = px.line(x=x, y=y, markers=True)
         fig.update_layout(title_text=title)
@@ -2297,6 +2103,8 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
         return fig
 
     def make_rates_plot(self, x, x_text):
+        import plotly.graph_objs as go
+
         rates_list = [
             'reaction_rate',
             'rate',
@@ -2328,7 +2136,7 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
                         fig.add_trace(
                             go.Scatter(
                                 x=x,
-                                y=y,
+                                y=self.plot_values(y),
                                 name=self.results[0].rates[i].name,
                             )
                         )
@@ -2342,7 +2150,7 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
                     fig.add_trace(
                         go.Scatter(
                             x=x,
-                            y=y,
+                            y=self.plot_values(y),
                             name=self.results[0].rates[i].name,
                         )
                     )
@@ -2355,8 +2163,11 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
         """
         This function creates the figures for the CatalyticReaction class.
         """
+        import plotly.graph_objs as go
+
         self.figures = []
         x, x_text = self.determine_x_axis()
+        x = self.plot_values(x)
 
         plot_quantities_dict = {
             'Temperature': 'temperature',
@@ -2381,7 +2192,9 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
                 continue
             y.to(unit_dict[var])
             y_text = y_text + ' (' + unit_dict[var] + ')'
-            fig = self.single_plot(x, x_text, y.to(unit_dict[var]), y_text, title)
+            fig = self.single_plot(
+                x, x_text, self.plot_values(y.to(unit_dict[var])), y_text, title
+            )
             self.figures.append(PlotlyFigure(label=title, figure=fig.to_plotly_json()))
 
         fig1 = self.conversion_plot(x, x_text, logger)
@@ -2405,7 +2218,7 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
                 fig0.add_trace(
                     go.Scatter(
                         x=x,
-                        y=self.results[0].products[i].selectivity,
+                        y=self.plot_values(self.results[0].products[i].selectivity),
                         name=self.results[0].products[i].name,
                     )
                 )
@@ -2432,8 +2245,10 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
                 for j, p in enumerate(self.results[0].products):
                     fig.add_trace(
                         go.Scatter(
-                            x=self.results[0].reactants_conversions[i].conversion,
-                            y=self.results[0].products[j].selectivity,
+                            x=self.plot_values(
+                                self.results[0].reactants_conversions[i].conversion
+                            ),
+                            y=self.plot_values(self.results[0].products[j].selectivity),
                             name=self.results[0].products[j].name,
                             mode='markers',
                         )
@@ -2456,149 +2271,323 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
 
         self.reaction_conditions.normalize(archive, logger)
 
-    def remove_ramps_from_data(self, data_with_ramps: np.array, data) -> np.array:
+    def get_steady_states(self) -> SteadyStates | None:
         """
-        This function removes the ramps with changeing conditions from the data.
-        Args:
-            data_with_ramps (np.array): the data with ramps which is used to determine
-            the indices of the ramps, in this case the temperature data
-            data (np.array): the data which is supposed to be cleaned from the ramps
+        This function finds the steady states of a reaction with more data points
+        than "threshold_datapoints" (300), see `find_steady_states`. The steps are
+        given by the runs, e.g. the step column of the data file, if points of the
+        same step follow each other, otherwise they are the plateaus of the set
+        temperature, pressure and total flow rate. Returns None if fewer than two
+        steady states are found.
+        """
+        conditions = self.reaction_conditions
+        results = self.results[0] if self.results else None
+        steady_states = None
+        for runs in (getattr(results, 'runs', None), getattr(conditions, 'runs', None)):
+            if (
+                runs is not None
+                and len(runs) > threshold_datapoints
+                and len(np.unique(runs)) < len(runs)
+            ):
+                steady_states = group_steps(runs)
+                break
+        else:
+            setpoints = [
+                (getattr(conditions, name, None), tolerance)
+                for name, tolerance in steady_state_tolerances.items()
+            ]
+            setpoints = [
+                (setpoint, tolerance)
+                for setpoint, tolerance in setpoints
+                if setpoint is not None and len(setpoint) > threshold_datapoints
+            ]
+            if setpoints:
+                size = len(setpoints[0][0])
+                setpoints = [s for s in setpoints if len(s[0]) == size]
+                steady_states = find_steady_states(*zip(*setpoints))
+        if steady_states is None or len(steady_states) < 2:  # noqa: PLR2004
+            return None
+        return steady_states
+
+    def get_downsampling(self, logger: 'BoundLogger') -> Downsampling | None:
+        """
+        This function selects the "threshold_datapoints" (300) points to which the
+        time series of a reaction with more data points are downsampled, once from all
+        of them, so that the downsampled quantities stay aligned, see `select_points`.
+        Returns None if there are no large time series.
+        """
+        sizes = [
+            len(value)
+            for _, section in self.get_time_series_sections()
+            for name in section.m_def.all_quantities
+            if np.ndim(value := getattr(section, name, None)) == 1
+            and len(value) > threshold_datapoints
+        ]
+        if not sizes:
+            return None
+        size = max(set(sizes), key=sizes.count)
+        _, _, columns = self.get_time_series(size, exclude=('runs', 'time_on_stream'))
+        if not columns:
+            return None
+        time = None
+        for path in ['results', 'reaction_conditions']:
+            time = get_nested_attr(self, f'{path}.time_on_stream')
+            if time is not None and np.ndim(time) == 1 and len(time) == size:
+                break
+            time = None
+        return select_points(
+            columns, threshold_datapoints, get_downsampling_method(logger), x=time
+        )
+
+    def get_time_series_sections(self) -> list[tuple[str, ArchiveSection]]:
+        """
+        This function returns the sections of the reaction conditions and results
+        that contain time series, with their paths in the entry, e.g.
+        results.reactants_conversions[ammonia].
         """
-        data_ = []
-        for i in range(50, len(data_with_ramps) - 50, 10):
-            deltaT = data_with_ramps[i] - data_with_ramps[50 + i]
-            if abs(deltaT) < 0.05 * ureg.kelvin:
-                T = data[i]
+        results = self.results[0] if self.results else None
+        sections = [('reaction_conditions', self.reaction_conditions)]
+        if self.reaction_conditions is not None:
+            sections.extend(
+                (f'reaction_conditions.reagents[{reagent.name}]', reagent)
+                for reagent in self.reaction_conditions.reagents
+            )
+        sections.append(('results', results))
+        for attr in ['reactants_conversions', 'rates', 'products']:
+            sections.extend(
+                (f'results.{attr}[{section.name}]', section)
+                for section in getattr(results, attr, [])
+            )
+        return [(path, section) for path, section in sections if section is not None]
+
+    def get_time_series(
+        self, size: int, exclude: tuple[str, ...] = ('runs',)
+    ) -> tuple[list[str], list[str | None], list[np.ndarray]]:
+        """
+        This function collects the time series with `size` data points of the
+        reaction conditions and results, except for the quantities `exclude`, and
+        returns their paths in the entry, their units and their values.
+        """
+        names, units, columns = [], [], []
+        for path, section in self.get_time_series_sections():
+            for name, definition in section.m_def.all_quantities.items():
+                value = getattr(section, name, None)
+                if (
+                    name in exclude
+                    or value is None
+                    or np.ndim(value) != 1
+                    or len(value) != size
+                ):
+                    continue
                 try:
-                    data_.append(T.magnitude)
-                except AttributeError:
-                    data_.append(T)
-        return data_
+                    columns.append(magnitude(value))
+                except (TypeError, ValueError):
+                    continue
+                names.append(f'{path}.{name}')
+                units.append(str(definition.unit) if definition.unit else None)
+        return names, units, columns
 
-    def reduce_haber_data(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
+    def write_steady_states(
+        self, steady_states: SteadyStates | None, logger: 'BoundLogger'
+    ) -> None:
         """
-        This function reduces the size of the arrays for the results section of the
-        archive, by removing sections with changeing temperature conditions and
-        averaging the values at each steady state.
+        This function writes the mean, standard deviation, minimum and maximum of all
+        time series of the reaction conditions and results, and the duration of each
+        steady state into the results section of the reaction.
         """
-        if self.instruments[0].name == 'Haber':
-            data_dict = {
-                'Temp': self.reaction_conditions.set_temperature,
-                'Pres': self.reaction_conditions.set_pressure,
-                'Whsv': self.reaction_conditions.weight_hourly_space_velocity,
-                'Flow': self.results[0].total_flow_rate,
-                'Conv': self.results[0].reactants_conversions[0].conversion,
-                'NH3conc': self.reaction_conditions.reagents[0].fraction_in,
-                'Rate': self.results[0].rates[0].reaction_rate,
-                'Time': self.results[0].time_on_stream,
-            }
-            data_dict_no_ramps = {}
-            for key, value in data_dict.items():
-                data_dict_no_ramps[key] = self.remove_ramps_from_data(
-                    data_dict['Temp'], value
-                )
+        if steady_states is None or not self.results:
+            return
+        results = self.results[0]
+        names, units, columns = self.get_time_series(
+            steady_states.size, exclude=('runs', 'time_on_stream')
+        )
 
-            # getting the temperature values of each step
-            from itertools import groupby  #noqa: PLC0415
-
-            Temp_program = [key for key, _group in groupby(data_dict_no_ramps['Temp'])]
-            # Temp_program = Temp_program.reset_index(drop=True)
-            Temp_ = data_dict_no_ramps['Temp']
-
-            Temps = []
-            Press = []
-            flows = []
-            WHSVs = []
-            NH3concs = []
-            Convs = []
-            Rates = []
-            Times = []
-
-            for step in range(len(Temp_program)):
-                data_dict_single_step = {}
-                for key in data_dict_no_ramps:
-                    data_dict_single_step[key] = []
-
-                for j in range(len(Temp_) - 1):
-                    if Temp_[j] == Temp_program[step] and (
-                        step < (len(Temp_program) / 2) and j < (len(Temp_) / 2)
-                    ):
-                        for key in data_dict_no_ramps:
-                            data_dict_single_step[key].append(
-                                data_dict_no_ramps[key][j]
-                            )
+        steady_state_data = SteadyStateData(
+            runs=np.arange(1, len(steady_states) + 1),
+            number_of_points=steady_states.counts,
+        )
+        time = results.time_on_stream
+        if time is None and self.reaction_conditions is not None:
+            time = self.reaction_conditions.time_on_stream
+        if time is None or not steady_states.matches(time):
+            time = None
+        elif not columns:
+            columns = [time]
+        statistics = steady_states.aggregate(columns, time) if columns else None
+        if time is not None:
+            steady_state_data.time_on_stream = statistics.last_times * time.units
+            steady_state_data.duration = (
+                statistics.last_times - statistics.first_times
+            ) * time.units
+        if names:
+            steady_state_data.quantities = [
+                SteadyStateQuantity(
+                    name=name, unit=unit, mean=mean, std=std, min=min_, max=max_
+                )
+                for name, unit, mean, std, min_, max_ in zip(
+                    names,
+                    units,
+                    statistics.means.T,
+                    statistics.stds.T,
+                    statistics.mins.T,
+                    statistics.maxs.T,
+                )
+            ]
+        results.steady_states = steady_state_data
+        logger.info(
+            f"""Found {len(steady_states)} steady states, the results are averaged
+            per steady state for the archive results."""
+        )
 
-                    elif (
-                        step < (len(Temp_program) / 2) and Temp_[j] > Temp_program[step]
-                    ):
-                        continue
-                    elif (
-                        step >= (len(Temp_program) / 2)
-                        and j > (len(Temp_) / 2)
-                        and Temp_[j] == Temp_program[step]
-                    ):
-                        for key in data_dict_no_ramps:
-                            data_dict_single_step[key].append(
-                                data_dict_no_ramps[key][j]
-                            )
-                    elif (
-                        step >= (len(Temp_program) / 2)
-                        and Temp_[j] < Temp_program[step]
-                    ):
-                        continue
+    def write_pyramid(self, logger: 'BoundLogger') -> None:
+        """
+        This function aggregates the time series of a reaction with more data points
+        than "threshold_datapoints" (300) into the levels of a time series pyramid,
+        see `build_pyramid`, and writes it into the results section of the reaction.
+        """
+        results = self.results[0]
+        time = results.time_on_stream
+        if time is None and self.reaction_conditions is not None:
+            time = self.reaction_conditions.time_on_stream
+        if time is None or np.ndim(time) != 1 or len(time) <= threshold_datapoints:
+            return
+        pyramid = TimeSeriesPyramid(number_of_points=len(time))
+        for name, unit, values in zip(*self.get_time_series(len(time))):
+            for n, (points, mins, means, maxs) in enumerate(
+                build_pyramid(values, threshold_datapoints)
+            ):
+                if n == len(pyramid.levels):
+                    pyramid.levels.append(
+                        TimeSeriesLevel(
+                            points_per_bucket=points, number_of_buckets=len(means)
+                        )
+                    )
+                pyramid.levels[n].quantities.append(
+                    TimeSeriesQuantity(
+                        name=name, unit=unit, min=mins, mean=means, max=maxs
+                    )
+                )
+        results.pyramid = pyramid
+        logger.info(
+            f"""Aggregated the time series into {len(pyramid.levels)} levels with
+            at most {threshold_datapoints} buckets in the coarsest level."""
+        )
 
-                Temps.append(np.mean(data_dict_single_step['Temp']))
-                Press.append(np.mean(data_dict_single_step['Pres']))
-                flows.append(np.mean(data_dict_single_step['Flow']))
-                WHSVs.append(np.mean(data_dict_single_step['Whsv']))
-                Convs.append(np.mean(data_dict_single_step['Conv']))
-                Rates.append(np.mean(data_dict_single_step['Rate']))
-                NH3concs.append(np.mean(data_dict_single_step['NH3conc']))
-                Times.append(data_dict_single_step['Time'][-1])
-
-            archive.results.properties.catalytic.reaction.reaction_conditions.weight_hourly_space_velocity = (  # noqa: E501
-                WHSVs * ureg.m**3 / ureg.kg / ureg.second
-            )  # noqa: E501
-            archive.results.properties.catalytic.reaction.reaction_conditions.flow_rate = (  # noqa: E501
-                flows * ureg.m**3 / ureg.second
-            )
-            archive.results.properties.catalytic.reaction.reaction_conditions.temperature = (  # noqa: E501
-                Temps * ureg.kelvin
-            )
-            archive.results.properties.catalytic.reaction.reaction_conditions.pressure = (  # noqa: E501
-                Press * ureg.pascal
-            )
-            archive.results.properties.catalytic.reaction.reaction_conditions.time_on_stream = (  # noqa: E501
-                Times * ureg.second
-            )
-            h2_rate = Rate(
-                name='molecular hydrogen',
-                reaction_rate=Rates * ureg.mmol / ureg.g / ureg.hour,
+    def offload_arrays(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
+        """
+        This function writes the time series of the reaction conditions and results,
+        and the levels of their pyramid, with more data points than the configured
+        "array_offload_threshold" into the HDF5 sidecar file of the entry, see
+        `write_arrays`. In the archive, they are replaced by references to their
+        datasets with summary statistics. If the file can not be written, e.g. in a
+        published upload, the arrays stay in the archive.
+        """
+        threshold = getattr(configuration, 'array_offload_threshold', None)
+        if (
+            threshold is None
+            or not self.results
+            or archive.m_context is None
+            or archive.metadata is None
+            or archive.metadata.mainfile is None
+        ):
+            return
+        file_name = get_sidecar_file_name(archive.metadata.mainfile)
+        sections = self.get_time_series_sections()
+        if self.results[0].pyramid is not None:
+            sections.extend(
+                (f'results.pyramid.levels[{n}].quantities[{quantity.name}]', quantity)
+                for n, level in enumerate(self.results[0].pyramid.levels)
+                for quantity in level.quantities
             )
-            rates = []
-            rates.append(h2_rate)
-            set_nested_attr(
-                archive.results.properties.catalytic.reaction,
-                'rates',
-                rates,
+        arrays, offloaded, quantities = {}, [], []
+        for path, section in sections:
+            for name, definition in section.m_def.all_quantities.items():
+                value = getattr(section, name, None)
+                if (
+                    value is None
+                    or definition.shape != ['*']
+                    or np.ndim(value) != 1
+                    or len(value) <= threshold
+                ):
+                    continue
+                try:
+                    values = magnitude(value)
+                except (TypeError, ValueError):
+                    continue
+                dataset = f'{section.m_path()}/{name}'
+                arrays[dataset] = values
+                offloaded.append(
+                    OffloadedArray(
+                        name=f'{path}.{name}',
+                        reference=f'{file_name}#{dataset}',
+                        unit=str(definition.unit) if definition.unit else None,
+                        number_of_points=len(values),
+                        **summarize(values),
+                    )
+                )
+                quantities.append((section, name))
+        if not arrays:
+            return
+        try:
+            with archive.m_context.raw_file(file_name, 'wb') as f:
+                write_arrays(f, arrays)
+        except (KeyError, OSError) as e:
+            logger.warning(
+                f"""The time series could not be written into {file_name} and are
+                stored in the archive: {e!r}"""
             )
+            return
+        for section, name in quantities:
+            setattr(section, name, None)
+        self.offloaded_arrays = offloaded
+        logger.info(f'Moved {len(arrays)} time series into the file {file_name}.')
 
-        react = Reactant(name='ammonia', conversion=Convs, mole_fraction_in=NH3concs)
-
-        return react
-
-    def check_react(self, react, threshold_datapoints, archive, logger):
+    def load_offloaded_arrays(
+        self, archive: 'EntryArchive', logger: 'BoundLogger'
+    ) -> None:
+        """
+        This function reads the time series that were moved into the HDF5 sidecar
+        file of the entry back into the reaction conditions and results, so that the
+        entry is normalized with all data.
+        """
+        if not self.offloaded_arrays or archive.m_context is None:
+            return
+        files: dict[str, list[str]] = {}
+        for offloaded in self.offloaded_arrays:
+            file_name, _, dataset = offloaded.reference.partition('#')
+            files.setdefault(file_name, []).append(dataset)
+        for file_name, datasets in files.items():
+            try:
+                with archive.m_context.raw_file(file_name, 'rb') as f:
+                    arrays = read_arrays(f, datasets)
+            except (KeyError, OSError) as e:
+                logger.warning(
+                    f'The time series file {file_name} could not be read: {e!r}'
+                )
+                continue
+            for dataset, values in arrays.items():
+                section_path, name = dataset.rsplit('/', 1)
+                try:
+                    section = archive.m_resolve(section_path)
+                except MetainfoReferenceError:
+                    section = None
+                if section is not None and getattr(section, name, None) is None:
+                    setattr(section, name, values)
+        self.offloaded_arrays = []
+
+    def check_react(self, react, threshold_datapoints, archive, logger, reduction=None):
         """
         This function checks if the arrays in the reactant are larger than the number
         stored in "threshold_datapoints" (300). If the arrays are larger, it will reduce
-        the size to store in the archive. If it is a haber measurement, it will call the
-        function "reduce_haber_data" which averages the values at each steady state. If
-        it is not a haber measurement, it will reduce the size of the arrays by taking
-        every 100th value.
+        the size to store in the archive. The values are averaged at each steady
+        state or downsampled to "threshold_datapoints" values, as given by the
+        `reduction` of the reaction.
         Args:
             react (Reactant): the reactant object
             threshold_datapoints (int): the size limit of the arrays above which the
                 arrays will be reduced in size.
+            reduction (SteadyStates | Downsampling): the steady states or the
+                downsampling of the reaction.
         return: the reactant object with the reduced arrays.
         """
         for key1 in react:
@@ -2610,27 +2599,25 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
                     f"""Large arrays in {react.name}, reducing to store in the
                     archive."""
                 )
-                if (
-                    self.instruments is not None
-                    and self.instruments != []
-                    and self.instruments[0].name == 'Haber'
-                ):
-                    react = self.reduce_haber_data(archive, logger)
-                else:
-                    for key in react:
-                        if key == 'name':
-                            continue
-                        if getattr(react, key) is not None:
-                            if len(getattr(react, key1)) > threshold2_datapoints:
-                                setattr(react, key, getattr(react, key)[50::100])
-                            else:
-                                setattr(react, key, getattr(react, key)[20::10])
+                for key in react:
+                    if key == 'name':
+                        continue
+                    value = getattr(react, key)
+                    if value is None:
+                        continue
+                    if reduction is not None and reduction.matches(value):
+                        setattr(react, key, reduction.reduce(value))
+                    else:
+                        setattr(react, key, downsample_results(value, logger))
 
                 break
         return react
 
     def return_conversion_results(
-        self, archive: 'EntryArchive', logger: 'BoundLogger'
+        self,
+        archive: 'EntryArchive',
+        logger: 'BoundLogger',
+        reduction: SteadyStates | Downsampling | None = None,
     ) -> list:
         """
         This function returns the conversion results of the reactants for the results
@@ -2688,21 +2675,26 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
                         mole_fraction_in=i.fraction_in,
                         mole_fraction_out=i.fraction_out,
                     )
-                react = self.check_react(react, threshold_datapoints, archive, logger)
+                react = self.check_react(
+                    react, threshold_datapoints, archive, logger, reduction
+                )
 
                 conversions_results.append(react)
                 break
         return conversions_results
 
     def write_conversion_results(
-        self, archive: 'EntryArchive', logger: 'BoundLogger'
+        self,
+        archive: 'EntryArchive',
+        logger: 'BoundLogger',
+        reduction: SteadyStates | Downsampling | None = None,
     ) -> None:
         """This function writes the conversion results to the archive."""
 
         if self.results[0].reactants_conversions is None:
             return []
 
-        conversions_results = self.return_conversion_results(archive, logger)
+        conversions_results = self.return_conversion_results(archive, logger, reduction)
 
         add_activity(archive)
 
@@ -2713,11 +2705,15 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
         )
 
     def write_products_results(
-        self, archive: 'EntryArchive', logger: 'BoundLogger'
+        self,
+        archive: 'EntryArchive',
+        logger: 'BoundLogger',
+        reduction: SteadyStates | Downsampling | None = None,
     ) -> None:
         """This function writes the product results to the archive. If the arrays are
         larger than the number stored in "threshold_datapoints" (300), it will reduce
-        the size to store in the archive.
+        the size to store in the archive, by averaging at each steady state or
+        downsampling, as given by the `reduction` of the reaction.
         """
         if self.results[0].products is None:
             return
@@ -2737,10 +2733,14 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
             ):
                 attr_value = getattr(i, attr, None)
                 if attr_value is not None and len(attr_value) > threshold_datapoints:
-                    if threshold2_datapoints > len(attr_value):
-                        setattr(prod, attrs_result[n], attr_value[20::10])
+                    if reduction is not None and reduction.matches(attr_value):
+                        setattr(prod, attrs_result[n], reduction.reduce(attr_value))
                     else:
-                        setattr(prod, attrs_result[n], attr_value[50::100])
+                        setattr(
+                            prod,
+                            attrs_result[n],
+                            downsample_results(attr_value, logger),
+                        )
                     logger.info(
                         f"""Large arrays in product attribute '{attr}' for {i.name}, 
                         reducing to store in the archive."""
@@ -2757,9 +2757,14 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
         )
 
     def write_rates_results(
-        self, archive: 'EntryArchive', logger: 'BoundLogger'
-    ) -> None:  # noqa: E501
-        """This function writes the rates results to the archive."""
+        self,
+        archive: 'EntryArchive',
+        logger: 'BoundLogger',
+        reduction: SteadyStates | Downsampling | None = None,
+    ) -> None:
+        """This function writes the rates results to the archive. Large arrays are
+        averaged at each steady state or downsampled, as given by the `reduction` of
+        the reaction."""
 
         if self.results[0].rates is None:
             return
@@ -2793,10 +2798,14 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
             ]:
                 attr_value = getattr(i, attr, None)
                 if attr_value is not None and len(attr_value) > threshold_datapoints:
-                    if threshold2_datapoints > len(attr_value):
-                        setattr(rate, attr, attr_value[20::10])
+                    if reduction is not None and reduction.matches(attr_value):
+                        setattr(rate, attr, reduction.reduce(attr_value))
                     else:
-                        setattr(rate, attr, attr_value[50::100])
+                        setattr(
+                            rate,
+                            attr,
+                            downsample_results(attr_value, logger),
+                        )
                     logger.info(
                         f"Large arrays in rate attribute '{attr}' for {i.name}, "
                         'reducing to store in the archive.'
@@ -2825,6 +2834,7 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
     def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
         super().normalize(archive, logger)
 
+        self.load_offloaded_arrays(archive, logger)
         if self.data_file is not None:
             self.check_and_read_data_file(archive, logger)
             logger.info('Data file processed.')
@@ -2833,8 +2843,10 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
         if self.pretreatment is not None:
             self.pretreatment.normalize(archive, logger)
 
+        steady_states = self.get_steady_states()
+        reduction = steady_states or self.get_downsampling(logger)
         if self.reaction_conditions is not None or self.results is not None:
-            self.populate_reactivity_info(archive, logger)
+            self.populate_reactivity_info(archive, logger, reduction)
         self.check_sample(archive, logger)
 
         if self.results is None or self.results == []:
@@ -2846,11 +2858,14 @@ class CatalyticReaction(CatalyticReactionCore, PlotSection, Schema):
                 """Several instances of results found. Only the first result
                 is considered for normalization."""
             )
-        self.write_conversion_results(archive, logger)
-        self.write_products_results(archive, logger)
-        self.write_rates_results(archive, logger)
+        self.write_steady_states(steady_states, logger)
+        self.write_pyramid(logger)
+        self.write_conversion_results(archive, logger, reduction)
+        self.write_products_results(archive, logger, reduction)
+        self.write_rates_results(archive, logger, reduction)
 
         self.plot_figures(archive, logger)
+        self.offload_arrays(archive, logger)
 
 
 m_package.__init_metainfo__()
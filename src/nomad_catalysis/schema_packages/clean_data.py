@@ -0,0 +1,296 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from nomad.units import ureg
+
+from .units import (
+    FLOW_RATE_UNIT,
+    UNIT_CACHE_SIZE,
+    get_mass_unit,
+    get_rate_unit,
+    get_temperature_unit,
+    get_time_unit,
+)
+
+if TYPE_CHECKING:
+    from typing import BinaryIO
+
+    import pandas as pd
+    from nomad.datamodel.data import ArchiveSection
+    from structlog.stdlib import BoundLogger
+
+ARROW_EXTENSIONS = ('.parquet', '.arrow', '.feather')
+
+METADATA_COLUMNS = [
+    'FHI-ID',
+    'sample_id',
+    'catalyst',
+    'reaction_name',
+    'reaction_type',
+    'experimenter',
+    'location',
+]
+
+
+@dataclass(frozen=True)
+class CleanDataColumn:
+    """
+    The meaning of a column of a clean data file, compiled from its header, e.g.
+    'x_r ethane (%)' is the reactant-based conversion of the species 'ethane'.
+    Numeric values are divided by `divisor` and get the pint `unit`, if any. A
+    column with a `warning` has a header that is recognized but a unit that is not.
+    """
+
+    column: str
+    kind: str
+    species: str | None = None
+    unit: Any = None
+    divisor: float = 1
+    warning: str | None = None
+
+    @property
+    def numeric(self) -> bool:
+        return self.kind != 'step' and self.warning is None
+
+    def quantity(self, values: np.ndarray) -> Any:
+        if self.unit is None:
+            return values
+        return ureg.Quantity(values, self.unit)
+
+
+@dataclass(frozen=True)
+class CleanDataPlan:
+    """
+    The compiled header of a clean data file. `has_runs` is true if any header has
+    a unit token, in which case the number of runs is the number of rows.
+    """
+
+    columns: tuple[CleanDataColumn, ...]
+    has_runs: bool
+
+    def values(self, data_frame: 'pd.DataFrame') -> dict[str, np.ndarray]:
+        """
+        Converts all numeric columns of the plan into a single float block with NaN
+        replaced by zero and returns the columns of the block by column name.
+        """
+        names = list(dict.fromkeys(col.column for col in self.columns if col.numeric))
+        block = np.asfortranarray(data_frame[names].to_numpy(dtype=float))
+        # the block can be a read-only view of the data frame, e.g. from the cache
+        block = np.nan_to_num(block, copy=not block.flags.writeable)
+        return {name: block[:, n] for n, name in enumerate(names)}
+
+
+def compile_clean_data_column(col: str) -> CleanDataColumn | None:  # noqa: PLR0911, PLR0912
+    """
+    Returns the meaning of the column with the header `col`, or None if it is not
+    read. The header is split at single spaces into the field, the species and the
+    unit token.
+    """
+    col_split = col.split(' ')
+    field = col_split[0].casefold()
+    if col.casefold() == 'step':
+        return CleanDataColumn(col, 'step')
+    if col.casefold() == 'c-balance':
+        return CleanDataColumn(col, 'c_balance')
+    if len(col_split) < 2:  # noqa: PLR2004
+        return None
+
+    if field == 'c-balance' and '%' in col_split[1]:
+        return CleanDataColumn(col, 'c_balance', divisor=100)
+    if field == 'x':
+        percent = len(col_split) == 3 and '%' in col_split[2]  # noqa: PLR2004
+        return CleanDataColumn(
+            col, 'fraction_in', col_split[1], divisor=100 if percent else 1
+        )
+    if field == 'mass':
+        try:
+            return CleanDataColumn(col, 'mass', unit=get_mass_unit(col_split[1]))
+        except ValueError:
+            return CleanDataColumn(
+                col, 'mass', warning=f'Mass unit of column {col} not recognized.'
+            )
+    if field in ['set_temperature', 'temperature']:
+        if get_temperature_unit(col_split[1]) == ureg.kelvin:
+            return CleanDataColumn(col, field)
+        return CleanDataColumn(col, field, unit=ureg.celsius)
+    if field in ['tos', 'time']:
+        try:
+            return CleanDataColumn(
+                col, 'time_on_stream', unit=get_time_unit(col_split[1])
+            )
+        except ValueError:
+            return CleanDataColumn(
+                col, 'time_on_stream', warning='Time on stream unit not recognized.'
+            )
+    if col_split[0] == 'GHSV':
+        if '1/h' in col_split[1] or 'h^-1' in col_split[1]:
+            return CleanDataColumn(col, 'ghsv', unit=ureg.hour**-1)
+        return CleanDataColumn(
+            col, 'ghsv', warning='Gas hourly space velocity unit not recognized.'
+        )
+    if col_split[0] in ['Vflow', 'flow_rate']:
+        if 'mL/min' in col_split[1] or 'mln' in col_split[1]:
+            return CleanDataColumn(col, 'flow_rate', unit=FLOW_RATE_UNIT)
+        return None
+    if col_split[0] == 'set_pressure' and 'bar' in col_split[1]:
+        return CleanDataColumn(col, 'set_pressure', unit=ureg.bar)
+    if field == 'pressure' and 'bar' in col_split[1]:
+        return CleanDataColumn(col, 'pressure', unit=ureg.bar)
+
+    if len(col_split) < 3:  # noqa: PLR2004
+        return None
+    if col_split[0] == 'r':  # reaction rate
+        try:
+            unit = get_rate_unit(col_split[2])
+        except Exception as e:
+            return CleanDataColumn(
+                col,
+                'rate',
+                col_split[1],
+                warning=f"""Reaction rate unit {col_split[2]} not
+                                   recognized. Error: {e}""",
+            )
+        return CleanDataColumn(col, 'rate', col_split[1], unit=unit)
+    if col_split[2] != '(%)':
+        return None
+    if col_split[0] in ['x_p', 'x_r', 'S_p']:
+        return CleanDataColumn(col, col_split[0], col_split[1])
+    if field in ['x_out', 'y']:
+        return CleanDataColumn(col, field, col_split[1])
+    return None
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def compile_clean_data_plan(columns: tuple[str, ...]) -> CleanDataPlan:
+    """
+    Compiles the headers `columns` of a clean data file into a CleanDataPlan. The
+    plan is cached per header, so that files with the same header share it.
+    """
+    compiled = (compile_clean_data_column(col) for col in columns)
+    return CleanDataPlan(
+        columns=tuple(col for col in compiled if col is not None),
+        has_runs=any(len(col.split(' ')) >= 2 for col in columns),  # noqa: PLR2004
+    )
+
+
+def get_used_columns(columns) -> list[str]:
+    """
+    Returns the columns of a clean data file that are read into the entry, i.e. the
+    columns with a recognized header and the metadata columns.
+    """
+    return [
+        col
+        for col in columns
+        if col in METADATA_COLUMNS or compile_clean_data_column(col) is not None
+    ]
+
+
+def read_used_columns(
+    read: Callable, f: 'BinaryIO', logger: 'BoundLogger | None' = None, **kwargs
+) -> 'pd.DataFrame':
+    """
+    Reads only the used columns of a csv or xlsx file with the pandas reader `read`,
+    e.g. `pd.read_csv`. The header row is read first to select the columns, which
+    are then read with float dtypes for the numeric columns. If a numeric column
+    holds other values, e.g. 'n.a.', the columns are read without dtypes and these
+    values of the numeric columns become NaN, which is logged for each column.
+    """
+    header = read(f, nrows=0, **kwargs).columns
+    used = get_used_columns(header)
+    dtype = {
+        col.column: float
+        for col in compile_clean_data_plan(tuple(used)).columns
+        if col.numeric
+    }
+    try:
+        f.seek(0)
+        return read(f, usecols=used, dtype=dtype, **kwargs)
+    except ValueError:
+        f.seek(0)
+        data_frame = read(f, usecols=used, **kwargs)
+    import pandas as pd
+
+    for column in dtype:
+        values = pd.to_numeric(data_frame[column], errors='coerce').astype(float)
+        invalid = int(values.isna().sum() - data_frame[column].isna().sum())
+        if invalid and logger is not None:
+            logger.warning(
+                f"""The column '{column}' of the data file has {invalid} values that
+                are not numbers, they are read as missing values."""
+            )
+        data_frame[column] = values
+    return data_frame
+
+
+def _open_ipc(f: 'BinaryIO', options=None):
+    import pyarrow as pa
+
+    try:
+        return pa.ipc.open_file(f, options=options)
+    except pa.ArrowInvalid:
+        f.seek(0)
+        return pa.ipc.open_stream(f, options=options)
+
+
+def read_arrow_data_frame(f: 'BinaryIO', file_name: str) -> 'pd.DataFrame':
+    """
+    Reads a Parquet or Arrow IPC (.arrow/.feather, file or stream format) data file
+    into a data frame. Only the used columns are read from the file and numeric
+    columns without missing values are converted into numpy without copies.
+    Requires pyarrow.
+    """
+    if file_name.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(f)
+        table = parquet_file.read(
+            columns=get_used_columns(parquet_file.schema_arrow.names)
+        )
+    else:
+        import pyarrow as pa
+
+        names = _open_ipc(f).schema.names
+        used = set(get_used_columns(names))
+        f.seek(0)
+        options = pa.ipc.IpcReadOptions(
+            included_fields=[n for n, name in enumerate(names) if name in used]
+        )
+        table = _open_ipc(f, options).read_all()
+    return table.to_pandas(split_blocks=True, self_destruct=True, ignore_metadata=True)
+
+
+class SpeciesIndex:
+    """
+    The sections of the species of a clean data file, e.g. ProductData, in the order
+    in which they were last updated, with a dict index by species name. Several
+    sections can have the same name, `pop_first` returns the one that was updated
+    first.
+    """
+
+    def __init__(self):
+        self._sections = {}
+        self._names = {}
+
+    def append(self, name: str, section: 'ArchiveSection') -> None:
+        self._sections[id(section)] = section
+        self._names.setdefault(name, []).append(section)
+
+    def pop_first(self, name: str) -> 'ArchiveSection | None':
+        sections = self._names.get(name)
+        if not sections:
+            return None
+        section = sections.pop(0)
+        del self._sections[id(section)]
+        return section
+
+    def pop_all(self, name: str) -> list['ArchiveSection']:
+        sections = self._names.pop(name, [])
+        for section in sections:
+            del self._sections[id(section)]
+        return sections
+
+    def to_list(self) -> list['ArchiveSection']:
+        return list(self._sections.values())
@@ -0,0 +1,232 @@
+import numpy as np
+import pandas as pd
+from nomad.datamodel.metainfo.basesections import CompositeSystemReference
+
+from .catalysis import (
+    CatalyticReactionData,
+    ProductData,
+    RatesData,
+    ReactantData,
+    ReactionConditionsData,
+    ReactorFilling,
+    Reagent,
+    configuration,
+)
+from .clean_data import (
+    ARROW_EXTENSIONS,
+    SpeciesIndex,
+    compile_clean_data_plan,
+    read_arrow_data_frame,
+    read_used_columns,
+)
+from .data_file_cache import DataFileCache
+
+data_file_cache = DataFileCache(
+    getattr(configuration, 'data_file_cache_dir', None),
+    getattr(configuration, 'data_file_cache_size', None),
+)
+
+
+def read_data_frame(reaction, archive, logger=None) -> pd.DataFrame:
+    """
+    This function reads the csv, xlsx, Parquet or Arrow data file into a data
+    frame. Only the columns that are used in the schema are read and empty
+    columns are removed. Values of numeric columns that are not numbers are
+    read as missing values, which is logged.
+    """
+    if reaction.data_file.endswith('.csv'):
+        with archive.m_context.raw_file(reaction.data_file, 'rt') as f:
+            data = read_used_columns(pd.read_csv, f, logger)
+    elif reaction.data_file.endswith('.xlsx'):
+        with archive.m_context.raw_file(reaction.data_file, 'rb') as f:
+            data = read_used_columns(pd.read_excel, f, logger, sheet_name=0)
+    elif reaction.data_file.endswith(ARROW_EXTENSIONS):
+        with archive.m_context.raw_file(reaction.data_file, 'rb') as f:
+            data = read_arrow_data_frame(f, reaction.data_file)
+    return data.dropna(axis=1, how='all')
+
+
+def read_clean_data(reaction, archive, logger):  # noqa: PLR0912, PLR0915
+    """
+    This function reads the data from the data file and assigns the data to the
+    corresponding attributes of the CatalyticReaction `reaction`. Unchanged data
+    files are read from the data file cache, if it is configured.
+    """
+    data = data_file_cache.read(
+        archive,
+        reaction.data_file,
+        lambda: read_data_frame(reaction, archive, logger),
+        logger,
+    )
+    feed = ReactionConditionsData()
+    reactor_filling = ReactorFilling()
+    cat_data = CatalyticReactionData()
+    sample = CompositeSystemReference()
+    reagents = []
+    reagent_names = set()
+    products = SpeciesIndex()
+    conversions = SpeciesIndex()
+    rates = []
+    number_of_runs = 0
+
+    plan = compile_clean_data_plan(tuple(data.columns))
+    if len(data) < 2:  # noqa: PLR2004
+        columns = ()
+    else:
+        columns = plan.columns
+        values = plan.values(data)
+        if plan.has_runs:
+            number_of_runs = len(data)
+
+    for column in columns:
+        if column.warning is not None:
+            logger.warning(column.warning)
+            continue
+        col = column.column
+        name = column.species
+        if column.numeric:
+            value = values[col]
+
+        if column.kind == 'step':
+            feed.runs = data[col]
+            cat_data.runs = data[col]
+        elif column.kind == 'c_balance':
+            cat_data.c_balance = (
+                value if column.divisor == 1 else value / column.divisor
+            )
+        elif column.kind == 'fraction_in':
+            gas_in = data[col]
+            if column.divisor != 1:
+                gas_in = gas_in / column.divisor
+            reagents.append(Reagent(name=name, fraction_in=gas_in))
+            reagent_names.add(name)
+        elif column.kind == 'mass':
+            reactor_filling.catalyst_mass = data[col][0] * column.unit
+        elif column.kind == 'set_temperature':
+            feed.set_temperature = column.quantity(value)
+        elif column.kind == 'temperature':
+            cat_data.temperature = column.quantity(value)
+        elif column.kind == 'time_on_stream':
+            cat_data.time_on_stream = column.quantity(value)
+            feed.time_on_stream = column.quantity(value)
+        elif column.kind == 'ghsv':
+            feed.gas_hourly_space_velocity = column.quantity(value)
+        elif column.kind == 'flow_rate':
+            feed.set_total_flow_rate = column.quantity(value)
+        elif column.kind == 'set_pressure':
+            feed.set_pressure = column.quantity(value)
+        elif column.kind == 'pressure':
+            cat_data.pressure = column.quantity(value)
+        elif column.kind == 'rate':
+            try:
+                rate = RatesData(name=name, reaction_rate=column.quantity(value))
+            except Exception as e:
+                logger.warning(f"""Reaction rate unit {col.split(' ')[2]} not
+                               recognized. Error: {e}""")
+            else:
+                rates.append(rate)
+        elif column.kind == 'x_p':  # conversion, based on product detection
+            matches = conversions.pop_all(name)
+            conversion = matches[-1] if matches else ReactantData(name=name)
+            conversion.conversion_product_based = value
+            conversion.conversion = value
+            conversion.conversion_type = 'product-based conversion'
+            conversions.append(name, conversion)
+        elif column.kind == 'x_r':  # conversion, based on reactant detection
+            try:
+                fraction_in = values['x ' + name + ' (%)'] / 100
+            except KeyError:
+                fraction_in = values['x ' + name]
+            conversion = ReactantData(
+                name=name,
+                conversion=value,
+                conversion_type='reactant-based conversion',
+                conversion_reactant_based=value,
+                fraction_in=fraction_in,
+            )
+            matches = conversions.pop_all(name)
+            if matches:
+                conversion = matches[-1]
+                conversion.conversion_reactant_based = value
+            conversions.append(name, conversion)
+        elif column.kind == 'x_out':  # concentration out
+            if name in reagent_names:
+                conversion = ReactantData(
+                    name=name,
+                    fraction_in=values['x ' + name + ' (%)'] / 100,
+                    fraction_out=value / 100,
+                )
+                conversions.append(name, conversion)
+            else:
+                products.append(name, ProductData(name=name, fraction_out=value / 100))
+        elif column.kind == 'S_p':  # selectivity
+            product = products.pop_first(name)
+            if product is None:
+                product = ProductData(name=name)
+            product.selectivity = value
+            products.append(name, product)
+        elif column.kind == 'y':  # product yield
+            product = products.pop_first(name)
+            if product is None:
+                product = ProductData(name=name)
+            product.product_yield = value
+            products.append(name, product)
+
+    if 'FHI-ID' in data.columns:
+        sample.lab_id = str(data['FHI-ID'][0])
+    elif 'sample_id' in data.columns:  # is not None:
+        sample.lab_id = str(data['sample_id'][0])
+    if 'catalyst' in data.columns:  # is not None:
+        sample.name = str(data['catalyst'][0])
+        reactor_filling.catalyst_name = str(data['catalyst'][0])
+    if 'reaction_name' in data.columns:
+        reaction.reaction_name = str(data['reaction_name'][0])
+    if 'reaction_type' in data.columns:
+        reaction.reaction_type = []
+        reaction.reaction_type.extend(data['reaction_type'][0].split(','))
+    if 'experimenter' in data.columns:
+        reaction.experimenter = str(data['experimenter'][0])
+    if 'location' in data.columns:
+        reaction.location = str(data['location'][0])
+
+    if (
+        (reaction.samples is None or reaction.samples == [])
+        and sample != []
+        and sample is not None
+    ):
+        from nomad.datamodel.context import ClientContext
+
+        if isinstance(archive.m_context, ClientContext):
+            pass
+        else:
+            sample.normalize(archive, logger)
+        samples = []
+        samples.append(sample)
+        reaction.samples = samples
+
+    for n, reagent in enumerate(reagents):
+        if (
+            reaction.reaction_conditions is not None
+            and reaction.reaction_conditions.reagents is not None
+            and reaction.reaction_conditions.reagents != []
+            and reaction.reaction_conditions.reagents[n].pure_component is not None
+            and reaction.reaction_conditions.reagents[n].pure_component.iupac_name
+            is not None
+        ):
+            continue
+        reagent.normalize(archive, logger)
+    feed.reagents = reagents
+
+    if cat_data.runs is None:
+        cat_data.runs = np.linspace(0, number_of_runs - 1, number_of_runs)
+    cat_data.products = products.to_list()
+    if conversions.to_list() != []:
+        cat_data.reactants_conversions = conversions.to_list()
+    cat_data.rates = rates
+
+    reaction.reaction_conditions = feed
+    reaction.results = []
+    reaction.results.append(cat_data)
+
+    if reaction.reactor_filling is None and reactor_filling is not None:
+        reaction.reactor_filling = reactor_filling
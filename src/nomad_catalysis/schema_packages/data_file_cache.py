@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import tempfile
+from collections.abc import Callable
+from functools import cache
+from importlib.metadata import PackageNotFoundError, version
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from nomad.datamodel.datamodel import EntryArchive
+    from structlog.stdlib import BoundLogger
+
+HASH_CHUNK_SIZE = 1 << 20
+
+# the version of the format of the cached data frames, which has to be increased
+# whenever the cached columns or their encoding change
+CACHE_VERSION = 2
+
+# a data file with this marker in its cache directory can not be cached, the marker
+# holds the size of the file so that a changed file is hashed again
+UNCACHEABLE_MARKER = 'uncacheable.json'
+
+
+@cache
+def get_plugin_version() -> str | None:
+    try:
+        return version('nomad-catalysis')
+    except PackageNotFoundError:
+        return None
+
+
+def get_file_size(archive: 'EntryArchive', file_name: str) -> int:
+    """
+    Returns the size of the raw file `file_name` without reading its content.
+    """
+    with archive.m_context.raw_file(file_name, 'rb') as f:
+        return f.seek(0, os.SEEK_END)
+
+
+def get_file_hash(archive: 'EntryArchive', file_name: str) -> str:
+    """
+    Returns the sha256 hash of the content of the raw file `file_name`.
+    """
+    file_hash = hashlib.sha256()
+    with archive.m_context.raw_file(file_name, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def data_frame_to_arrays(data_frame: 'pd.DataFrame') -> dict[str, np.ndarray] | None:
+    """
+    Converts the columns of `data_frame` into numpy arrays that can be stored
+    without pickling. Columns of python objects are stored as strings with a mask of
+    the missing values. Returns None if a column holds other objects than strings or
+    a column name is not a string.
+    """
+    if not all(isinstance(name, str) for name in data_frame.columns):
+        return None
+    arrays = {'columns': np.array(data_frame.columns, dtype=str)}
+    for n, (_, column) in enumerate(data_frame.items()):
+        values = column.to_numpy()
+        if values.dtype != object:
+            arrays[f'values_{n}'] = values
+            continue
+        missing = column.isna().to_numpy()
+        if not all(isinstance(value, str) for value in values[~missing]):
+            return None
+        arrays[f'values_{n}'] = np.where(missing, '', values).astype(str)
+        arrays[f'missing_{n}'] = missing
+    return arrays
+
+
+def arrays_to_data_frame(arrays) -> 'pd.DataFrame':
+    import pandas as pd
+
+    columns = {}
+    for n, name in enumerate(arrays['columns'].tolist()):
+        values = arrays[f'values_{n}']
+        if f'missing_{n}' in arrays:
+            values = values.astype(object)
+            values[arrays[f'missing_{n}']] = np.nan
+        columns[name] = values
+    return pd.DataFrame(columns)
+
+
+class DataFileCache:
+    """
+    A cache of the data frames read from the data files of reaction entries, kept
+    in `directory` across normalizations. An entry is keyed by the cache format and
+    plugin version, the upload, the path of the data file and the hash of its
+    content and is stored as an uncompressed npz file, so that a data file that did
+    not change is not parsed again. Only the latest version of each data file is
+    kept and the least recently used entries are removed when the cache is larger
+    than `max_size` bytes. Without a `directory` the cache is disabled and the data
+    files are always read.
+    """
+
+    def __init__(self, directory: str | None, max_size: int | None = None):
+        self.directory = directory
+        self.max_size = max_size
+
+    def get_directory(self, upload_id: str | None, file_name: str) -> str:
+        key = json.dumps([CACHE_VERSION, get_plugin_version(), upload_id, file_name])
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    def get_path(self, upload_id: str | None, file_name: str, file_hash: str) -> str:
+        return os.path.join(
+            self.get_directory(upload_id, file_name), f'{file_hash}.npz'
+        )
+
+    def load(self, path: str) -> 'pd.DataFrame | None':
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as arrays:
+            data_frame = arrays_to_data_frame(arrays)
+        os.utime(path)
+        return data_frame
+
+    def save(self, path: str, data_frame: 'pd.DataFrame') -> bool:
+        """
+        Adds the data frame to the cache at `path` and removes the older versions of
+        the data file. The file is written under a unique temporary name and then
+        renamed, so that workers that normalize the same data file concurrently do
+        not interfere. Returns False if the data frame can not be cached.
+        """
+        arrays = data_frame_to_arrays(data_frame)
+        if arrays is None:
+            return False
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temporary_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as outfile:
+                np.savez(outfile, **arrays)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+        for entry in os.scandir(directory):
+            if entry.name.endswith('.npz') and entry.path != path:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+        self.evict()
+        return True
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used data frames until the cache holds at most
+        `max_size` bytes.
+        """
+        if self.max_size is None:
+            return
+        entries = []
+        for directory in os.scandir(self.directory):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                try:
+                    status = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.endswith('.npz'):
+                    entries.append((status.st_mtime, status.st_size, entry.path))
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+
+    def is_uncacheable(self, directory: str, file_size: int) -> bool:
+        try:
+            with open(os.path.join(directory, UNCACHEABLE_MARKER)) as infile:
+                return json.load(infile) == file_size
+        except (OSError, ValueError):
+            return False
+
+    def mark_uncacheable(self, directory: str, file_size: int) -> None:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, UNCACHEABLE_MARKER), 'w') as outfile:
+            json.dump(file_size, outfile)
+
+    def read(
+        self,
+        archive: 'EntryArchive',
+        file_name: str,
+        reader: Callable[[], 'pd.DataFrame'],
+        logger: 'BoundLogger',
+    ) -> 'pd.DataFrame':
+        """
+        Returns the data frame of the data file `file_name` from the cache or reads
+        it with `reader` and adds it to the cache.
+        """
+        if not self.directory:
+            return reader()
+        directory = self.get_directory(
+            archive.metadata.upload_id if archive.metadata else None, file_name
+        )
+        file_size = get_file_size(archive, file_name)
+        if self.is_uncacheable(directory, file_size):
+            return reader()
+        path = os.path.join(directory, f'{get_file_hash(archive, file_name)}.npz')
+        try:
+            data_frame = self.load(path)
+        except Exception as e:
+            logger.warning(f'Could not load {file_name} from the cache: {e}')
+            data_frame = None
+        if data_frame is not None:
+            logger.info(f'Data file {file_name} is unchanged and read from the cache.')
+            return data_frame
+
+        data_frame = reader()
+        try:
+            if not self.save(path, data_frame):
+                self.mark_uncacheable(directory, file_size)
+                logger.info(f'Data file {file_name} can not be cached.')
+        except OSError as e:
+            logger.warning(f'Could not add {file_name} to the cache: {e}')
+        return data_frame
@@ -0,0 +1,157 @@
+from collections.abc import Callable
+from contextlib import ExitStack
+from dataclasses import dataclass
+from functools import cache
+from importlib.metadata import EntryPoint, entry_points
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from typing import BinaryIO
+
+ENTRY_POINT_GROUP = 'nomad_catalysis.data_file_readers'
+
+HDF5_SIGNATURE = b'\x89HDF\r\n\x1a\n'
+
+
+def load_object(target: str) -> Any:
+    """
+    Imports and returns the object `target` given as 'module:attribute', e.g.
+    'nomad_catalysis.schema_packages.clean_data_reader:read_clean_data'.
+    """
+    return EntryPoint(name=target, value=target, group=ENTRY_POINT_GROUP).load()
+
+
+@dataclass(frozen=True)
+class DataFileReader:
+    """
+    A reader of the data files of CatalyticReaction entries. A data file is read with
+    the first reader that matches either its file extension, e.g. '.h5', or the
+    `signature`, i.e. the magic bytes at the start of its content, and whose `probe`
+    accepts its content. The `reader` is called with the reaction, the archive and
+    the logger and the `probe` with the opened file. Both are given as
+    'module:attribute', so that their modules, also the `clean_data_reader` and
+    `hdf5_reader` modules of the built-in readers, are only imported when the reader
+    is first used. Packages that NOMAD itself imports with the schema package, e.g.
+    h5py, pandas and pyarrow, are loaded regardless. If reading the data file raises
+    an ImportError, it is logged that the reader requires the packages `requires`,
+    e.g. 'the pyarrow package'.
+    """
+
+    name: str
+    reader: str
+    extensions: tuple[str, ...] = ()
+    signature: bytes | None = None
+    probe: str | None = None
+    requires: str | None = None
+
+    def matches_extension(self, file_name: str) -> bool:
+        return file_name.endswith(self.extensions)
+
+    def matches_signature(self, f: 'BinaryIO') -> bool:
+        if self.signature is None:
+            return False
+        f.seek(0)
+        return f.read(len(self.signature)) == self.signature
+
+    def accepts(self, f: 'BinaryIO') -> bool:
+        if self.probe is None:
+            return True
+        f.seek(0)
+        return bool(load_object(self.probe)(f))
+
+    def load(self) -> Callable:
+        return load_object(self.reader)
+
+
+BUILTIN_READERS = (
+    DataFileReader(
+        name='clean data',
+        reader='nomad_catalysis.schema_packages.clean_data_reader:read_clean_data',
+        extensions=('.csv', '.xlsx'),
+    ),
+    DataFileReader(
+        name='Parquet and Arrow',
+        reader='nomad_catalysis.schema_packages.clean_data_reader:read_clean_data',
+        extensions=('.parquet', '.arrow', '.feather'),
+        requires='the pyarrow package',
+    ),
+    DataFileReader(
+        name='HDF5',
+        reader='nomad_catalysis.schema_packages.hdf5_reader:read_hdf5_data',
+        extensions=('.h5', '.hdf5'),
+        signature=HDF5_SIGNATURE,
+        probe='nomad_catalysis.schema_packages.hdf5_reader:probe_hdf5_data',
+    ),
+)
+
+registered_readers: list[DataFileReader] = []
+
+
+def register_data_file_reader(reader: DataFileReader) -> None:
+    """
+    Registers a further data file reader, which is tried before the readers of the
+    installed plugins and the built-in readers.
+    """
+    registered_readers.append(reader)
+
+
+@cache
+def load_plugin_readers() -> tuple[DataFileReader, ...]:
+    """
+    Returns the data file readers that other plugins register with entry points in
+    the group 'nomad_catalysis.data_file_readers', which point to DataFileReader
+    instances. Only the modules of the entry points are imported, not the modules
+    of their readers.
+    """
+    return tuple(
+        entry_point.load() for entry_point in entry_points(group=ENTRY_POINT_GROUP)
+    )
+
+
+def get_data_file_readers() -> list[DataFileReader]:
+    """
+    Returns the data file readers in the order in which they are tried.
+    """
+    return [*registered_readers, *load_plugin_readers(), *BUILTIN_READERS]
+
+
+def get_data_file_extensions() -> list[str]:
+    """
+    Returns the file extensions of all data file readers.
+    """
+    return list(
+        dict.fromkeys(
+            extension
+            for reader in get_data_file_readers()
+            for extension in reader.extensions
+        )
+    )
+
+
+def find_data_file_reader(
+    file_name: str,
+    open_file: Callable[[], 'BinaryIO'],
+    readers: list[DataFileReader] | None = None,
+) -> DataFileReader | None:
+    """
+    Returns the first of the `readers`, by default all data file readers, that
+    matches the data file `file_name` by extension or signature and whose probe
+    accepts it, or None. The file is opened with `open_file` at most once and only
+    if a signature or a probe has to be checked, so that the content of e.g. a csv
+    file is not read twice.
+    """
+    if readers is None:
+        readers = get_data_file_readers()
+    with ExitStack() as stack:
+        f = None
+        for reader in readers:
+            by_extension = reader.matches_extension(file_name)
+            if not by_extension and reader.signature is None:
+                continue
+            if by_extension and reader.probe is None:
+                return reader
+            if f is None:
+                f = stack.enter_context(open_file())
+            if (by_extension or reader.matches_signature(f)) and reader.accepts(f):
+                return reader
+    return None
@@ -0,0 +1,335 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+from nomad.units import ureg
+
+from .steady_state import magnitude
+
+DEFAULT_DOWNSAMPLER = 'lttb'
+
+# each level of a time series pyramid aggregates PYRAMID_FACTOR buckets of the level
+# below, e.g. 10, 100 and 1000 points per bucket
+PYRAMID_FACTOR = 10
+
+# a downsampler selects the indices of exactly `n` points of the values `y`, or of the
+# columns of several quantities with one row per point, at the times `x`, or at
+# equally spaced times if `x` is None, given that `n` is smaller than their size
+Downsampler = Callable[[np.ndarray, int, np.ndarray | None], np.ndarray]
+
+
+def bucket_edges(start: int, stop: int, n: int) -> np.ndarray:
+    """
+    Returns the `n + 1` edges of `n` buckets with about the same number of points
+    between the indices `start` and `stop`.
+    """
+    return np.linspace(start, stop, n + 1).astype(int)
+
+
+def as_block(y) -> np.ndarray:
+    """
+    Returns the values `y` of one quantity, or the columns of several quantities with
+    one row per point, as a float array with one column per quantity.
+    """
+    y = np.asarray(y, dtype=float)
+    return y[:, None] if y.ndim == 1 else y
+
+
+def scale_columns(block: np.ndarray) -> np.ndarray:
+    """
+    Scales each column of the `block` to the range from 0 to 1, ignoring NaN, so that
+    quantities with different units weigh alike when points are selected from all of
+    them.
+    """
+    lo = np.fmin.reduce(block, axis=0)
+    span = np.fmax.reduce(block, axis=0) - lo
+    span = np.where(np.isfinite(span) & (span > 0), span, 1.0)
+    return (block - lo) / span
+
+
+def lttb_indices(y, n: int, x: np.ndarray | None = None) -> np.ndarray:
+    """
+    Largest-triangle-three-buckets: keeps the first and the last point and of each of
+    `n - 2` buckets in between the point that spans the largest triangle with the
+    point kept in the previous bucket and the mean of the next bucket. Peaks and
+    steps of the curve are kept. For the columns of several quantities the areas of
+    their scaled values are summed, so that the peaks of each of them are kept. The
+    areas of all points of a bucket are computed at once, the loop only runs over the
+    buckets. Returns the indices of the kept points.
+    """
+    block = scale_columns(as_block(y))
+    size = len(block)
+    if n >= size:
+        return np.arange(size)
+    if n < 3:  # noqa: PLR2004
+        return bucket_edges(0, size - 1, n - 1)
+    if x is None:
+        x = np.arange(size, dtype=float)
+    edges = bucket_edges(1, size - 1, n - 2)
+    counts = np.diff(edges)
+    next_x = np.r_[np.add.reduceat(x[1:-1], edges[:-1] - 1) / counts, x[-1]]
+    next_y = np.r_[
+        np.add.reduceat(block[1:-1], edges[:-1] - 1, axis=0) / counts[:, None],
+        block[-1:],
+    ]
+
+    indices = np.empty(n, dtype=int)
+    indices[0], indices[-1] = 0, size - 1
+    a = 0
+    for bucket in range(n - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        area = np.abs(
+            (x[a] - next_x[bucket + 1]) * (block[lo:hi] - block[a])
+            - (x[a] - x[lo:hi])[:, None] * (next_y[bucket + 1] - block[a])
+        )
+        total = np.where(np.isnan(area).all(axis=1), -1.0, np.nansum(area, axis=1))
+        a = lo + int(np.argmax(total))
+        indices[bucket + 1] = a
+    return indices
+
+
+def lttb(y: np.ndarray, n: int, x: np.ndarray | None = None) -> np.ndarray:
+    """
+    Reduces the values `y` to the `n` points kept by `lttb_indices`.
+    """
+    return y if n >= len(y) else y[lttb_indices(y, n, x)]
+
+
+def bucket_argext(
+    y: np.ndarray, edges: np.ndarray, extremum: np.ufunc, last: bool = False
+) -> np.ndarray:
+    """
+    Returns the index of the first, or with `last` the last, extreme value, e.g. with
+    `np.fmin` the minimum, of each bucket between the `edges`, ignoring NaN. For a
+    bucket without numbers its first or last index is returned.
+    """
+    starts, stops = edges[:-1], edges[1:] - 1
+    values = np.repeat(extremum.reduceat(y, starts), np.diff(edges))
+    is_extreme = y == values
+    if last:
+        positions = np.where(is_extreme, np.arange(len(y)), -1)
+        found = np.maximum.reduceat(positions, starts)
+        return np.where(found >= 0, found, stops)
+    positions = np.where(is_extreme, np.arange(len(y)), len(y))
+    found = np.minimum.reduceat(positions, starts)
+    return np.where(found < len(y), found, starts)
+
+
+def min_max_indices(y, n: int, x: np.ndarray | None = None) -> np.ndarray:
+    """
+    Keeps the minimum and the maximum of each of `n // 2` buckets with the same number
+    of points, in the order in which they occur, so that the envelope of noisy data
+    and single spikes are kept. For an odd `n` the last point is kept as well. For the
+    columns of several quantities the lowest and the highest of their scaled values
+    are kept, so that the spikes of each of them are kept. Returns the indices of the
+    kept points.
+    """
+    block = scale_columns(as_block(y))
+    size = len(block)
+    if n >= size:
+        return np.arange(size)
+    stop = size - 1 if n % 2 else size
+    n_buckets = n // 2
+    if not n_buckets:
+        return np.array([size - 1])
+    edges = bucket_edges(0, stop, n_buckets)
+    lows = np.fmin.reduce(block[:stop], axis=1)
+    highs = np.fmax.reduce(block[:stop], axis=1)
+    minima = bucket_argext(lows, edges, np.fmin)
+    maxima = bucket_argext(highs, edges, np.fmax, last=True)
+    same = minima == maxima
+    if same.any():
+        # the lowest point of a bucket is also its highest, the next highest point
+        # or, if there is none, the other end of the bucket is kept instead
+        highs[minima[same]] = -np.inf
+        maxima[same] = bucket_argext(highs, edges, np.fmax, last=True)[same]
+        starts, ends = edges[:-1], edges[1:] - 1
+        same = minima == maxima
+        maxima[same] = np.where(minima == starts, ends, starts)[same]
+    indices = np.sort(np.column_stack([minima, maxima]), axis=1).ravel()
+    if n % 2:
+        indices = np.r_[indices, size - 1]
+    return indices
+
+
+def min_max_envelope(y: np.ndarray, n: int, x: np.ndarray | None = None) -> np.ndarray:
+    """
+    Reduces the values `y` to the `n` points kept by `min_max_indices`.
+    """
+    return y if n >= len(y) else y[min_max_indices(y, n, x)]
+
+
+def time_buckets(size: int, n: int, x: np.ndarray | None = None) -> np.ndarray:
+    """
+    Returns the bucket of each of `size` points in `n` buckets of the same duration of
+    the times `x`, or with the same number of points if `x` is None.
+    """
+    if x is None:
+        return np.repeat(np.arange(n), np.diff(bucket_edges(0, size, n)))
+    times = np.linspace(np.min(x), np.max(x), n + 1)
+    return np.clip(np.searchsorted(times, x, side='right') - 1, 0, n - 1)
+
+
+def bucket_mean(y: np.ndarray, buckets: np.ndarray, n: int) -> np.ndarray:
+    """
+    Averages the values `y` in each of the `n` `buckets` of `time_buckets`. Buckets
+    without points, e.g. in a gap of the measurement, are interpolated from their
+    neighbours.
+    """
+    counts = np.bincount(buckets, minlength=n)
+    sums = np.bincount(buckets, weights=y, minlength=n)
+    filled = np.flatnonzero(counts)
+    return np.interp(np.arange(n), filled, sums[filled] / counts[filled])
+
+
+def time_bucket_mean(y: np.ndarray, n: int, x: np.ndarray | None = None) -> np.ndarray:
+    """
+    Averages the values in each of `n` buckets of the same duration of the times `x`,
+    or with the same number of points if `x` is None, see `bucket_mean`.
+    """
+    if n >= len(y):
+        return y
+    return bucket_mean(y, time_buckets(len(y), n, x), n)
+
+
+# 'mean' averages the buckets of `time_buckets`, all other methods select points
+MEAN_DOWNSAMPLER = 'mean'
+
+DOWNSAMPLERS: dict[str, Downsampler] = {
+    'lttb': lttb_indices,
+    'minmax': min_max_indices,
+}
+
+
+def register_downsampler(name: str, downsampler: Downsampler) -> None:
+    """
+    Registers a further downsampler under `name`, which selects the indices of the
+    kept points like the built-in 'lttb' and 'minmax', and can then be configured.
+    """
+    DOWNSAMPLERS[name] = downsampler
+
+
+@dataclass(frozen=True)
+class Downsampling:
+    """
+    The points to which the time series of a reaction with `size` points are reduced,
+    selected once for all of them, so that the reduced quantities stay aligned: the
+    `indices` of the kept points or, for 'mean', the `buckets` of each point of the
+    `number_of_buckets`, whose values are averaged.
+    """
+
+    size: int
+    indices: np.ndarray | None = None
+    buckets: np.ndarray | None = None
+    number_of_buckets: int = 0
+
+    def matches(self, values) -> bool:
+        """
+        Returns whether `values` is a time series of the same size.
+        """
+        return np.ndim(values) == 1 and len(values) == self.size
+
+    def reduce(self, values, last: bool = False):
+        """
+        Returns the values at the kept points or the mean of each bucket, with the
+        unit of `values` if it is a pint quantity. `last` is accepted as for
+        `SteadyStates.reduce`, the time of a bucket is its mean time as well.
+        """
+        if self.indices is None:
+            reduced = bucket_mean(
+                magnitude(values), self.buckets, self.number_of_buckets
+            )
+        else:
+            reduced = magnitude(values)[self.indices]
+        units = getattr(values, 'units', None)
+        return reduced if units is None else ureg.Quantity(reduced, units)
+
+
+def select_points(
+    columns: list, n: int, method: str = DEFAULT_DOWNSAMPLER, x=None
+) -> Downsampling:
+    """
+    Selects the `n` points to which the `columns` of the same size, e.g. all time
+    series of a reaction, are reduced with the downsampler `method`, using their times
+    `x`, if given. The points are selected from all columns at once. Raises a KeyError
+    for an unknown method.
+    """
+    size = len(columns[0])
+    x = None if x is None else magnitude(x).ravel()
+    if method == MEAN_DOWNSAMPLER:
+        return Downsampling(size, buckets=time_buckets(size, n, x), number_of_buckets=n)
+    downsampler = DOWNSAMPLERS[method]
+    block = np.column_stack([magnitude(column) for column in columns])
+    return Downsampling(size, indices=downsampler(block, n, x))
+
+
+def downsample(values, n: int, method: str = DEFAULT_DOWNSAMPLER, x=None):
+    """
+    Reduces `values` to exactly `n` values with the downsampler `method`, using the
+    times `x` of the values, if given, see `select_points`. The unit of a pint
+    quantity is kept and values with at most `n` points are returned unchanged.
+    Raises a KeyError for an unknown method.
+    """
+    if len(values) <= n:
+        return values
+    return select_points([values], n, method, x).reduce(values)
+
+
+def aggregate_buckets(
+    mins: np.ndarray,
+    sums: np.ndarray,
+    maxs: np.ndarray,
+    counts: np.ndarray,
+    factor: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Aggregates each `factor` consecutive buckets, given by the minimum, sum, maximum
+    and count of their numbers, into one bucket.
+    """
+    starts = np.arange(0, len(counts), factor)
+    return (
+        np.fmin.reduceat(mins, starts),
+        np.add.reduceat(sums, starts),
+        np.fmax.reduceat(maxs, starts),
+        np.add.reduceat(counts, starts),
+    )
+
+
+def build_pyramid(
+    y: np.ndarray, max_points: int, factor: int = PYRAMID_FACTOR
+) -> list[tuple[int, np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Aggregates the values `y` into levels of buckets of `factor`, `factor**2`, ...
+    consecutive points with the minimum, mean and maximum of each bucket, ignoring
+    NaN. Each level is aggregated from the level below, so that `y` is only read
+    once. Levels are added until one has at most `max_points` buckets. Returns the
+    number of points per bucket, the minima, means and maxima of each level.
+    """
+    valid = ~np.isnan(y)
+    level = (y, np.where(valid, y, 0.0), y, valid.astype(np.int64))
+    levels = []
+    points = 1
+    while len(level[-1]) > max_points:
+        level = aggregate_buckets(*level, factor)
+        points *= factor
+        mins, sums, maxs, counts = level
+        with np.errstate(invalid='ignore', divide='ignore'):
+            levels.append((points, mins, sums / counts, maxs))
+    return levels
+
+
+def bucket_means(values, points: int):
+    """
+    Returns the means of `values` in buckets of `points` consecutive points, as in
+    the levels of `build_pyramid`, with the unit of `values` if it is a pint
+    quantity.
+    """
+    y = magnitude(values)
+    valid = ~np.isnan(y)
+    starts = np.arange(0, len(y), points)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.add.reduceat(np.where(valid, y, 0.0), starts) / np.add.reduceat(
+            valid, starts
+        )
+    units = getattr(values, 'units', None)
+    return means if units is None else ureg.Quantity(means, units)
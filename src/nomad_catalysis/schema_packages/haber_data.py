@@ -0,0 +1,200 @@
+import numpy as np
+
+FLOW_RATE_UNIT = 'milliliter / minute'
+
+# the layout of the h5 files of the automated Haber reactor at the FHI, see
+# `compile_hdf5_mapping` for the format
+HABER_MAPPING = {
+    'name': 'Haber',
+    'methods': 'Sorted Data',
+    'tables': {
+        'header': 'Header/{method}/Header',
+        'sample': 'Header/Header',
+        'pretreatment': 'Sorted Data/{method}/H2 Reduction',
+        'reaction': 'Sorted Data/{method}/NH3 Decomposition',
+    },
+    'values': {
+        'method': 'Haber measurement {method}',
+        'reaction_name': 'ammonia decomposition',
+        'reaction_type': ['cracking', 'thermal catalysis'],
+        'location': 'Fritz-Haber-Institut Berlin / Abteilung AC',
+        'instruments.name': 'Haber',
+        'instruments.reactor_type': 'plug flow reactor',
+    },
+    'quantities': {
+        'reaction_conditions.sampling_frequency': {
+            'table': 'header',
+            'field': 'Temporal resolution [Hz]',
+            'unit': 'hertz',
+        },
+        'instruments.reactor_volume': {'table': 'header', 'field': 'Bulk volume [mln]'},
+        'instruments.reactor_cross_section_area': {
+            'table': 'header',
+            'field': 'Inner diameter of reactor (D) [mm]',
+            'unit': 'millimeter ** 2',
+            'transform': 'circle_area',
+        },
+        'instruments.reactor_diameter': {
+            'table': 'header',
+            'field': 'Inner diameter of reactor (D) [mm]',
+            'unit': 'millimeter',
+        },
+        'reactor_filling.diluent': {
+            'table': 'header',
+            'field': 'Diluent material',
+            'transform': 'decode',
+        },
+        'reactor_filling.diluent_sievefraction_upper_limit': {
+            'table': 'header',
+            'field': 'Diluent Sieve fraction high [um]',
+            'unit': 'micrometer',
+        },
+        'reactor_filling.diluent_sievefraction_lower_limit': {
+            'table': 'header',
+            'field': 'Diluent Sieve fraction low [um]',
+            'unit': 'micrometer',
+        },
+        'reactor_filling.catalyst_mass': {
+            'table': 'header',
+            'field': 'Catalyst Mass [mg]',
+            'unit': 'milligram',
+            'transform': 'first',
+        },
+        'reactor_filling.catalyst_sievefraction_upper_limit': {
+            'table': 'header',
+            'field': 'Sieve fraction high [um]',
+            'unit': 'micrometer',
+        },
+        'reactor_filling.catalyst_sievefraction_lower_limit': {
+            'table': 'header',
+            'field': 'Sieve fraction low [um]',
+            'unit': 'micrometer',
+        },
+        'reactor_filling.particle_size': {
+            'table': 'header',
+            'field': 'Particle size (Dp) [mm]',
+            'unit': 'millimeter',
+        },
+        'experimenter': {
+            'table': 'header',
+            'field': 'User',
+            'transform': 'decode',
+            'overwrite': False,
+        },
+        'datetime': {'table': 'pretreatment', 'field': 'Date', 'transform': 'decode'},
+        'pretreatment.set_temperature': {
+            'table': 'pretreatment',
+            'field': 'Catalyst Temperature [C°]',
+            'unit': 'celsius',
+        },
+        'pretreatment.set_total_flow_rate': {
+            'table': 'pretreatment',
+            'field': 'Target Total Gas (After Reactor) [mln|min]',
+            'unit': FLOW_RATE_UNIT,
+        },
+        'pretreatment.runs': {'table': 'pretreatment'},
+        'pretreatment.time_on_stream': {
+            'table': 'pretreatment',
+            'field': 'Relative Time [Seconds]',
+            'unit': 'second',
+            'transform': 'relative_time',
+        },
+        'reaction_conditions.set_total_flow_rate': {
+            'table': 'reaction',
+            'fields': r'.*Target Setpoint \[mln\|min\]',
+            'unit': FLOW_RATE_UNIT,
+        },
+        'reaction_conditions.contact_time': {
+            'table': 'reaction',
+            'field': 'W|F [gs|ml]',
+            'unit': 'second * gram / milliliter',
+        },
+        'reaction_conditions.set_temperature': {
+            'table': 'reaction',
+            'field': 'Catalyst Temperature [C°]',
+            'unit': 'celsius',
+        },
+        'reaction_conditions.runs': {'table': 'reaction'},
+        'results.total_flow_rate': {
+            'table': 'reaction',
+            'fields': r'.*Target Calculated Realtime Value \[mln\|min\]',
+            'unit': FLOW_RATE_UNIT,
+        },
+        'results.temperature': {
+            'table': 'reaction',
+            'field': 'Catalyst Temperature [C°]',
+            'unit': 'celsius',
+        },
+        'results.runs': {'table': 'reaction'},
+        'results.time_on_stream': {
+            'table': 'reaction',
+            'field': 'Relative Time [Seconds]',
+            'unit': 'second',
+            'transform': 'relative_time',
+        },
+    },
+    'sections': [
+        {
+            'target': 'pretreatment.reagents',
+            'table': 'pretreatment',
+            'fields': r'Massflow\d \((?P<name>H2|Ar)\) '
+            r'Target Calculated Realtime Value \[mln\|min\]',
+            'names': {'H2': 'hydrogen', 'Ar': 'argon'},
+            'quantity': 'flow_rate',
+            'unit': FLOW_RATE_UNIT,
+        },
+        {
+            'target': 'reaction_conditions.reagents',
+            'table': 'reaction',
+            'fields': r'[^(]*\((?P<name>[^)]*)\).*'
+            r'Target Calculated Realtime Value \[mln\|min\]',
+            'names': {'NH3_High': 'ammonia', 'NH3_Low': 'ammonia'},
+            'quantity': 'flow_rate',
+            'unit': FLOW_RATE_UNIT,
+            'skip_zero': True,
+            'name_values': {'ammonia': {'fraction_in': 1.0}},
+        },
+        {
+            'target': 'results.reactants_conversions',
+            'table': 'reaction',
+            'name': 'ammonia',
+            'quantities': {
+                'conversion': {
+                    'field': 'NH3 Conversion [%]',
+                    'transform': 'nan_to_zero',
+                },
+            },
+            'values': {
+                'conversion_type': 'reactant-based conversion',
+                'fraction_in': 1.0,
+            },
+        },
+        {
+            'target': 'results.rates',
+            'table': 'reaction',
+            'name': 'molecular hydrogen',
+            'quantities': {
+                'reaction_rate': {
+                    'field': 'Space Time Yield [mmolH2 gcat-1 min-1]',
+                    'unit': 'mmol / g / minute',
+                    'transform': 'nan_to_zero',
+                },
+            },
+        },
+        {'target': 'results.products', 'name': 'molecular nitrogen'},
+        {'target': 'results.products', 'name': 'molecular hydrogen'},
+    ],
+    'sample_id': {'table': 'sample', 'field': 'SampleID', 'transform': 'string'},
+}
+
+
+def decode_relative_time(values) -> np.ndarray:
+    """
+    Converts the 'Relative Time [Seconds]' column of a Haber h5 table, which is
+    stored as byte strings, e.g. b'12.5', into float seconds relative to the first
+    value. All values are decoded in a single numpy conversion.
+    """
+    time = np.asarray(values).astype(np.float64)
+    if time.size:
+        time -= time[0]
+    return time
@@ -0,0 +1,430 @@
+import json
+import re
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from nomad.units import ureg
+
+from .haber_data import decode_relative_time
+
+if TYPE_CHECKING:
+    import h5py
+    from nomad.datamodel.data import ArchiveSection
+
+FIRST_ROW = slice(1)
+
+# transforms of the values of a column, with the rows that are read for them
+TRANSFORMS: dict[str, tuple[Callable[[np.ndarray], Any], slice]] = {
+    'first': (lambda values: values[0], FIRST_ROW),
+    'decode': (lambda values: values[0].decode(), FIRST_ROW),
+    'string': (lambda values: str(values[0]), FIRST_ROW),
+    'relative_time': (decode_relative_time, slice(None)),
+    'nan_to_zero': (np.nan_to_num, slice(None)),
+    'circle_area': (lambda values: (values / 2) ** 2 * np.pi, slice(None)),
+}
+
+
+class Hdf5Table:
+    """
+    A lazy view of a table of a h5 file, which is a compound dataset with one field
+    per column. A field is read from the file only when it is accessed, and only
+    once. Only the rows in the hyperslab `selection` of the dataset are read, e.g.
+    `slice(None, None, 10)` for every tenth row, so that downsampled views of large
+    files do not need the memory of the full table.
+    """
+
+    def __init__(self, dataset: 'h5py.Dataset', selection: slice = slice(None)):
+        self.dataset = dataset
+        self.selection = selection
+        self._fields = {}
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return self.dataset.dtype.names
+
+    def __len__(self) -> int:
+        return len(range(len(self.dataset))[self.selection])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name not in self._fields:
+            self.read([name])
+        return self._fields[name]
+
+    def read(self, names: list[str]) -> None:
+        """
+        Reads the fields `names` that were not read before in a single read of the
+        dataset.
+        """
+        missing = [name for name in names if name not in self.names]
+        if missing:
+            raise KeyError(f'Fields {missing} not found in {self.dataset.name}.')
+        names = [name for name in dict.fromkeys(names) if name not in self._fields]
+        if not names:
+            return
+        if len(names) == 1:
+            self._fields[names[0]] = self.dataset.fields(names[0])[self.selection]
+            return
+        records = self.dataset.fields(names)[self.selection]
+        for name in names:
+            self._fields[name] = records[name]
+
+    def view(self, selection: slice) -> 'Hdf5Table':
+        """
+        Returns a lazy view of the rows `selection` of the dataset.
+        """
+        return Hdf5Table(self.dataset, selection)
+
+
+class Hdf5Tables:
+    """
+    The tables of a h5 file that are used by a mapping, with a view of the first row
+    of each table for the columns of which only the first value is used.
+    """
+
+    def __init__(self, tables: dict[str, Hdf5Table]):
+        self.tables = tables
+        self.first_rows = {
+            name: table.view(FIRST_ROW) for name, table in tables.items()
+        }
+
+    def get(self, name: str, first_row: bool = False) -> Hdf5Table:
+        return (self.first_rows if first_row else self.tables)[name]
+
+
+@dataclass(frozen=True)
+class Hdf5Column:
+    """
+    The values of a quantity read from the column `field` of a table. With a
+    `pattern` the values of all columns with matching names are summed up, without
+    `field` and `pattern` the values are the row numbers of the table. The values
+    are converted with `transform` and get the pint `unit`, if any. Without
+    `overwrite` a quantity that has a value is kept.
+    """
+
+    table: str
+    field: str | None = None
+    pattern: re.Pattern | None = None
+    unit: Any = None
+    transform: str | None = None
+    overwrite: bool = True
+
+    @property
+    def first_row(self) -> bool:
+        return self.transform is not None and TRANSFORMS[self.transform][1] == FIRST_ROW
+
+    def fields(self, names: tuple[str, ...]) -> list[str]:
+        if self.pattern is not None:
+            return [name for name in names if self.pattern.fullmatch(name)]
+        return [] if self.field is None else [self.field]
+
+    def read(self, tables: Hdf5Tables) -> Any:
+        table = tables.get(self.table, self.first_row)
+        if self.pattern is not None:
+            values = np.zeros(len(table))
+            for name in self.fields(table.names):
+                values = values + table[name]
+        elif self.field is None:
+            values = np.arange(len(table), dtype=float)
+        else:
+            values = table[self.field]
+        if self.transform is not None:
+            values = TRANSFORMS[self.transform][0](values)
+        if self.unit is None:
+            return values
+        return ureg.Quantity(values, self.unit)
+
+
+@dataclass(frozen=True)
+class Hdf5Sections:
+    """
+    The sections of a repeating subsection `target`, e.g. the reagents of the
+    reaction conditions. A section with the given `name` is created and its
+    `quantities` are read. Or, with a `pattern`, a section is created for each column
+    of `table` that matches the pattern, named by its group 'name', renamed with
+    `names`, and the values of the column are read into `quantity`. Sections with
+    only zero values are skipped if `skip_zero` is set. The constant `values` are
+    set in all sections and the values in `name_values` in the sections with the
+    given name. Constants of array quantities are repeated for each row of `table`.
+    """
+
+    target: str
+    table: str | None = None
+    name: str | None = None
+    quantities: dict[str, Hdf5Column] = field(default_factory=dict)
+    pattern: re.Pattern | None = None
+    names: dict[str, str] = field(default_factory=dict)
+    quantity: str | None = None
+    unit: Any = None
+    skip_zero: bool = False
+    values: dict[str, Any] = field(default_factory=dict)
+    name_values: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+    def species(
+        self, names: tuple[str, ...]
+    ) -> list[tuple[str, dict[str, Hdf5Column]]]:
+        """
+        Returns the name and the columns of each section for a table with the column
+        names `names`.
+        """
+        if self.pattern is None:
+            return [(self.name, self.quantities)]
+        species = []
+        for col in names:
+            match = self.pattern.fullmatch(col)
+            if match is None:
+                continue
+            column = Hdf5Column(self.table, col, unit=self.unit)
+            species.append(
+                (self.names.get(match['name'], match['name']), {self.quantity: column})
+            )
+        return species
+
+    def create(self, section_cls: type, tables: Hdf5Tables) -> list['ArchiveSection']:
+        sections = []
+        n_rows = len(tables.get(self.table)) if self.table else 0
+        names = tables.get(self.table).names if self.table else ()
+        for name, columns in self.species(names):
+            values = {quantity: col.read(tables) for quantity, col in columns.items()}
+            if self.skip_zero and not any(
+                np.any(getattr(value, 'magnitude', value)) for value in values.values()
+            ):
+                continue
+            for quantity, value in {
+                **self.values,
+                **self.name_values.get(name, {}),
+            }.items():
+                shape = section_cls.m_def.all_quantities[quantity].shape
+                values[quantity] = np.full(n_rows, value) if shape else value
+            sections.append(section_cls(name=name, **values))
+        return sections
+
+
+@dataclass(frozen=True)
+class Hdf5Mapping:
+    """
+    A compiled mapping of the tables of a h5 file to the quantities of an entry, see
+    `compile_hdf5_mapping` for the format of the specification. The paths of the
+    tables can contain the placeholder '{method}' for the name of the method group.
+    """
+
+    name: str
+    tables: dict[str, str]
+    methods: str | None = None
+    values: dict[str, Any] = field(default_factory=dict)
+    quantities: dict[str, Hdf5Column] = field(default_factory=dict)
+    sections: tuple[Hdf5Sections, ...] = ()
+    sample_id: Hdf5Column | None = None
+
+    def get_methods(self, data: 'h5py.File') -> list[str | None]:
+        """
+        Returns the names of the method groups of `data`, or [None] if the mapping
+        has no method groups.
+        """
+        if self.methods is None:
+            return [None]
+        return list(data[self.methods].keys()) if self.methods in data else []
+
+    def matches(self, data: 'h5py.File') -> bool:
+        """
+        Returns True if `data` has all tables of the mapping for its first method.
+        """
+        methods = self.get_methods(data)
+        return bool(methods) and all(
+            path.format(method=methods[0]) in data for path in self.tables.values()
+        )
+
+    def columns(self, tables: Hdf5Tables) -> list[Hdf5Column]:
+        """
+        Returns all columns that the mapping reads from `tables`.
+        """
+        columns = list(self.quantities.values())
+        for spec in self.sections:
+            names = tables.get(spec.table).names if spec.table else ()
+            for _, section_columns in spec.species(names):
+                columns.extend(section_columns.values())
+        if self.sample_id is not None:
+            columns.append(self.sample_id)
+        return columns
+
+    def open_tables(self, data: 'h5py.File', method: str | None) -> Hdf5Tables:
+        """
+        Opens the tables of `method` and reads the columns used by the mapping with
+        one read per table.
+        """
+        tables = Hdf5Tables(
+            {
+                name: Hdf5Table(data[path.format(method=method)])
+                for name, path in self.tables.items()
+            }
+        )
+        fields = defaultdict(list)
+        for col in self.columns(tables):
+            names = tables.get(col.table).names
+            fields[(col.table, col.first_row)].extend(col.fields(names))
+        for (name, first_row), names in fields.items():
+            tables.get(name, first_row).read(names)
+        return tables
+
+    def apply(
+        self, tables: Hdf5Tables, method: str | None, target: 'ArchiveSection'
+    ) -> None:
+        """
+        Assigns the values of the mapping to the section `target`. The subsections
+        that the mapping writes into are replaced by new sections.
+        """
+        sections = {'': target}
+
+        def get_section(path: str) -> 'ArchiveSection':
+            if path not in sections:
+                parent_path, _, name = path.rpartition('.')
+                parent = get_section(parent_path)
+                sub_section = parent.m_def.all_sub_sections[name]
+                section = sub_section.sub_section.section_cls()
+                setattr(parent, name, [section] if sub_section.repeats else section)
+                sections[path] = section
+            return sections[path]
+
+        for path, value in self.values.items():
+            parent_path, _, name = path.rpartition('.')
+            setattr(
+                get_section(parent_path),
+                name,
+                value.format(method=method) if isinstance(value, str) else value,
+            )
+
+        for path, col in self.quantities.items():
+            parent_path, _, name = path.rpartition('.')
+            section = get_section(parent_path)
+            if col.overwrite or getattr(section, name) is None:
+                setattr(section, name, col.read(tables))
+
+        created = {}
+        for spec in self.sections:
+            parent_path, _, name = spec.target.rpartition('.')
+            parent = get_section(parent_path)
+            section_cls = parent.m_def.all_sub_sections[name].sub_section.section_cls
+            created.setdefault(spec.target, (parent, name, []))[2].extend(
+                spec.create(section_cls, tables)
+            )
+        for parent, name, new_sections in created.values():
+            setattr(parent, name, new_sections)
+
+    def read_sample_id(self, tables: Hdf5Tables) -> str | None:
+        if self.sample_id is None:
+            return None
+        return self.sample_id.read(tables)
+
+
+def _compile_column(spec: dict, table: str | None = None) -> Hdf5Column:
+    return Hdf5Column(
+        table=spec.get('table', table),
+        field=spec.get('field'),
+        pattern=re.compile(spec['fields']) if 'fields' in spec else None,
+        unit=ureg.Unit(spec['unit']) if 'unit' in spec else None,
+        transform=spec.get('transform'),
+        overwrite=spec.get('overwrite', True),
+    )
+
+
+def _compile_sections(spec: dict) -> Hdf5Sections:
+    return Hdf5Sections(
+        target=spec['target'],
+        table=spec.get('table'),
+        name=spec.get('name'),
+        quantities={
+            quantity: _compile_column(col, spec.get('table'))
+            for quantity, col in spec.get('quantities', {}).items()
+        },
+        pattern=re.compile(spec['fields']) if 'fields' in spec else None,
+        names=spec.get('names', {}),
+        quantity=spec.get('quantity'),
+        unit=ureg.Unit(spec['unit']) if 'unit' in spec else None,
+        skip_zero=spec.get('skip_zero', False),
+        values=spec.get('values', {}),
+        name_values=spec.get('name_values', {}),
+    )
+
+
+def _check_transforms(columns: list[dict]) -> None:
+    for col in columns:
+        if col.get('transform') not in (None, *TRANSFORMS):
+            raise ValueError(f'Unknown transform {col["transform"]}.')
+
+
+@lru_cache(maxsize=32)
+def _compile_hdf5_mapping(spec_json: str) -> Hdf5Mapping:
+    spec = json.loads(spec_json)
+    _check_transforms(
+        [
+            *spec.get('quantities', {}).values(),
+            *(
+                col
+                for sections in spec.get('sections', [])
+                for col in sections.get('quantities', {}).values()
+            ),
+            *([spec['sample_id']] if 'sample_id' in spec else []),
+        ]
+    )
+    return Hdf5Mapping(
+        name=spec['name'],
+        tables=spec['tables'],
+        methods=spec.get('methods'),
+        values=spec.get('values', {}),
+        quantities={
+            path: _compile_column(col)
+            for path, col in spec.get('quantities', {}).items()
+        },
+        sections=tuple(
+            _compile_sections(sections) for sections in spec.get('sections', [])
+        ),
+        sample_id=_compile_column(spec['sample_id']) if 'sample_id' in spec else None,
+    )
+
+
+def compile_hdf5_mapping(spec: dict) -> Hdf5Mapping:
+    """
+    Compiles the mapping specification `spec` of a h5 file layout, a dict that can
+    also be read from a YAML file, into a Hdf5Mapping. The compiled mappings are
+    cached by their specification. The specification has the keys:
+
+    - name: the name of the layout, e.g. the reactor.
+    - tables: the paths of the compound datasets in the file by table name.
+    - methods: the group whose members are the methods, optional.
+    - values: constants by the dotted path of their quantity in the entry, e.g.
+      'instruments.name'. Strings can contain the placeholder '{method}'.
+    - quantities: columns by the dotted path of their quantity, given by 'table',
+      'field' or 'fields' (a regular expression), 'unit', 'transform' and
+      'overwrite', see Hdf5Column and TRANSFORMS.
+    - sections: a list of repeating subsections, see Hdf5Sections, with the keys
+      'target', 'table', 'name', 'quantities', 'fields', 'names', 'quantity',
+      'unit', 'skip_zero', 'values' and 'name_values'.
+    - sample_id: the column with the lab_id of the sample, optional.
+    """
+    return _compile_hdf5_mapping(json.dumps(spec, sort_keys=True))
+
+
+@lru_cache(maxsize=32)
+def load_hdf5_mapping(file_name: str) -> Hdf5Mapping:
+    """
+    Reads the mapping specification from the YAML file `file_name` and compiles it.
+    """
+    import yaml
+
+    with open(file_name) as infile:
+        return compile_hdf5_mapping(yaml.safe_load(infile))
+
+
+def find_hdf5_mapping(
+    data: 'h5py.File', mappings: list[Hdf5Mapping]
+) -> Hdf5Mapping | None:
+    """
+    Returns the first of `mappings` that matches the layout of `data`, or None.
+    """
+    return next((mapping for mapping in mappings if mapping.matches(data)), None)
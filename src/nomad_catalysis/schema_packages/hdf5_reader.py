@@ -0,0 +1,195 @@
+import os
+import shutil
+import tempfile
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
+from multiprocessing import current_process
+from typing import TYPE_CHECKING
+
+import h5py
+from nomad.datamodel.metainfo.basesections import CompositeSystemReference
+
+from .catalysis import CatalyticReaction, configuration
+from .haber_data import HABER_MAPPING
+from .hdf5_mapping import (
+    Hdf5Mapping,
+    compile_hdf5_mapping,
+    find_hdf5_mapping,
+    load_hdf5_mapping,
+)
+
+if TYPE_CHECKING:
+    from typing import BinaryIO
+
+    from nomad.datamodel.datamodel import (
+        EntryArchive,
+    )
+    from structlog.stdlib import (
+        BoundLogger,
+    )
+
+
+def get_hdf5_mappings() -> list[Hdf5Mapping]:
+    """
+    Returns the HDF5 mappings of the configured YAML files and the built-in mapping
+    of the Haber reactor files, in the order in which they are tried.
+    """
+    return [
+        *(
+            load_hdf5_mapping(file_name)
+            for file_name in getattr(configuration, 'hdf5_mappings', None) or []
+        ),
+        compile_hdf5_mapping(HABER_MAPPING),
+    ]
+
+
+def probe_hdf5_data(f: 'BinaryIO') -> bool:
+    """
+    Returns whether the file `f` is an h5 file that matches one of the HDF5 mappings,
+    without reading any of its data.
+    """
+    try:
+        with h5py.File(f, 'r') as data:
+            return find_hdf5_mapping(data, get_hdf5_mappings()) is not None
+    except OSError:
+        return False
+
+
+def read_method(file_name: str, method: str) -> dict:
+    """
+    Reads the `method` of the h5 data file `file_name` with the first HDF5 mapping
+    that matches it and returns the CatalyticReaction with its data as a dict. Runs
+    in the worker processes of `read_methods`.
+    """
+    reaction = CatalyticReaction()
+    with h5py.File(file_name, 'r') as data:
+        mapping = find_hdf5_mapping(data, get_hdf5_mappings())
+        tables = mapping.open_tables(data, method)
+        mapping.apply(tables, method, reaction)
+        lab_id = mapping.read_sample_id(tables)
+    if lab_id is not None:
+        reaction.samples = [CompositeSystemReference(lab_id=lab_id)]
+    return reaction.m_to_dict()
+
+
+@contextmanager
+def local_data_file(archive: 'EntryArchive', data_file: str) -> Iterator[str]:
+    """
+    Yields the path of the raw file `data_file` in the local file system, which is
+    a temporary copy if the raw file is not a local file, e.g. in a published upload.
+    """
+    with archive.m_context.raw_file(data_file, 'rb') as f:
+        file_name = getattr(f, 'name', None)
+        if isinstance(file_name, str) and os.path.isfile(file_name):
+            yield file_name
+            return
+        with tempfile.NamedTemporaryFile(suffix='.h5') as copy:
+            shutil.copyfileobj(f, copy)
+            copy.flush()
+            yield copy.name
+
+
+def read_methods(
+    archive: 'EntryArchive', data_file: str, methods: list[str]
+) -> list[dict]:
+    """
+    Reads the `methods` of the h5 data file concurrently, one method per worker
+    process, as h5py serializes the reading of threads with a global lock. The
+    methods are read one after another in daemonic processes, e.g. the workers of
+    the NOMAD processing, as these can not start processes of their own.
+    """
+    with local_data_file(archive, data_file) as file_name:
+        if len(methods) < 2 or current_process().daemon:  # noqa: PLR2004
+            return [read_method(file_name, method) for method in methods]
+        max_workers = min(len(methods), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(read_method, repeat(file_name), methods))
+
+
+def create_method_entries(
+    reaction: CatalyticReaction,
+    archive: 'EntryArchive',
+    methods: list[str],
+    logger: 'BoundLogger',
+) -> None:
+    """
+    This function creates an additional CatalyticReaction entry for each of the
+    `methods` of the h5 data file of `reaction`. The methods are read concurrently
+    with `read_methods` and each entry is created with the data of its method, so
+    that the h5 data file is not read again when the entries are processed within
+    the normalization of this entry. Existing files are not overwritten.
+    """
+    from nomad_catalysis.parsers.utils import create_archives  # noqa: PLC0415
+
+    file_stem = reaction.data_file.rsplit('.', maxsplit=1)[0]
+    reactions = []
+    for method, data in zip(
+        methods, read_methods(archive, reaction.data_file, methods)
+    ):
+        method_reaction = CatalyticReaction.m_from_dict(data)
+        method_reaction.name = f'{reaction.name} {method}' if reaction.name else method
+        method_reaction.data_file_method = method
+        reactions.append(method_reaction)
+    create_archives(
+        reactions,
+        archive,
+        [f'{file_stem}_{method}.archive.json' for method in methods],
+    )
+    logger.info(
+        f"""Created entries for the methods {', '.join(methods)} of the data
+        file {reaction.data_file}."""
+    )
+
+
+def read_hdf5_data(
+    reaction: CatalyticReaction, archive: 'EntryArchive', logger: 'BoundLogger'
+) -> None:
+    """
+    This function reads the h5 data file with the first HDF5 mapping that matches
+    the layout of the file, e.g. the mapping of the files of the automated Haber
+    reactor, and assigns the data to the corresponding attributes of the
+    CatalyticReaction `reaction`. If the data file contains several methods and no
+    method is given, the first method is read and, after the data file is closed,
+    an entry is created for each of the other methods. Logs a warning if no mapping
+    matches.
+    """
+    other_methods = []
+    with (
+        archive.m_context.raw_file(reaction.data_file, 'rb') as f,
+        h5py.File(f, 'r') as data,
+    ):
+        mapping = find_hdf5_mapping(data, get_hdf5_mappings())
+        if mapping is None:
+            logger.warning(
+                f"""No data is extracted from the data file {reaction.data_file},
+                as none of the HDF5 mappings matches it."""
+            )
+            return
+        methods = mapping.get_methods(data)
+        method = reaction.data_file_method or methods[0]
+        if method not in methods:
+            logger.warning(
+                f"""Method '{method}' not found in the data file
+                {reaction.data_file}."""
+            )
+            return
+        if reaction.data_file_method is None and len(methods) > 1:
+            reaction.data_file_method = method
+            other_methods = methods[1:]
+
+        tables = mapping.open_tables(data, method)
+        mapping.apply(tables, method, reaction)
+        lab_id = mapping.read_sample_id(tables)
+
+    if other_methods:
+        create_method_entries(reaction, archive, other_methods, logger)
+
+    from nomad.datamodel.context import ClientContext
+
+    if lab_id is not None and not isinstance(archive.m_context, ClientContext):
+        sample = CompositeSystemReference(lab_id=lab_id)
+        sample.normalize(archive, logger)
+        reaction.samples = []
+        reaction.samples.append(sample)
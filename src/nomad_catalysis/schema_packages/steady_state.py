@@ -0,0 +1,338 @@
+from collections.abc import Sequence
+from dataclasses import dataclass, fields, replace
+
+import numpy as np
+from nomad.units import ureg
+
+# a point is at steady state if the setpoints did not change by more than their
+# tolerances after PLATEAU_WINDOW points, every PLATEAU_STRIDE-th point is checked
+PLATEAU_WINDOW = 50
+PLATEAU_STRIDE = 10
+
+# the number of points that are aggregated at once when the steps of a time series
+# are read in chunks, e.g. from an h5 file
+CHUNK_SIZE = 65536
+
+
+def magnitude(values) -> np.ndarray:
+    """
+    Returns the magnitudes of a pint quantity or the values as a float array.
+    """
+    return np.asarray(getattr(values, 'magnitude', values), dtype=float)
+
+
+@dataclass(frozen=True)
+class StepStatistics:
+    """
+    The statistics of the values of each step of a time series: the `labels` of the
+    steps, their number of points `counts`, the `means`, the sums of squared
+    deviations from the mean `m2`, the minima and maxima of each quantity, with one
+    row per step and one column per quantity, and the first and last time of each
+    step, if the times are given. The statistics of two parts of a step are merged
+    with the pairwise update of Welford's algorithm by Chan et al., so that a time
+    series can be aggregated chunk by chunk.
+    """
+
+    labels: np.ndarray
+    counts: np.ndarray
+    means: np.ndarray
+    m2: np.ndarray
+    mins: np.ndarray
+    maxs: np.ndarray
+    first_times: np.ndarray | None = None
+    last_times: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    @property
+    def variances(self) -> np.ndarray:
+        return self.m2 / self.counts[:, None]
+
+    @property
+    def stds(self) -> np.ndarray:
+        return np.sqrt(self.variances)
+
+    @classmethod
+    def of_runs(cls, labels, block: np.ndarray, times=None) -> 'StepStatistics':
+        """
+        Returns the statistics of each run of points with the same label of the
+        `block` with one row per point and one column per quantity.
+        """
+        labels = np.asarray(labels)
+        starts = run_starts(labels)
+        counts = np.diff(starts, append=len(labels))
+        if not len(starts):
+            return cls(labels, counts, *[block[:0]] * 4)
+        means = np.add.reduceat(block, starts, axis=0) / counts[:, None]
+        deviations = block - np.repeat(means, counts, axis=0)
+        statistics = cls(
+            labels=labels[starts],
+            counts=counts,
+            means=means,
+            m2=np.add.reduceat(deviations**2, starts, axis=0),
+            mins=np.minimum.reduceat(block, starts, axis=0),
+            maxs=np.maximum.reduceat(block, starts, axis=0),
+        )
+        if times is None:
+            return statistics
+        times = magnitude(times)
+        return replace(
+            statistics, first_times=times[starts], last_times=times[starts + counts - 1]
+        )
+
+    def take(self, index) -> 'StepStatistics':
+        """
+        Returns the statistics of the steps at `index`, e.g. a slice.
+        """
+        return StepStatistics(
+            **{
+                field.name: None
+                if getattr(self, field.name) is None
+                else getattr(self, field.name)[index]
+                for field in fields(self)
+            }
+        )
+
+    @classmethod
+    def concatenate(cls, parts: Sequence['StepStatistics']) -> 'StepStatistics':
+        return cls(
+            **{
+                field.name: None
+                if getattr(parts[0], field.name) is None
+                else np.concatenate([getattr(part, field.name) for part in parts])
+                for field in fields(cls)
+            }
+        )
+
+    def merge(self, other: 'StepStatistics') -> 'StepStatistics':
+        """
+        Returns the statistics of the steps of this part of a time series followed
+        by the steps of the `other` part. If the last step of this part and the
+        first step of the other part have the same label, they are one step.
+        """
+        if not len(self) or not len(other):
+            return self if len(self) else other
+        if self.labels[-1] != other.labels[0]:
+            return StepStatistics.concatenate([self, other])
+        a, b = self.take(slice(-1, None)), other.take(slice(0, 1))
+        counts = a.counts + b.counts
+        delta = b.means - a.means
+        weight = (b.counts / counts)[:, None]
+        step = StepStatistics(
+            labels=a.labels,
+            counts=counts,
+            means=a.means + delta * weight,
+            m2=a.m2 + b.m2 + delta**2 * (a.counts * weight[:, 0])[:, None],
+            mins=np.minimum(a.mins, b.mins),
+            maxs=np.maximum(a.maxs, b.maxs),
+            first_times=a.first_times,
+            last_times=b.last_times,
+        )
+        return StepStatistics.concatenate(
+            [self.take(slice(None, -1)), step, other.take(slice(1, None))]
+        )
+
+
+class StepAggregator:
+    """
+    Aggregates the statistics of the steps of a time series in a single pass over
+    chunks of its points, e.g. the chunks of a csv file read with pandas or slices
+    of h5 datasets, so that the full time series never has to be in memory. Only
+    the statistics of the steps and of the step that is still open are kept.
+    """
+
+    def __init__(self) -> None:
+        self.steps: list[StepStatistics] = []
+        self.open: StepStatistics | None = None
+
+    def update(self, labels, columns: list, times=None) -> None:
+        """
+        Adds the next chunk of points with the step `labels`, the values of the
+        `columns`, one per quantity, and optionally their `times`.
+        """
+        block = np.column_stack([magnitude(column) for column in columns])
+        chunk = StepStatistics.of_runs(labels, block, times)
+        if self.open is not None:
+            chunk = self.open.merge(chunk)
+        if not len(chunk):
+            return
+        self.steps.append(chunk.take(slice(None, -1)))
+        self.open = chunk.take(slice(-1, None))
+
+    def result(self) -> StepStatistics | None:
+        """
+        Returns the statistics of all steps, or None if no points were added.
+        """
+        if self.open is None:
+            return None
+        return StepStatistics.concatenate([*self.steps, self.open])
+
+
+def aggregate_steps(  # noqa: PLR0913
+    labels,
+    columns: list,
+    times=None,
+    chunk_size: int = CHUNK_SIZE,
+    indices: np.ndarray | None = None,
+) -> StepStatistics | None:
+    """
+    Returns the statistics of the steps of the time series with the step `labels`
+    and the values of the `columns`, which can be any sliceable arrays, e.g. h5py
+    datasets. They are read in chunks of `chunk_size` points, see `StepAggregator`.
+    With `indices`, only the points at these increasing indices are aggregated and
+    `labels` has one label per index.
+    """
+    aggregator = StepAggregator()
+    for start in range(0, len(labels), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        rows = chunk if indices is None else indices[chunk]
+        aggregator.update(
+            labels[chunk],
+            [column[rows] for column in columns],
+            None if times is None else times[rows],
+        )
+    return aggregator.result()
+
+
+@dataclass(frozen=True)
+class SteadyStates:
+    """
+    The steady states of a time series with `size` points, i.e. the steps of a
+    setpoint program without the ramps between them. `indices` are the indices of the
+    points at steady state, in the order of the time series, and `starts` the
+    positions in `indices` at which a new step begins. All quantities are aggregated
+    per step with a single grouped reduction over these positions.
+    """
+
+    indices: np.ndarray
+    starts: np.ndarray
+    size: int
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def counts(self) -> np.ndarray:
+        return np.diff(self.starts, append=len(self.indices))
+
+    def matches(self, values) -> bool:
+        """
+        Returns whether `values` is a time series of the same size.
+        """
+        return np.ndim(values) == 1 and len(values) == self.size
+
+    def take(self, values) -> np.ndarray:
+        """
+        Returns the values at steady state, a scalar is broadcast to all points.
+        """
+        values = magnitude(values)
+        if values.ndim == 0:
+            return np.broadcast_to(values, self.indices.shape)
+        return values[self.indices]
+
+    def mean(self, columns: list) -> np.ndarray:
+        """
+        Returns the mean of each of the `columns` per step as an array with one row
+        per step and one column per quantity.
+        """
+        block = np.column_stack([self.take(column) for column in columns])
+        if not len(self):
+            return block[:0]
+        return np.add.reduceat(block, self.starts, axis=0) / self.counts[:, None]
+
+    def aggregate(self, columns: list, times=None) -> StepStatistics:
+        """
+        Returns the statistics of each of the `columns` per step, with the first and
+        last of the `times`, if given, see `StepStatistics`. The points at steady
+        state are aggregated chunk by chunk with `aggregate_steps`, so that they are
+        not copied into one block at once. A scalar is broadcast to all points.
+        """
+        columns = [
+            np.broadcast_to(magnitude(column), (self.size,))
+            if np.ndim(column) == 0
+            else column
+            for column in columns
+        ]
+        labels = np.repeat(np.arange(len(self)), self.counts)
+        return aggregate_steps(
+            labels,
+            columns,
+            None if times is None else magnitude(times),
+            indices=self.indices,
+        )
+
+    def statistics(self, columns: list) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the mean and the standard deviation of each of the `columns` per step,
+        see `aggregate`.
+        """
+        statistics = self.aggregate(columns)
+        return statistics.means, statistics.stds
+
+    def first(self, values) -> np.ndarray:
+        """
+        Returns the first value of `values` in each step.
+        """
+        return magnitude(values)[self.indices[self.starts]]
+
+    def last(self, values) -> np.ndarray:
+        """
+        Returns the last value of `values` in each step.
+        """
+        return magnitude(values)[self.indices[self.starts + self.counts - 1]]
+
+    def reduce(self, values, last: bool = False):
+        """
+        Returns the mean, or with `last` the last value, of `values` in each step,
+        with the unit of `values` if it is a pint quantity.
+        """
+        reduced = self.last(values) if last else self.mean([values])[:, 0]
+        units = getattr(values, 'units', None)
+        return reduced if units is None else ureg.Quantity(reduced, units)
+
+
+def run_starts(levels: np.ndarray) -> np.ndarray:
+    """
+    Returns the positions at which the values of `levels` change, i.e. the starts of
+    its runs of equal values, by run-length encoding of the rows.
+    """
+    if len(levels) < 2:  # noqa: PLR2004
+        return np.zeros(len(levels), dtype=int)
+    changes = (levels[1:] != levels[:-1]).reshape(len(levels) - 1, -1).any(axis=1)
+    return np.flatnonzero(np.r_[True, changes])
+
+
+def find_steady_states(
+    setpoints: list,
+    tolerances: list[float],
+    window: int = PLATEAU_WINDOW,
+    stride: int = PLATEAU_STRIDE,
+) -> SteadyStates:
+    """
+    Finds the steady states of the `setpoints` of the same size, e.g. the set
+    temperature and pressure of a reaction. Every `stride`-th point is at steady state
+    if none of the setpoints changes by more than its tolerance in the following
+    `window` points, the first and last `window` points are skipped. The points at
+    steady state are split into steps by run-length encoding of their setpoints.
+    """
+    values = np.column_stack([magnitude(setpoint) for setpoint in setpoints])
+    candidates = np.arange(window, len(values) - window, stride)
+    stable = np.all(
+        np.abs(values[candidates] - values[candidates + window]) < tolerances, axis=1
+    )
+    indices = candidates[stable]
+    return SteadyStates(
+        indices=indices, starts=run_starts(values[indices]), size=len(values)
+    )
+
+
+def group_steps(labels) -> SteadyStates:
+    """
+    Returns the steps of a time series with step `labels`, e.g. the step column of a
+    data file, where each run of points with the same label is a step.
+    """
+    labels = np.asarray(labels)
+    return SteadyStates(
+        indices=np.arange(len(labels)), starts=run_starts(labels), size=len(labels)
+    )
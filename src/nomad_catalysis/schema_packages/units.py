@@ -0,0 +1,104 @@
+from functools import lru_cache
+
+from nomad.units import ureg
+
+RATE_UNITS = {
+    'mmol/g/h': 'mmol / (g * hour)',
+    'mmol/g/min': 'mmol / (g * minute)',
+    'µmol/g/min': 'µmol / (g * minute)',
+    'mmolg^-1h^-1': 'mmol / (g * hour)',
+}
+
+SPECIFIC_MASS_RATE_UNITS = {
+    'mol/(h*gmetal': 'mol / (hour * g)',
+}
+
+FLOW_RATE_UNIT = ureg.milliliter / ureg.minute
+
+UNIT_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def get_unit(string: str, aliases: tuple[tuple[str, str], ...] = ()) -> any:
+    """
+    This function resolves a unit token of a column header, e.g. '(ml)', into a
+    pint Unit. The token is looked up in `aliases` first, which maps header
+    spellings to pint unit strings. The result is cached per token, so that the pint
+    string parsing runs only once per token and not for every file or column.
+    """
+    string = string.strip('()[]')
+    if not string:
+        raise ValueError('No unit given.')
+    return ureg.Unit(dict(aliases).get(string, string))
+
+
+def get_rate_unit(string: str) -> any:
+    """
+    This function resolves the unit token of a reaction rate column, e.g.
+    '(mmol/g/h)', into a pint Unit.
+    """
+    return get_unit(string, tuple(RATE_UNITS.items()))
+
+
+def get_specific_mass_rate_unit(string: str) -> any:
+    """
+    This function resolves the unit token of a specific mass rate column into a
+    pint Unit.
+    """
+    return get_unit(string, tuple(SPECIFIC_MASS_RATE_UNITS.items()))
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def get_time_unit(string) -> any:
+    """
+    This function extracts the time unit (h/min/s) from a string.
+    It returns a ureg.Quantity object with the time unit.
+    """
+    if 'h' in string:
+        return ureg.hour
+    elif 's' in string:
+        return ureg.second
+    elif 'min' in string:
+        return ureg.minute
+    else:
+        raise ValueError('Time unit not recognized.')
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def get_mass_unit(string) -> any:
+    """
+    This function extracts the mass unit (g/mg/kg) from a string.
+    It returns a ureg.Quantity object with the mass unit.
+    """
+    string = string.strip('([])').casefold()
+    if 'mg' in string:
+        return ureg.milligram
+    elif 'kg' in string:
+        return ureg.kilogram
+    elif string in ['g', 'gram']:
+        return ureg.gram
+    else:
+        raise ValueError('Mass unit not recognized.')
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def get_temperature_unit(string) -> any:
+    """
+    This function extracts the temperature unit (K/°C) from a string. It returns
+    ureg.kelvin or ureg.celsius or None if the unit is not recognized.
+    """
+    string = string.casefold()
+    if 'k' in string:
+        return ureg.kelvin
+    elif 'c' in string:
+        return ureg.celsius
+    return None
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def get_scale_factor(unit, target_unit) -> float:
+    """
+    This function returns the factor that converts magnitudes in the multiplicative
+    unit `unit` into magnitudes in `target_unit`.
+    """
+    return ureg.Quantity(1.0, unit).to(target_unit).magnitude
@@ -1,5 +1,8 @@
+import json
 import os.path
 
+import numpy as np
+import pytest
 from nomad.client import normalize_all, parse
 
 
@@ -21,3 +24,278 @@ def test_parser():
 
     assert entry_archive.metadata.entry_name == 'template_CatalyticReaction data file'
     assert entry_archive.metadata.entry_type == 'RawFileData'
+
+
+def test_column_plan():
+    from nomad.utils import get_logger
+
+    from nomad_catalysis.parsers.column_plan import compile_column_plan
+
+    columns = [
+        'name',
+        'set_temperature (c)',
+        'x co2 (%)',
+        'x_r co2 (%)',
+        's_p meoh (%)',
+        'r meoh (mmol/g/h)',
+        'pretreatment gas_flow0 h2 (mln)',
+    ]
+    plan = compile_column_plan(columns, get_logger(__name__))
+
+    assert [spec.field for spec in plan.feed] == ['set_temperature']
+    assert plan.feed[0].convert(250) == pytest.approx(523.15)
+    assert [(spec.field, spec.name) for spec in plan.reaction] == [
+        ('fraction_in', 'co2'),
+        ('conversion_reactant_based', 'co2'),
+        ('selectivity', 'meoh'),
+        ('reaction_rate', 'meoh'),
+    ]
+    assert plan.pretreatment[0].name == 'h2'
+
+
+def test_column_plan_rows():
+    import pandas as pd
+    from nomad.utils import get_logger
+
+    from nomad_catalysis.parsers.column_plan import compile_column_plan
+
+    data_frame = pd.DataFrame(
+        {
+            'name': ['a', 'b'],
+            'set_temperature (c)': [250, None],
+            'x co2 (%)': [15, 'n.a.'],
+            'pretreatment gas_flow0 h2 (mln)': [60, 30],
+        }
+    )
+    plan = compile_column_plan(data_frame.columns, get_logger(__name__))
+    rows = dict(plan.rows(data_frame, get_logger(__name__)))
+
+    assert rows[0]['name'] == 'a'
+    assert rows[0]['set_temperature (c)'] == pytest.approx(523.15)
+    assert 'set_temperature (c)' not in rows[1]
+    assert plan.fraction_in(rows[0], 'co2') == [pytest.approx(0.15)]
+    assert np.isnan(plan.fraction_in(rows[1], 'co2')[0])
+    assert rows[1]['pretreatment gas_flow0 h2 (mln)'] == pytest.approx(5e-7)
+
+
+def test_create_archives(tmp_path, monkeypatch):
+    from nomad.datamodel import EntryArchive, EntryMetadata
+    from nomad.datamodel.context import ClientContext
+
+    from nomad_catalysis.parsers.utils import create_archives
+    from nomad_catalysis.schema_packages.catalysis import CatalystSample
+
+    monkeypatch.chdir(tmp_path)
+    archive = EntryArchive(
+        m_context=ClientContext(local_dir=str(tmp_path)), metadata=EntryMetadata()
+    )
+    samples = [CatalystSample(name=f'sample {n}') for n in range(5)]
+    file_names = [f'sample_{n}.archive.json' for n in range(5)]
+
+    references = create_archives(samples, archive, file_names, batch_size=2)
+
+    assert references == [str(tmp_path / file_name) for file_name in file_names]
+    for n, file_name in enumerate(file_names):
+        with open(file_name) as file:
+            assert json.load(file)['data']['name'] == f'sample {n}'
+
+
+def test_sample_column_names():
+    from nomad_catalysis.parsers.catalysis_parsers import CatalysisCollectionParser
+
+    names = CatalysisCollectionParser().sample_column_names(
+        ['name', 'catalyst', 'sample_id', 'comments', 'x co2 (%)']
+    )
+
+    assert names == {
+        'catalyst': 'name',
+        'sample_id': 'lab_id',
+        'comments': 'description',
+        'x co2 (%)': 'x co2 (%)',
+    }
+
+
+def test_read_table_chunks(tmp_path):
+    import pandas as pd
+
+    from nomad_catalysis.parsers.utils import read_table_chunks
+
+    data_frame = pd.DataFrame(
+        {'name': [f'r{n}' for n in range(5)], 'x co2 (%)': [10, 20, 30, 40, 50]}
+    )
+    for file_name in ['table.csv', 'table.xlsx']:
+        path = str(tmp_path / file_name)
+        if file_name.endswith('.csv'):
+            data_frame.to_csv(path, index=False)
+        else:
+            data_frame.to_excel(path, index=False)
+
+        chunks = list(read_table_chunks(path, 2))
+
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        assert pd.concat(chunks, ignore_index=True).equals(data_frame)
+        chunks = list(read_table_chunks(path, 2, usecols=lambda col: col == 'name'))
+        assert list(chunks[0].columns) == ['name']
+
+
+def test_create_archives_content_hashes(tmp_path):
+    from nomad.datamodel import EntryArchive, EntryMetadata
+    from nomad.datamodel.context import ServerLocalContext
+
+    from nomad_catalysis.parsers.utils import (
+        create_archives,
+        get_content_hashes_file_name,
+        load_content_hashes,
+        save_content_hashes,
+    )
+    from nomad_catalysis.schema_packages.catalysis import CatalystSample
+
+    class RecordingContext(ServerLocalContext):
+        processed = []
+
+        def process_updated_raw_file(self, path, allow_modify=False):
+            self.processed.append((path, allow_modify))
+
+    archive = EntryArchive(
+        m_context=RecordingContext(tmp_path),
+        metadata=EntryMetadata(mainfile='test_CatalystSampleCollection.xlsx'),
+    )
+    file_names = ['a.archive.json', 'b.archive.json']
+
+    def write(names):
+        content_hashes = load_content_hashes(archive)
+        samples = [CatalystSample(name=name) for name in names]
+        create_archives(samples, archive, file_names, content_hashes=content_hashes)
+        save_content_hashes(archive, content_hashes)
+
+    write(['a', 'b'])
+    assert RecordingContext.processed == [
+        ('a.archive.json', False),
+        ('b.archive.json', False),
+    ]
+
+    RecordingContext.processed.clear()
+    write(['a', 'b2'])
+    assert RecordingContext.processed == [('b.archive.json', True)]
+    with open(tmp_path / 'b.archive.json') as file:
+        assert json.load(file)['data']['name'] == 'b2'
+
+    # the hashes are not written again if no child archive changed
+    hashes_file = tmp_path / '.test_CatalystSampleCollection.xlsx.hashes.json'
+    content_hashes = load_content_hashes(archive)
+    hashes_file.unlink()
+    save_content_hashes(archive, content_hashes, dict(content_hashes))
+    assert not hashes_file.exists()
+
+    archive.metadata.mainfile = 'collections/samples.xlsx'
+    hashes_file_name = get_content_hashes_file_name(archive)
+    assert hashes_file_name == 'collections/.samples.xlsx.hashes.json'
+
+
+def test_create_archives_duplicate_file_names(tmp_path):
+    from nomad.datamodel import EntryArchive, EntryMetadata
+    from nomad.datamodel.context import ServerLocalContext
+
+    from nomad_catalysis.parsers.utils import create_archives
+    from nomad_catalysis.schema_packages.catalysis import CatalystSample
+
+    class RecordingContext(ServerLocalContext):
+        processed = []
+
+        def process_updated_raw_file(self, path, allow_modify=False):
+            self.processed.append((path, allow_modify))
+
+    archive = EntryArchive(
+        m_context=RecordingContext(tmp_path),
+        metadata=EntryMetadata(mainfile='test_CatalysisCollection.xlsx'),
+    )
+    samples = [CatalystSample(name=name) for name in ['first', 'second', 'third']]
+    file_names = ['cat.archive.json', 'cat.archive.json', 'cat.archive.json']
+
+    for batch_size in [3, 1]:
+        RecordingContext.processed.clear()
+        (tmp_path / 'cat.archive.json').unlink(missing_ok=True)
+        references = create_archives(
+            samples, archive, file_names, batch_size=batch_size, content_hashes={}
+        )
+
+        assert RecordingContext.processed == [('cat.archive.json', False)]
+        assert len(set(references)) == 1
+        with open(tmp_path / 'cat.archive.json') as file:
+            assert json.load(file)['data']['name'] == 'first'
+
+
+def test_collection_child_archives(tmp_path):
+    import shutil
+
+    from nomad.parsing.parsers import run_parser
+    from nomad.utils import get_logger
+
+    from nomad_catalysis.parsers import catalysis_collection
+
+    test_file = str(tmp_path / 'template_CatalysisCollection.xlsx')
+    shutil.copy(
+        os.path.join(
+            'src',
+            'nomad_catalysis',
+            'example_uploads',
+            'template_example',
+            'template_CatalysisCollection.xlsx',
+        ),
+        test_file,
+    )
+    parser = catalysis_collection.model_copy(update={'use_child_archives': True}).load()
+    keys = parser.is_mainfile(test_file, 'application/xlsx', b'', '')
+
+    archives = run_parser(test_file, parser, keys, get_logger(__name__))
+
+    assert [archive.metadata.mainfile_key for archive in archives[1:]] == keys
+    assert len(archives[0].data.measurements) + len(archives[0].data.samples) == len(
+        keys
+    )
+    assert all(archive.data is not None for archive in archives[1:])
+    assert not list(tmp_path.glob('*.archive.json'))
+
+    # a collection without a name column is matched and fails when it is parsed
+    test_file = str(tmp_path / 'unnamed_CatalysisCollection.csv')
+    with open(test_file, 'w') as f:
+        f.write('temperature (K),x co2 (%)\n500,10\n')
+    assert parser.is_mainfile(test_file, 'text/csv', b'', '') is True
+
+
+def test_collection_timing_report(tmp_path):
+    import shutil
+
+    from nomad.parsing.parsers import run_parser
+    from nomad.utils import get_logger
+    from structlog.testing import capture_logs
+
+    from nomad_catalysis.parsers import catalysis_collection
+
+    test_file = str(tmp_path / 'template_CatalysisCollection.xlsx')
+    shutil.copy(
+        os.path.join(
+            'src',
+            'nomad_catalysis',
+            'example_uploads',
+            'template_example',
+            'template_CatalysisCollection.xlsx',
+        ),
+        test_file,
+    )
+    parser = catalysis_collection.model_copy(
+        update={'use_child_archives': True, 'timing_report': True}
+    ).load()
+    keys = parser.is_mainfile(test_file, 'application/xlsx', b'', '')
+    with capture_logs() as logs:
+        run_parser(test_file, parser, keys, get_logger(__name__))
+
+    reports = [
+        log for log in logs if log['event'] == 'Catalysis collection parse report'
+    ]
+    assert len(reports) == 1
+    assert {'read', 'normalize_columns', 'extract_reactions', 'extract_samples'} <= set(
+        reports[0]['timings']
+    )
+    assert reports[0]['counters']['child_entries'] == len(keys)
+    assert reports[0]['counters']['rows'] == len(keys) // 2
@@ -1,7 +1,9 @@
 import os.path
 
 import pytest
+import structlog
 from nomad.client import normalize_all, parse
+from structlog.testing import capture_logs
 
 
 def test_schema():
@@ -36,3 +38,894 @@ def test_schema():
     assert entry_archive.data.reaction_conditions.set_temperature.to(
         'K'
     ).magnitude == pytest.approx(473)
+
+
+def test_units():
+    from nomad.units import ureg
+
+    from nomad_catalysis.schema_packages.units import (
+        get_rate_unit,
+        get_scale_factor,
+        get_temperature_unit,
+        get_time_unit,
+        get_unit,
+    )
+
+    assert get_rate_unit('(mmol/g/h)') == ureg.Unit('mmol / (g * hour)')
+    assert get_rate_unit('(mmol/g/h)') is get_rate_unit('(mmol/g/h)')
+    assert get_unit('(ml)') == ureg.milliliter
+    assert get_time_unit('(min)') == ureg.minute
+    assert get_temperature_unit('(°C)') == ureg.celsius
+    assert get_temperature_unit('(K)') == ureg.kelvin
+    assert get_scale_factor(ureg.milliliter / ureg.minute, 'm**3/s') == pytest.approx(
+        1e-6 / 60
+    )
+    with pytest.raises(ValueError):
+        get_unit('()')
+
+
+def test_clean_data_plan():
+    import pandas as pd
+    from nomad.units import ureg
+
+    from nomad_catalysis.schema_packages.clean_data import (
+        SpeciesIndex,
+        compile_clean_data_plan,
+    )
+
+    columns = (
+        'step',
+        'x CO (%)',
+        'temperature (C)',
+        'S_p CH4 (%)',
+        'catalyst',
+        'GHSV (s)',
+    )
+    plan = compile_clean_data_plan(columns)
+    assert plan.has_runs
+    assert [(col.kind, col.species) for col in plan.columns] == [
+        ('step', None),
+        ('fraction_in', 'CO'),
+        ('temperature', None),
+        ('S_p', 'CH4'),
+        ('ghsv', None),
+    ]
+    assert plan.columns[1].divisor == 100  # noqa: PLR2004
+    assert plan.columns[2].unit == ureg.celsius
+    assert plan.columns[4].warning is not None
+    assert plan is compile_clean_data_plan(columns)
+
+    data_frame = pd.DataFrame({'x CO (%)': [1.0, None], 'temperature (C)': [2, 3]})
+    values = compile_clean_data_plan(tuple(data_frame.columns)).values(data_frame)
+    assert values['x CO (%)'].tolist() == [1.0, 0.0]
+    assert values['temperature (C)'].tolist() == [2.0, 3.0]
+
+    index = SpeciesIndex()
+    first, second, other = object(), object(), object()
+    index.append('CO', first)
+    index.append('CH4', other)
+    index.append('CO', second)
+    assert index.pop_first('CO') is first
+    index.append('CO', first)
+    assert index.to_list() == [other, second, first]
+    assert index.pop_all('CO') == [second, first]
+    assert index.to_list() == [other]
+
+
+def test_read_used_columns():
+    import io
+
+    import numpy as np
+    import pandas as pd
+
+    from nomad_catalysis.schema_packages.clean_data import (
+        compile_clean_data_plan,
+        read_used_columns,
+    )
+
+    f = io.StringIO(
+        'step,temperature (C),valve position,catalyst,x_r CO (%)\n'
+        '1,200,open,Cu,1.5\n'
+        '2,210,closed,Cu,\n'
+    )
+    data_frame = read_used_columns(pd.read_csv, f)
+    assert list(data_frame.columns) == [
+        'step',
+        'temperature (C)',
+        'catalyst',
+        'x_r CO (%)',
+    ]
+    assert data_frame['temperature (C)'].dtype == float
+
+    f = io.StringIO('temperature (C),x_r CO (%)\n200,1.5\nn.a.,2.5\n')
+    with capture_logs() as logs:
+        data_frame = read_used_columns(pd.read_csv, f, structlog.get_logger())
+    assert data_frame['x_r CO (%)'].tolist() == [1.5, 2.5]  # noqa: PLR2004
+    assert data_frame['temperature (C)'].tolist()[0] == 200.0  # noqa: PLR2004
+    assert np.isnan(data_frame['temperature (C)'].tolist()[1])
+    assert len(logs) == 1
+    assert "'temperature (C)'" in logs[0]['event']
+    assert compile_clean_data_plan(tuple(data_frame.columns)).values(data_frame)
+
+
+def test_decode_relative_time():
+    import numpy as np
+
+    from nomad_catalysis.schema_packages.haber_data import decode_relative_time
+
+    time = np.array([b'100', b'101.5', b' 103'], dtype='S16')
+    assert decode_relative_time(time).tolist() == [0.0, 1.5, 3.0]
+    assert decode_relative_time(np.array([], dtype='S16')).size == 0
+
+
+def test_steady_states():
+    import numpy as np
+    from nomad.units import ureg
+
+    from nomad_catalysis.schema_packages.steady_state import (
+        find_steady_states,
+        group_steps,
+    )
+
+    # 400 K - ramp - 450 K - ramp - 400 K, 200 points per step
+    setpoint = np.concatenate(
+        [
+            np.full(200, 400.0),
+            np.linspace(400, 450, 100),
+            np.full(200, 450.0),
+            np.linspace(450, 400, 100),
+            np.full(200, 400.0),
+        ]
+    )
+    pressure = np.full(800, 1e5)
+    steps = find_steady_states([setpoint * ureg.kelvin, pressure], [0.05, 100.0])
+    assert len(steps) == 3  # noqa: PLR2004
+    assert steps.counts.tolist() == [11, 16, 15]
+    means, stds = steps.statistics([setpoint, np.arange(800.0), 2.0])
+    assert means[:, 0].tolist() == [400.0, 450.0, 400.0]
+    assert means[:, 1].tolist() == [100.0, 375.0, 670.0]
+    assert means[:, 2].tolist() == [2.0, 2.0, 2.0]
+    assert stds[:, 1].tolist() == pytest.approx(10 * np.sqrt([10, 21.25, 18.666667]))
+    assert stds[:, 0].tolist() == [0.0, 0.0, 0.0]
+    assert steps.last(np.arange(800.0)).tolist() == [150.0, 450.0, 740.0]
+    statistics = steps.aggregate([setpoint], times=np.arange(800.0))
+    assert statistics.first_times.tolist() == steps.first(np.arange(800.0)).tolist()
+    assert statistics.last_times.tolist() == [150.0, 450.0, 740.0]
+    assert steps.reduce(setpoint * ureg.kelvin).units == ureg.kelvin
+    assert len(find_steady_states([setpoint[:50]], [0.05])) == 0
+
+    # a pressure step at constant temperature starts a new step
+    pressure[400:] = 2e5
+    assert len(find_steady_states([setpoint, pressure], [0.05, 100.0])) == 4  # noqa: PLR2004
+
+    steps = group_steps([1, 1, 1, 2, 2, 3])
+    assert steps.counts.tolist() == [3, 2, 1]
+    assert steps.mean([np.arange(6.0)])[:, 0].tolist() == [1.0, 3.5, 5.0]
+
+
+def test_step_aggregator():
+    import numpy as np
+
+    from nomad_catalysis.schema_packages.steady_state import (
+        StepAggregator,
+        aggregate_steps,
+    )
+
+    rng = np.random.default_rng(0)
+    labels = np.repeat([1, 2, 1, 3], [40, 7, 120, 33])
+    values = rng.normal(labels * 10.0, 2.0)
+    times = np.arange(200.0)
+    steps = aggregate_steps(labels, [values, -values], times, chunk_size=17)
+    assert steps.labels.tolist() == [1, 2, 1, 3]
+    assert steps.counts.tolist() == [40, 7, 120, 33]
+    assert steps.first_times.tolist() == [0.0, 40.0, 47.0, 167.0]
+    assert steps.last_times.tolist() == [39.0, 46.0, 166.0, 199.0]
+    for step, (start, stop) in enumerate([(0, 40), (40, 47), (47, 167), (167, 200)]):
+        assert steps.means[step, 0] == pytest.approx(values[start:stop].mean())
+        assert steps.stds[step, 0] == pytest.approx(values[start:stop].std())
+        assert steps.mins[step, 0] == values[start:stop].min()
+        assert steps.maxs[step, 1] == -values[start:stop].min()
+
+    whole = aggregate_steps(labels, [values, -values])
+    assert whole.means == pytest.approx(steps.means)
+    assert whole.m2 == pytest.approx(steps.m2)
+    assert whole.first_times is None
+    single_points = aggregate_steps(labels, [values, -values], chunk_size=1)
+    assert single_points.m2 == pytest.approx(whole.m2)
+    assert StepAggregator().result() is None
+
+
+def test_downsampling():
+    import numpy as np
+    from nomad.units import ureg
+
+    from nomad_catalysis.schema_packages.downsampling import (
+        bucket_means,
+        build_pyramid,
+        downsample,
+        lttb,
+        min_max_envelope,
+        select_points,
+        time_bucket_mean,
+    )
+
+    y = np.sin(np.linspace(0, 20, 10000))
+    y[4321] = 5.0  # a single spike
+    for downsampler in [lttb, min_max_envelope, time_bucket_mean]:
+        assert len(downsampler(y, 300)) == 300  # noqa: PLR2004
+        assert len(downsampler(y, 301)) == 301  # noqa: PLR2004
+    assert lttb(y, 300).max() == 5.0  # noqa: PLR2004
+    assert min_max_envelope(y, 300).max() == 5.0  # noqa: PLR2004
+    assert lttb(y, 300)[[0, -1]].tolist() == y[[0, -1]].tolist()
+
+    # buckets of the same duration, the gap between 40 and 80 s is interpolated
+    x = np.r_[np.arange(40.0), np.arange(80.0, 120.0)]
+    means = time_bucket_mean(x, 12, x)
+    assert means.tolist() == pytest.approx(np.linspace(5, 115, 12), abs=0.5)
+
+    reduced = downsample(y * ureg.kelvin, 300, 'minmax')
+    assert reduced.units == ureg.kelvin
+    assert len(reduced) == 300  # noqa: PLR2004
+    assert len(downsample(y[:100], 300)) == 100  # noqa: PLR2004
+    with pytest.raises(KeyError):
+        downsample(y, 300, 'unknown')
+
+    # the points are selected once from all columns, each keeps its spike
+    z = np.cos(np.linspace(0, 20, 10000))
+    z[1234] = -5.0
+    for method in ['lttb', 'minmax']:
+        downsampling = select_points([y, z * ureg.kelvin], 300, method)
+        assert downsampling.matches(z)
+        assert downsampling.reduce(y).max() == 5.0  # noqa: PLR2004
+        assert downsampling.reduce(z * ureg.kelvin).min() == -5.0 * ureg.kelvin
+        indices = np.flatnonzero(np.isin(y, downsampling.reduce(y)))
+        assert np.isin(downsampling.reduce(z), z[indices]).all()
+    # each point is kept once, also if it is the lowest and highest of a bucket
+    for size in [10000, 400]:
+        block = [y[:size], -y[:size] + np.linspace(0, 1, size)]
+        for method in ['lttb', 'minmax']:
+            indices = select_points(block, 300, method).indices
+            assert len(np.unique(indices)) == 300  # noqa: PLR2004
+    means = select_points([y, z], 300, 'mean')
+    assert means.reduce(z).tolist() == pytest.approx(time_bucket_mean(z, 300))
+
+    values = np.arange(2345.0)
+    values[5] = np.nan
+    levels = build_pyramid(values, 20)
+    assert [(points, len(means)) for points, _, means, _ in levels] == [
+        (10, 235),
+        (100, 24),
+        (1000, 3),
+    ]
+    points, mins, means, maxs = levels[1]
+    assert mins[:2].tolist() == [0.0, 100.0]
+    assert maxs[-1] == 2344.0  # noqa: PLR2004
+    assert means[1:3].tolist() == [149.5, 249.5]
+    assert means.tolist() == pytest.approx(bucket_means(values, 100).tolist())
+
+
+def test_steady_state_results(tmp_path, monkeypatch):
+    import json
+
+    import numpy as np
+    import pandas as pd
+
+    monkeypatch.chdir(tmp_path)
+    step = np.repeat([1, 2, 3], 200)
+    pd.DataFrame(
+        {
+            'step': step,
+            'set_temperature (K)': np.repeat([500.0, 550.0, 600.0], 200),
+            'x CO (%)': 10.0,
+            'x_r CO (%)': step * 10 + np.tile([-1.0, 1.0], 300),
+            'TOS (min)': np.arange(600.0),
+        }
+    ).to_csv(tmp_path / 'steps.csv', index=False)
+    with open(tmp_path / 'steps.archive.json', 'w') as outfile:
+        json.dump(
+            {
+                'data': {
+                    'm_def': 'nomad_catalysis.schema_packages.catalysis.'
+                    'CatalyticReaction',
+                    'data_file': 'steps.csv',
+                }
+            },
+            outfile,
+        )
+    entry_archive = parse(str(tmp_path / 'steps.archive.json'))[0]
+    normalize_all(entry_archive)
+
+    reaction = entry_archive.results.properties.catalytic.reaction
+    assert reaction.reaction_conditions.temperature.to('K').magnitude.tolist() == [
+        500.0,
+        550.0,
+        600.0,
+    ]
+    assert reaction.reaction_conditions.time_on_stream.to(
+        'minute'
+    ).magnitude.tolist() == pytest.approx([199.0, 399.0, 599.0])
+    assert reaction.reactants[0].conversion.tolist() == pytest.approx([10, 20, 30])
+
+    steady_states = entry_archive.data.results[0].steady_states
+    assert steady_states.number_of_points.tolist() == [200, 200, 200]
+    assert steady_states.duration.to('minute').magnitude.tolist() == pytest.approx(
+        [199.0, 199.0, 199.0]
+    )
+    conversion = {q.name: q for q in steady_states.quantities}[
+        'results.reactants_conversions[CO].conversion'
+    ]
+    assert conversion.std.tolist() == pytest.approx([1.0, 1.0, 1.0])
+
+    # without steps, the arrays are downsampled to the same 300 points in time
+    pd.DataFrame(
+        {
+            'set_temperature (K)': np.linspace(500.0, 560.0, 600),
+            'x CO (%)': 10.0,
+            'x_r CO (%)': np.r_[np.full(300, 5.0), 50.0, np.full(299, 5.0)]
+            + np.linspace(0.0, 6.0, 600),
+            'TOS (min)': np.arange(600.0),
+        }
+    ).to_csv(tmp_path / 'steps.csv', index=False)
+    entry_archive = parse(str(tmp_path / 'steps.archive.json'))[0]
+    normalize_all(entry_archive)
+
+    reaction = entry_archive.results.properties.catalytic.reaction
+    time_on_stream = reaction.reaction_conditions.time_on_stream.to('minute')
+    assert len(time_on_stream) == 300  # noqa: PLR2004
+    assert time_on_stream.magnitude[[0, -1]].tolist() == pytest.approx([0.0, 599.0])
+    assert len(reaction.reactants[0].conversion) == 300  # noqa: PLR2004
+    assert max(reaction.reactants[0].conversion) == pytest.approx(53.0, abs=0.01)
+    # all quantities are reduced to the same points
+    temperature = reaction.reaction_conditions.temperature.to('kelvin').magnitude
+    conversion = np.asarray(reaction.reactants[0].conversion)
+    baseline = 5.0 + (temperature - 500.0) / 10.0
+    assert np.isclose(conversion, baseline).sum() == 299  # noqa: PLR2004
+
+    pyramid = entry_archive.data.results[0].pyramid
+    assert pyramid.number_of_points == 600  # noqa: PLR2004
+    level = pyramid.get_level(100)
+    assert (level.points_per_bucket, level.number_of_buckets) == (10, 60)
+    assert pyramid.get_level(1000) is None
+    conversion = {q.name: q for q in level.quantities}[
+        'results.reactants_conversions[CO].conversion'
+    ]
+    assert max(conversion.max) == pytest.approx(53.0, abs=0.01)
+    assert max(conversion.mean) == pytest.approx(12.55, abs=0.01)
+
+
+def test_map_and_assign_attributes():
+    from types import SimpleNamespace
+
+    import numpy as np
+
+    from nomad_catalysis.schema_packages.catalysis import map_and_assign_attributes
+
+    source = SimpleNamespace(
+        name='reaction', temperature=np.linspace(400.0, 500.0, 1000), labels=['a'] * 400
+    )
+    target = SimpleNamespace()
+    mapping = {'name': 'name', 'temperature': 'temperature', 'labels': 'labels'}
+    with capture_logs() as logs:
+        map_and_assign_attributes(source, structlog.get_logger(), mapping, target)
+    assert target.name == 'reaction'
+    assert len(target.temperature) == 300  # noqa: PLR2004
+    # a large array that can not be reduced is not written at full size
+    assert not hasattr(target, 'labels')
+    warnings = [log['event'] for log in logs if log['log_level'] == 'warning']
+    assert len(warnings) == 1
+    assert "'labels'" in warnings[0]
+
+
+def test_offloaded_arrays(tmp_path, monkeypatch):
+    import json
+    from importlib import import_module
+
+    import h5py
+    import numpy as np
+    import pandas as pd
+
+    catalysis = import_module('nomad_catalysis.schema_packages.catalysis')
+    monkeypatch.setattr(catalysis.configuration, 'array_offload_threshold', 90)
+    monkeypatch.chdir(tmp_path)
+    pd.DataFrame(
+        {
+            'set_temperature (K)': np.linspace(500.0, 600.0, 1000),
+            'x CO (%)': 10.0,
+            'x_r CO (%)': np.linspace(0.0, 50.0, 1000),
+            'TOS (min)': np.arange(1000.0),
+        }
+    ).to_csv(tmp_path / 'long.csv', index=False)
+    with open(tmp_path / 'long.archive.json', 'w') as outfile:
+        json.dump(
+            {
+                'data': {
+                    'm_def': 'nomad_catalysis.schema_packages.catalysis.'
+                    'CatalyticReaction',
+                    'data_file': 'long.csv',
+                }
+            },
+            outfile,
+        )
+    entry_archive = parse('long.archive.json')[0]
+    normalize_all(entry_archive)
+
+    reaction = entry_archive.data
+    assert reaction.reaction_conditions.set_temperature is None
+    assert reaction.results[0].reactants_conversions[0].conversion is None
+    offloaded = {array.name: array for array in reaction.offloaded_arrays}
+    temperature = offloaded['reaction_conditions.set_temperature']
+    assert temperature.number_of_points == 1000  # noqa: PLR2004
+    assert (temperature.min, temperature.max) == (500.0, 600.0)
+    assert temperature.unit == 'kelvin'
+    conversion = offloaded['results.reactants_conversions[CO].conversion']
+    assert conversion.mean == pytest.approx(25.0)
+    file_name, _, dataset = conversion.reference.partition('#')
+    assert os.path.basename(file_name) == 'long.archive.json.arrays.h5'
+    with h5py.File(file_name) as data:
+        assert data[dataset].compression == 'gzip'
+        assert data[dataset][-1] == pytest.approx(50.0)
+    # the results for the search are still written
+    search_results = entry_archive.results.properties.catalytic.reaction
+    assert len(search_results.reactants[0].conversion) == 300  # noqa: PLR2004
+    # the pyramid level with 100 buckets is moved into the file as well
+    quantity = reaction.results[0].pyramid.levels[0].quantities[0]
+    assert quantity.mean is None
+    path = f'results.pyramid.levels[0].quantities[{quantity.name}].mean'
+    assert offloaded[path].number_of_points == 100  # noqa: PLR2004
+
+    # the arrays are read back from the sidecar file when the entry is normalized
+    monkeypatch.setattr(catalysis.configuration, 'array_offload_threshold', None)
+    reaction.data_file = None
+    normalize_all(entry_archive)
+    assert reaction.offloaded_arrays == []
+    assert reaction.reaction_conditions.set_temperature[-1].magnitude == 600.0  # noqa: PLR2004
+    assert len(reaction.results[0].reactants_conversions[0].conversion) == 1000  # noqa: PLR2004
+
+
+def test_offloaded_arrays_without_file(tmp_path, monkeypatch):
+    import json
+    from importlib import import_module
+
+    import numpy as np
+
+    catalysis = import_module('nomad_catalysis.schema_packages.catalysis')
+    monkeypatch.setattr(catalysis.configuration, 'array_offload_threshold', 90)
+    monkeypatch.chdir(tmp_path)
+    with open(tmp_path / 'published.archive.json', 'w') as outfile:
+        json.dump(
+            {
+                'data': {
+                    'm_def': 'nomad_catalysis.schema_packages.catalysis.'
+                    'CatalyticReaction',
+                }
+            },
+            outfile,
+        )
+    entry_archive = parse('published.archive.json')[0]
+    reaction = entry_archive.data
+    reaction.reaction_conditions = catalysis.ReactionConditionsData(
+        set_temperature=np.linspace(500.0, 600.0, 1000)
+    )
+    reaction.results = [catalysis.CatalyticReactionData()]
+
+    # the arrays stay in the archive if the file can not be written, e.g. in a
+    # published upload, or read, e.g. if it was deleted
+    def raw_file(*args, **kwargs):
+        raise KeyError('published upload')
+
+    monkeypatch.setattr(entry_archive.m_context, 'raw_file', raw_file)
+    with capture_logs() as logs:
+        reaction.offload_arrays(entry_archive, structlog.get_logger())
+    assert [log['log_level'] for log in logs] == ['warning']
+    assert len(reaction.reaction_conditions.set_temperature) == 1000  # noqa: PLR2004
+    assert reaction.offloaded_arrays == []
+
+    reaction.offloaded_arrays = [
+        catalysis.OffloadedArray(
+            name='results.temperature',
+            reference='missing.arrays.h5#data/results/0/temperature',
+        )
+    ]
+    with capture_logs() as logs:
+        reaction.load_offloaded_arrays(entry_archive, structlog.get_logger())
+    assert len(logs) == 1
+    assert 'missing.arrays.h5' in logs[0]['event']
+    assert reaction.offloaded_arrays == []
+
+
+def test_hdf5_table(tmp_path):
+    import h5py
+    import numpy as np
+
+    from nomad_catalysis.schema_packages.hdf5_mapping import Hdf5Table
+
+    records = np.zeros(10, dtype=[('time', 'S16'), ('temperature', float)])
+    records['temperature'] = np.arange(10)
+    with h5py.File(tmp_path / 'haber.h5', 'w') as data:
+        data['table'] = records
+    with h5py.File(tmp_path / 'haber.h5', 'r') as data:
+        table = Hdf5Table(data['table'])
+        assert len(table) == 10  # noqa: PLR2004
+        assert 'temperature' in table
+        assert table['temperature'] is table['temperature']
+        view = table.view(slice(1, None, 4))
+        assert len(view) == 3  # noqa: PLR2004
+        assert view['temperature'].tolist() == [1.0, 5.0, 9.0]
+        with pytest.raises(KeyError):
+            table.read(['pressure'])
+
+
+def write_haber_file(file_name, methods, n_points=20):
+    import h5py
+    import numpy as np
+
+    def records(columns):
+        return np.rec.fromarrays(list(columns.values()), names=list(columns))
+
+    flow = np.full(n_points, 50.0)
+    with h5py.File(file_name, 'w') as data:
+        data['Header/Header'] = records({'SampleID': [36891]})
+        for n, method in enumerate(methods):
+            data[f'Header/{method}/Header'] = records(
+                {
+                    'Temporal resolution [Hz]': [1.0],
+                    'Bulk volume [mln]': [0.3],
+                    'Inner diameter of reactor (D) [mm]': [4.0],
+                    'Diluent material': [b'SiC'],
+                    'Diluent Sieve fraction high [um]': [250.0],
+                    'Diluent Sieve fraction low [um]': [100.0],
+                    'Catalyst Mass [mg]': [50.0],
+                    'Sieve fraction high [um]': [250.0],
+                    'Sieve fraction low [um]': [100.0],
+                    'Particle size (Dp) [mm]': [0.2],
+                    'User': [b'test user'],
+                }
+            )
+            data[f'Sorted Data/{method}/H2 Reduction'] = records(
+                {
+                    'Date': np.full(n_points, b'2022-11-21 10:56:35'),
+                    'Relative Time [Seconds]': np.arange(n_points).astype('S16'),
+                    'Catalyst Temperature [C°]': np.linspace(25, 500, n_points),
+                    'Massflow3 (H2) Target Calculated Realtime Value [mln|min]': flow,
+                    'Target Total Gas (After Reactor) [mln|min]': flow,
+                }
+            )
+            data[f'Sorted Data/{method}/NH3 Decomposition'] = records(
+                {
+                    'Relative Time [Seconds]': np.arange(n_points).astype('S16'),
+                    'Catalyst Temperature [C°]': np.full(n_points, 400.0 + n),
+                    'Massflow1 (NH3_High) Target Calculated Realtime Value [mln|min]': (
+                        flow
+                    ),
+                    'Massflow1 (NH3_High) Target Setpoint [mln|min]': flow,
+                    'W|F [gs|ml]': np.full(n_points, 0.03),
+                    'NH3 Conversion [%]': np.full(n_points, 10.0 * (n + 1)),
+                    'Space Time Yield [mmolH2 gcat-1 min-1]': np.full(n_points, 1.0),
+                }
+            )
+
+
+def test_haber_methods(tmp_path, monkeypatch):
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    write_haber_file(
+        tmp_path / 'haber.h5', ['NH3_Decomposition', 'Repetition', 'Stability']
+    )
+    with open(tmp_path / 'haber.archive.json', 'w') as outfile:
+        json.dump(
+            {
+                'data': {
+                    'm_def': 'nomad_catalysis.schema_packages.catalysis.'
+                    'CatalyticReaction',
+                    'name': 'haber',
+                    'data_file': 'haber.h5',
+                }
+            },
+            outfile,
+        )
+    entry_archive = parse(str(tmp_path / 'haber.archive.json'))[0]
+    normalize_all(entry_archive)
+    assert entry_archive.data.data_file_method == 'NH3_Decomposition'
+    assert entry_archive.data.method == 'Haber measurement NH3_Decomposition'
+
+    # the other methods are read in worker processes into their entries, which do
+    # not read the data file again
+    (tmp_path / 'haber.h5').unlink()
+    for n, method in enumerate(['Repetition', 'Stability'], start=1):
+        method_file = tmp_path / f'haber_{method}.archive.json'
+        with open(method_file) as infile:
+            data = json.load(infile)['data']
+        assert data['data_file_method'] == method
+        assert data['name'] == f'haber {method}'
+        assert 'data_file' not in data
+
+        method_archive = parse(str(method_file))[0]
+        normalize_all(method_archive)
+        assert method_archive.data.method == f'Haber measurement {method}'
+        results = method_archive.data.results[0]
+        conversion = results.reactants_conversions[0].conversion
+        assert conversion[0] == pytest.approx(10.0 * (n + 1))
+        assert method_archive.data.samples[0].lab_id == '36891'
+
+
+def test_local_data_file(tmp_path):
+    import io
+    from contextlib import nullcontext
+    from importlib import import_module
+    from types import SimpleNamespace
+
+    hdf5_reader = import_module('nomad_catalysis.schema_packages.hdf5_reader')
+    (tmp_path / 'haber.h5').write_bytes(b'data')
+
+    def raw_file(file_name, mode):
+        return open(tmp_path / file_name, mode)
+
+    archive = SimpleNamespace(m_context=SimpleNamespace(raw_file=raw_file))
+    with hdf5_reader.local_data_file(archive, 'haber.h5') as file_name:
+        assert file_name == str(tmp_path / 'haber.h5')
+
+    # raw files that are not local files, e.g. of published uploads, are copied
+    def raw_stream(file_name, mode):
+        return nullcontext(io.BytesIO(b'data'))
+
+    archive.m_context.raw_file = raw_stream
+    with hdf5_reader.local_data_file(archive, 'haber.h5') as file_name:
+        with open(file_name, 'rb') as f:
+            assert f.read() == b'data'
+    assert not os.path.exists(file_name)
+
+
+def test_hdf5_mapping(tmp_path, monkeypatch):
+    import json
+    from importlib import import_module
+
+    import h5py
+    import numpy as np
+    import yaml
+
+    catalysis = import_module('nomad_catalysis.schema_packages.catalysis')
+    hdf5_mapping = import_module('nomad_catalysis.schema_packages.hdf5_mapping')
+    records = np.rec.fromarrays(
+        [np.array([200.0, 210.0]), np.array([1.0, np.nan]), np.array([5.0, 5.0])],
+        names=['T [C]', 'X NH3 [%]', 'Flow NH3 [ml/min]'],
+    )
+    with h5py.File(tmp_path / 'reactor.h5', 'w') as data:
+        data['run/data'] = records
+    spec = {
+        'name': 'test reactor',
+        'tables': {'data': 'run/data'},
+        'values': {'reaction_name': 'ammonia decomposition'},
+        'quantities': {
+            'results.temperature': {
+                'table': 'data',
+                'field': 'T [C]',
+                'unit': 'celsius',
+            },
+            'results.runs': {'table': 'data'},
+        },
+        'sections': [
+            {
+                'target': 'reaction_conditions.reagents',
+                'table': 'data',
+                'fields': r'Flow (?P<name>\w+) \[ml/min\]',
+                'names': {'NH3': 'ammonia'},
+                'quantity': 'flow_rate',
+                'unit': 'ml/minute',
+            },
+            {
+                'target': 'results.reactants_conversions',
+                'table': 'data',
+                'name': 'ammonia',
+                'quantities': {
+                    'conversion': {'field': 'X NH3 [%]', 'transform': 'nan_to_zero'}
+                },
+            },
+        ],
+    }
+    with open(tmp_path / 'reactor.yaml', 'w') as outfile:
+        yaml.safe_dump(spec, outfile)
+    monkeypatch.setattr(
+        catalysis.configuration, 'hdf5_mappings', [str(tmp_path / 'reactor.yaml')]
+    )
+    with open(tmp_path / 'reactor.archive.json', 'w') as outfile:
+        json.dump(
+            {
+                'data': {
+                    'm_def': 'nomad_catalysis.schema_packages.catalysis.'
+                    'CatalyticReaction',
+                    'data_file': 'reactor.h5',
+                }
+            },
+            outfile,
+        )
+    entry_archive = parse(str(tmp_path / 'reactor.archive.json'))[0]
+    normalize_all(entry_archive)
+    data = entry_archive.data
+    assert data.reaction_name == 'ammonia decomposition'
+    assert data.results[0].temperature.to('K').magnitude.tolist() == pytest.approx(
+        [473.15, 483.15]
+    )
+    assert data.results[0].reactants_conversions[0].conversion.tolist() == [1.0, 0.0]
+    assert data.reaction_conditions.reagents[0].name == 'ammonia'
+    assert hdf5_mapping.load_hdf5_mapping(
+        str(tmp_path / 'reactor.yaml')
+    ) is hdf5_mapping.compile_hdf5_mapping(spec)
+
+
+def test_data_file_readers(tmp_path, monkeypatch):
+    import sys
+
+    from nomad_catalysis.schema_packages import data_file_readers
+    from nomad_catalysis.schema_packages.data_file_readers import (
+        DataFileReader,
+        find_data_file_reader,
+        register_data_file_reader,
+    )
+
+    def open_file(file_name):
+        return lambda: open(tmp_path / file_name, 'rb')
+
+    def not_opened():
+        raise AssertionError('file opened')
+
+    assert find_data_file_reader('data.csv', not_opened).name == 'clean data'
+    with open(tmp_path / 'data.txt', 'wb') as outfile:
+        outfile.write(b'time;T\n0;200\n')
+    assert find_data_file_reader('data.txt', open_file('data.txt')) is None
+
+    write_haber_file(tmp_path / 'haber.dat', ['NH3_Decomposition'])
+    assert find_data_file_reader('haber.dat', open_file('haber.dat')).name == 'HDF5'
+    write_haber_file(tmp_path / 'other.h5', [])
+    assert find_data_file_reader('other.h5', open_file('other.h5')) is None
+
+    monkeypatch.setattr(data_file_readers, 'registered_readers', [])
+    register_data_file_reader(
+        DataFileReader(
+            name='test',
+            reader='nomad_catalysis_test_reader:read',
+            extensions=('.csv',),
+            signature=b'time;',
+        )
+    )
+    assert find_data_file_reader('data.csv', not_opened).name == 'test'
+    assert find_data_file_reader('data.txt', open_file('data.txt')).name == 'test'
+    assert 'nomad_catalysis_test_reader' not in sys.modules
+
+
+def test_missing_data_file(tmp_path, monkeypatch):
+    import json
+
+    monkeypatch.chdir(tmp_path)
+    with open(tmp_path / 'missing.archive.json', 'w') as outfile:
+        json.dump(
+            {
+                'data': {
+                    'm_def': 'nomad_catalysis.schema_packages.catalysis.'
+                    'CatalyticReaction',
+                    'data_file': 'missing.csv',
+                }
+            },
+            outfile,
+        )
+    entry_archive = parse(str(tmp_path / 'missing.archive.json'))[0]
+    with capture_logs() as logs:
+        entry_archive.data.check_and_read_data_file(
+            entry_archive, structlog.get_logger()
+        )
+    warnings = [log['event'] for log in logs if log['log_level'] == 'warning']
+    assert len(warnings) == 1
+    assert 'missing.csv' in warnings[0]
+    assert not entry_archive.data.results
+
+    # errors of the reader of an existing data file are not taken for a missing file
+    from importlib import import_module
+
+    reader = import_module('nomad_catalysis.schema_packages.clean_data_reader')
+
+    def read_data_frame(reaction, archive, logger=None):
+        raise KeyError('x CO2')
+
+    monkeypatch.setattr(reader, 'read_data_frame', read_data_frame)
+    (tmp_path / 'missing.csv').write_text('step,x CO2\n1,1.0\n')
+    with pytest.raises(KeyError):
+        entry_archive.data.check_and_read_data_file(
+            entry_archive, structlog.get_logger()
+        )
+
+
+def test_data_file_cache(tmp_path, monkeypatch):
+    from importlib import import_module
+
+    from nomad_catalysis.schema_packages.data_file_cache import DataFileCache
+
+    reader = import_module('nomad_catalysis.schema_packages.clean_data_reader')
+    monkeypatch.setattr(reader, 'data_file_cache', DataFileCache(str(tmp_path)))
+    test_file = os.path.join('tests', 'data', 'test_reaction_clean_data.archive.yaml')
+    entry_archive = parse(test_file)[0]
+    normalize_all(entry_archive)
+    results = entry_archive.data.results[0].m_to_dict()
+    assert len(list(tmp_path.glob('*/*.npz'))) == 1
+
+    def read_data_frame(reaction, archive, logger=None):
+        raise AssertionError('The data file is parsed again.')
+
+    monkeypatch.setattr(reader, 'read_data_frame', read_data_frame)
+    entry_archive = parse(test_file)[0]
+    normalize_all(entry_archive)
+    assert entry_archive.data.results[0].m_to_dict() == results
+
+
+def test_data_file_cache_entries(tmp_path, monkeypatch):
+    import numpy as np
+    import pandas as pd
+    from nomad.datamodel import EntryArchive, EntryMetadata
+    from nomad.datamodel.context import ClientContext
+    from nomad.utils import get_logger
+
+    from nomad_catalysis.schema_packages import data_file_cache
+    from nomad_catalysis.schema_packages.data_file_cache import DataFileCache
+
+    cache = DataFileCache(str(tmp_path / 'cache'), max_size=5000)
+    path = cache.get_path('upload', 'data.csv', 'hash')
+    monkeypatch.setattr(data_file_cache, 'CACHE_VERSION', 0)
+    assert cache.get_path('upload', 'data.csv', 'hash') != path
+
+    # the least recently used data frames are removed
+    data_frame = pd.DataFrame({'x': np.arange(200.0)})
+    paths = [cache.get_path('upload', f'{n}.csv', 'hash') for n in range(3)]
+    for n, path in enumerate(paths):
+        assert cache.save(path, data_frame)
+        os.utime(path, (n, n))
+    assert [os.path.exists(path) for path in paths] == [False, True, True]
+
+    # the hash of a data file that can not be cached is not computed again
+    (tmp_path / 'data.csv').write_text('x\n1\n')
+    archive = EntryArchive(
+        m_context=ClientContext(local_dir=str(tmp_path)),
+        metadata=EntryMetadata(upload_id='upload'),
+    )
+    data_frame = pd.DataFrame({'x': [1, 'a']})
+    logger = get_logger(__name__)
+    assert cache.read(archive, 'data.csv', lambda: data_frame, logger) is data_frame
+
+    def get_file_hash(archive, file_name):
+        raise AssertionError('The data file is hashed again.')
+
+    monkeypatch.setattr(data_file_cache, 'get_file_hash', get_file_hash)
+    assert cache.read(archive, 'data.csv', lambda: data_frame, logger) is data_frame
+
+
+@pytest.mark.parametrize('extension', ['parquet', 'arrow', 'feather'])
+def test_arrow_data_file(tmp_path, extension):
+    import pandas as pd
+
+    pytest.importorskip('pyarrow')
+
+    data_frame = pd.read_excel(
+        os.path.join('tests', 'data', 'MoO3_C2_performance.xlsx')
+    )
+    data_frame['valve state'] = 1
+    data_file = tmp_path / f'MoO3_C2_performance.{extension}'
+    if extension == 'parquet':
+        data_frame.to_parquet(data_file)
+    else:
+        data_frame.to_feather(data_file)
+    test_file = tmp_path / 'test_reaction_arrow.archive.yaml'
+    test_file.write_text(
+        'data:\n'
+        '  m_def: nomad_catalysis.schema_packages.catalysis.CatalyticReaction\n'
+        f'  data_file: {data_file.name}\n'
+    )
+    entry_archive = parse(str(test_file))[0]
+    normalize_all(entry_archive)
+
+    expected_archive = parse(
+        os.path.join('tests', 'data', 'test_reaction_clean_data.archive.yaml')
+    )[0]
+    normalize_all(expected_archive)
+    assert (
+        entry_archive.data.results[0].m_to_dict()
+        == expected_archive.data.results[0].m_to_dict()
+    )
+    assert entry_archive.data.samples[0].lab_id == '31013'